@@ -0,0 +1,303 @@
+"""
+End-to-end pipeline benchmark on deterministic stub backends.
+
+Runs the real :class:`FootballPodcastAgent` graph against the stubs in
+:mod:`benchmarks.stubs` (Football-Data over HTTP, an OpenAI-compatible chat
+endpoint, DuckDuckGo and the TTS model) for several matchday sizes and reports
+per-stage latency percentiles, throughput and peak memory. Reports are JSON, so
+a run can be saved as a baseline and later runs compared against it:
+
+    python -m benchmarks.pipeline
+    python -m benchmarks.pipeline --sizes 0,10 --save benchmarks/baselines/local.json
+    python -m benchmarks.pipeline --compare benchmarks/baselines/local.json --max-regression 25
+"""
+import io
+import os
+import sys
+import json
+import math
+import time
+import asyncio
+import platform
+import argparse
+import tempfile
+import tracemalloc
+import contextlib
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from benchmarks.stubs import FakeChatServer, FakeDDGS, StubFootballDataServer, StubTTSModel
+from modules.instrumentation import _peak_rss_kb
+
+DEFAULT_SIZES = [0, 10, 50, 200]
+PERCENTILES = (50, 90, 99)
+# Latency changes smaller than this are noise, whatever the percentage
+NOISE_FLOOR_SECONDS = 0.005
+
+# Environment the benchmark pins (None removes the variable) so local configuration
+# such as caches or checkpoints cannot change what is measured
+_ENVIRONMENT = {
+    "FOOTBALL_DATA_API_KEY": "benchmark",
+    "FOOTBALL_DATA_CACHE": "0",
+    "FOOTBALL_DATA_RATE_LIMIT": "0",
+    "LOCAL_MODEL_NAME": "stub",
+    "OPENAI_API_KEY": "benchmark",
+    "TTS_OUTPUT_FORMAT": "wav",
+    "LLM_CACHE_DIR": None,
+    "TTS_AUDIO_CACHE_DIR": None,
+    "TTS_LOUDNESS_TARGET": None,
+    "PIPELINE_CHECKPOINT_DB": None,
+    "PODCAST_LANGUAGES": None,
+    "PODCAST_DIALOGUE": None,
+    "TTS_WARMUP": None,
+    "TTS_PROCESS_WORKERS": None,
+}
+
+
+@dataclass
+class BenchmarkConfig:
+    """What to run and how fast the stub backends are."""
+    sizes: List[int] = field(default_factory=lambda: list(DEFAULT_SIZES))
+    iterations: int = 5
+    warmup: int = 1
+    tokens_per_second: float = 400.0
+    search_latency: float = 0.05
+    fetch_latency: float = 0.05
+    tts_real_time_factor: float = 0.05
+    tts_chunked: bool = True
+    stream_tts: bool = False
+
+
+def percentile(values: List[float], q: float) -> float:
+    """The ``q``-th percentile of ``values`` with linear interpolation (0.0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def _latency(values: List[float]) -> Dict[str, float]:
+    summary = {f"p{q}": round(percentile(values, q), 4) for q in PERCENTILES}
+    summary["mean"] = round(sum(values) / len(values), 4) if values else 0.0
+    return summary
+
+
+@contextlib.contextmanager
+def stub_backends(config: BenchmarkConfig) -> Iterator[StubFootballDataServer]:
+    """Starts the stub servers and points the pipeline at them; yields the Football-Data stub."""
+    import modules.tools
+    from modules.tts import TTSManager
+
+    football = StubFootballDataServer(latency=config.fetch_latency)
+    chat = FakeChatServer(tokens_per_second=config.tokens_per_second)
+    environment = dict(_ENVIRONMENT, FOOTBALL_DATA_BASE_URL=f"{football.url}/v4",
+                       LOCAL_OPENAI_BASE_URL=f"{chat.url}/v1")
+    saved_env = {name: os.environ.get(name) for name in environment}
+    saved_tts = (TTSManager._model, TTSManager._warmup_future, TTSManager._audio_cache)
+    saved_ddgs = modules.tools._new_ddgs
+    saved_client = modules.tools._football_data_client
+
+    with football, chat:
+        try:
+            for name, value in environment.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+            # DDGS is a library, not an endpoint, so it is replaced in-process
+            modules.tools._new_ddgs = lambda: FakeDDGS(latency=config.search_latency)
+            # Rebuilt from the pinned environment, without the API quota
+            modules.tools._football_data_client = None
+            TTSManager._model = StubTTSModel(real_time_factor=config.tts_real_time_factor)
+            TTSManager._warmup_future = None
+            TTSManager._audio_cache = None
+            yield football
+        finally:
+            modules.tools._new_ddgs = saved_ddgs
+            modules.tools._football_data_client = saved_client
+            TTSManager._model, TTSManager._warmup_future, TTSManager._audio_cache = saved_tts
+            for name, value in saved_env.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+
+async def _run_once(agent, output_path: str) -> Tuple[float, List[Dict[str, Any]], Dict[str, Any]]:
+    seen = len(agent.tracer.records())
+    start = time.perf_counter()
+    state = await agent.run("Benchmark matchday", date="2025-05-18", competitions=["PL"], output_path=output_path)
+    wall = time.perf_counter() - start
+    if not state.get("audio_path"):
+        raise RuntimeError(f"Benchmark run produced no audio: {state.get('errors')}")
+    return wall, agent.tracer.records()[seen:], state
+
+
+async def benchmark_size(agent, matches: int, config: BenchmarkConfig, workdir: str) -> Dict[str, Any]:
+    """Benchmarks one matchday size; the agent must run against :func:`stub_backends`."""
+    output_path = os.path.join(workdir, f"benchmark_{matches}.wav")
+    for _ in range(config.warmup):
+        await _run_once(agent, output_path)
+
+    totals: List[float] = []
+    stages: Dict[str, List[float]] = {}
+    counters: Dict[str, float] = {}
+    audio_seconds = 0.0
+    for _ in range(config.iterations):
+        wall, records, _ = await _run_once(agent, output_path)
+        totals.append(wall)
+        counters = {}
+        for record in records:
+            stages.setdefault(record["stage"], []).append(record["wall_seconds"])
+            for name, value in record["counters"].items():
+                counters[name] = counters.get(name, 0) + value
+        audio_seconds += counters.get("audio_seconds", 0.0)
+
+    # Memory is traced in a separate run, as tracemalloc slows every allocation down
+    tracemalloc.start()
+    try:
+        await _run_once(agent, output_path)
+        _, traced_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "matches": matches,
+        "iterations": config.iterations,
+        "total": _latency(totals),
+        "stages": {stage: _latency(values) for stage, values in sorted(stages.items())},
+        "throughput": {
+            "episodes_per_minute": round(60 * len(totals) / sum(totals), 2) if totals else 0.0,
+            "audio_seconds_per_second": round(audio_seconds / sum(totals), 2) if totals else 0.0,
+        },
+        "memory": {
+            "traced_peak_mb": round(traced_peak / 1024 / 1024, 2),
+            "peak_rss_mb": round(_peak_rss_kb() / 1024, 1),
+        },
+        "counters": {name: round(value, 4) for name, value in sorted(counters.items())},
+    }
+
+
+def run_benchmarks(config: BenchmarkConfig, verbose: bool = False) -> Dict[str, Any]:
+    """Runs every configured matchday size and returns the report."""
+    from modules.langgraph_agent import FootballPodcastAgent
+
+    results = {}
+    quiet = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    with stub_backends(config) as football, tempfile.TemporaryDirectory() as workdir, quiet:
+        agent = FootballPodcastAgent(tts_chunked=config.tts_chunked, stream_tts=config.stream_tts,
+                                     warmup_tts=False, dialogue=False, languages="en")
+
+        async def run_sizes():
+            for matches in config.sizes:
+                football.matches = matches
+                results[str(matches)] = await benchmark_size(agent, matches, config, workdir)
+                print(f"--- [Benchmark] {matches} match(es) done ---", file=sys.stderr)
+
+        asyncio.run(run_sizes())
+
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": asdict(config),
+        "results": results,
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any],
+            max_regression: float) -> Tuple[List[str], List[str]]:
+    """
+    Compares the p50 latencies of ``report`` with ``baseline``.
+
+    Returns ``(lines, regressions)``: a line per size and stage with the relative
+    change, and the subset that got slower by more than ``max_regression`` percent
+    (and by more than :data:`NOISE_FLOOR_SECONDS`).
+    """
+    lines, regressions = [], []
+    for size, result in report["results"].items():
+        before = baseline.get("results", {}).get(size)
+        if before is None:
+            continue
+        pairs = [("total", result["total"], before["total"])]
+        pairs += [(stage, latency, before["stages"][stage])
+                  for stage, latency in result["stages"].items() if stage in before["stages"]]
+        for name, now, then in pairs:
+            old, new = then["p50"], now["p50"]
+            change = (new - old) / old * 100 if old else 0.0
+            line = f"{size:>5} {name:<20} {old:>9.3f}s -> {new:>9.3f}s {change:+7.1f}%"
+            lines.append(line)
+            if change > max_regression and new - old > NOISE_FLOOR_SECONDS:
+                regressions.append(line)
+    return lines, regressions
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Renders a report as a table: one row per size, then the p50 of each stage."""
+    lines = [f"{'size':>5} {'p50':>8} {'p90':>8} {'p99':>8} {'ep/min':>8} {'audio/s':>8} {'traced MB':>10} {'rss MB':>8}"]
+    for size, result in report["results"].items():
+        total, throughput, memory = result["total"], result["throughput"], result["memory"]
+        lines.append(f"{size:>5} {total['p50']:>8.3f} {total['p90']:>8.3f} {total['p99']:>8.3f} "
+                     f"{throughput['episodes_per_minute']:>8.1f} {throughput['audio_seconds_per_second']:>8.1f} "
+                     f"{memory['traced_peak_mb']:>10.2f} {memory['peak_rss_mb']:>8.1f}")
+    lines.append("")
+    lines.append("Stage p50 (s):")
+    for size, result in report["results"].items():
+        stages = ", ".join(f"{stage} {latency['p50']:.3f}" for stage, latency in result["stages"].items())
+        lines.append(f"{size:>5} {stages}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the podcast pipeline on stub backends.")
+    parser.add_argument("--sizes", type=str, default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated matchday sizes (default: 0,10,50,200)")
+    parser.add_argument("--iterations", type=int, default=5, help="Measured runs per size (default: 5)")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured runs per size (default: 1)")
+    parser.add_argument("--token-rate", type=float, default=400.0, help="Fake LLM tokens per second (default: 400)")
+    parser.add_argument("--search-latency", type=float, default=0.05, help="Fake search latency in seconds")
+    parser.add_argument("--fetch-latency", type=float, default=0.05, help="Stub Football-Data latency in seconds")
+    parser.add_argument("--rtf", type=float, default=0.05, help="Stub TTS real-time factor (default: 0.05)")
+    parser.add_argument("--stream-tts", action="store_true", help="Stream LLM tokens into TTS")
+    parser.add_argument("--save", type=str, help="Write the JSON report to this path")
+    parser.add_argument("--compare", type=str, help="Compare against a saved JSON report")
+    parser.add_argument("--max-regression", type=float, default=20.0,
+                        help="With --compare, exit 1 when a p50 got slower by more than this percentage")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline's own output")
+    args = parser.parse_args(argv)
+
+    config = BenchmarkConfig(
+        sizes=[int(size) for size in args.sizes.split(",") if size.strip()],
+        iterations=args.iterations, warmup=args.warmup, tokens_per_second=args.token_rate,
+        search_latency=args.search_latency, fetch_latency=args.fetch_latency,
+        tts_real_time_factor=args.rtf, stream_tts=args.stream_tts,
+    )
+    report = run_benchmarks(config, verbose=args.verbose)
+    print(format_report(report))
+
+    if args.save:
+        directory = os.path.dirname(args.save)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        lines, regressions = compare(report, baseline, args.max_regression)
+        print(f"\nCompared with {args.compare}:")
+        print("\n".join(lines))
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.max_regression:.0f}%:")
+            print("\n".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,397 @@
+"""
+Deterministic local stand-ins for the pipeline's backends.
+
+* :class:`StubFootballDataServer` - Football-Data.org ``/matches`` over HTTP
+* :class:`FakeChatServer` - OpenAI-compatible ``/chat/completions`` (plain and streaming)
+  emitting tokens at a fixed rate
+* :class:`FakeDDGS` - DuckDuckGo search session with a fixed latency
+* :class:`StubTTSModel` - Chatterbox-like model with a fixed real-time factor
+* :class:`CPUBoundTTSModel` - Chatterbox-like model doing GIL-bound Python work
+* :class:`VoiceCloningTTSModel` - Chatterbox-like model embedding reference clips
+
+Everything derives from the request contents, so repeated runs do identical work.
+"""
+import os
+import re
+import json
+import zlib
+import time
+import wave
+import threading
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+_MATCH_LINE = re.compile(r"Match: (.+?) vs (.+?)\. Result: ([^.]+)\.")
+
+
+class _StubServer:
+    """Runs a ThreadingHTTPServer on a free local port in a daemon thread."""
+
+    def __init__(self, handler):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self.requests = 0
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class _QuietHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload: Dict[str, Any], status: int = 200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def fake_matches(count: int, date: str) -> List[Dict[str, Any]]:
+    """``count`` finished matches in the Football-Data.org response shape."""
+    return [
+        {
+            "id": 100000 + i,
+            "utcDate": f"{date}T{12 + i % 10:02d}:00:00Z",
+            "status": "FINISHED",
+            "competition": {"name": "Premier League"},
+            "homeTeam": {"name": f"Home Club {i}"},
+            "awayTeam": {"name": f"Away Club {i}"},
+            "score": {"fullTime": {"home": i % 4, "away": (i * 7) % 3}},
+            # Fields the pipeline drops, kept for a realistic payload size
+            "referees": [{"id": i, "name": f"Referee {i}", "type": "REFEREE"}],
+            "odds": {"msg": "Activate Odds-Package in User-Panel to retrieve odds."},
+        }
+        for i in range(count)
+    ]
+
+
+class _FootballDataHandler(_QuietHandler):
+    def do_GET(self):
+        stub = self.server.stub
+        stub.requests += 1
+        url = urlparse(self.path)
+        if not url.path.endswith("/matches"):
+            self._send_json({"message": "not found"}, status=404)
+            return
+        date = parse_qs(url.query).get("dateFrom", ["2025-05-18"])[0]
+        time.sleep(stub.latency)
+        matches = fake_matches(stub.matches, date)
+        self._send_json({"filters": {}, "resultSet": {"count": len(matches)}, "matches": matches})
+
+
+class StubFootballDataServer(_StubServer):
+    """
+    Serves ``matches`` fake matches for any date. Point the pipeline at it with
+    ``FOOTBALL_DATA_BASE_URL=<url>/v4``.
+    """
+
+    def __init__(self, matches: int = 10, latency: float = 0.05):
+        super().__init__(_FootballDataHandler)
+        self.matches = matches
+        self.latency = latency
+
+
+def fake_script(prompt: str) -> str:
+    """One sentence per match mentioned in the prompt (or a quiet-day line), in <script> tags."""
+    lines = [f"{home} played {away} and it finished {score}." for home, away, score in _MATCH_LINE.findall(prompt)]
+    body = " ".join(lines) if lines else "It's a quiet day in football with no matches to report."
+    return f"<think>Outline the round.</think><script>Welcome to the football podcast. {body} See you next time.</script>"
+
+
+class _ChatHandler(_QuietHandler):
+    protocol_version = "HTTP/1.0"
+
+    def do_POST(self):
+        stub = self.server.stub
+        stub.requests += 1
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        prompt = "\n".join(str(m.get("content", "")) for m in request.get("messages", []))
+        tokens = re.findall(r"\S+\s*", fake_script(prompt))
+        usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(tokens),
+                 "total_tokens": len(prompt) // 4 + len(tokens)}
+        delay = 1.0 / stub.tokens_per_second
+        created = int(time.time())
+
+        if not request.get("stream"):
+            time.sleep(delay * len(tokens))
+            self._send_json({
+                "id": "chatcmpl-stub", "object": "chat.completion", "created": created, "model": request.get("model"),
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": "".join(tokens)}}],
+                "usage": usage,
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+
+        def event(delta, finish_reason=None, **extra):
+            chunk = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": created,
+                     "model": request.get("model"),
+                     "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}], **extra}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        event({"role": "assistant", "content": ""})
+        for token in tokens:
+            time.sleep(delay)
+            event({"content": token})
+        event({}, finish_reason="stop", usage=usage)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+class FakeChatServer(_StubServer):
+    """
+    OpenAI-compatible chat endpoint producing :func:`fake_script` at
+    ``tokens_per_second``. Point the pipeline at it with ``LOCAL_OPENAI_BASE_URL=<url>/v1``.
+    """
+
+    def __init__(self, tokens_per_second: float = 400.0):
+        super().__init__(_ChatHandler)
+        self.tokens_per_second = tokens_per_second
+
+
+class FakeDDGS:
+    """DDGS-compatible session returning fixed results after ``latency`` seconds per query."""
+
+    def __init__(self, latency: float = 0.05, results: int = 3):
+        self.latency = latency
+        self.results = results
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def news(self, query: str, max_results: int = 3):
+        time.sleep(self.latency)
+        return [{"title": f"{query} headline {i}", "body": f"Report {i} on {query}."}
+                for i in range(min(max_results, self.results))]
+
+    def text(self, query: str, max_results: int = 3):
+        return []
+
+
+class StubTTSModel:
+    """
+    Chatterbox-like model: ``generate`` returns ``seconds_per_char`` of low-level
+    noise per character and takes ``real_time_factor`` times that long.
+    """
+
+    def __init__(self, real_time_factor: float = 0.05, sr: int = 24000, seconds_per_char: float = 0.06):
+        self.real_time_factor = real_time_factor
+        self.sr = sr
+        self.seconds_per_char = seconds_per_char
+
+    def generate(self, text: str, **kwargs):
+        audio_seconds = len(text) * self.seconds_per_char
+        time.sleep(audio_seconds * self.real_time_factor)
+        samples = int(audio_seconds * self.sr)
+        rng = np.random.default_rng(len(text))
+        return (rng.standard_normal((1, samples)) * 0.05).astype(np.float32)
+
+
+class TinyTTSModel:
+    """
+    A tiny numpy text-to-speech network with Chatterbox's calling conventions,
+    for CPU benchmarks of per-call versus batched synthesis.
+
+    As with Chatterbox, every ``generate`` call sets up its tokenizer table and
+    encodes the voice conditionals (the prefix the decoder is conditioned on)
+    before decoding the text. ``generate_batch`` does both once and decodes all
+    texts of a batch as one padded matrix. Output is ``frame`` samples per character.
+    """
+
+    def __init__(self, hidden: int = 128, frame: int = 240, prompt_frames: int = 150, layers: int = 2,
+                 sr: int = 24000, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.sr = sr
+        self.frame = frame
+        self.prompt_frames = prompt_frames
+        self.embedding = (rng.standard_normal((256, hidden)) * 0.1).astype(np.float32)
+        self.layers = [(rng.standard_normal((hidden, hidden)) / np.sqrt(hidden)).astype(np.float32)
+                       for _ in range(layers)]
+        self.cond_proj = (rng.standard_normal((frame, hidden)) / np.sqrt(frame)).astype(np.float32)
+        self.out = (rng.standard_normal((hidden, frame)) / np.sqrt(hidden)).astype(np.float32)
+        self.conds = (rng.standard_normal((prompt_frames, frame)) * 0.1).astype(np.float32)
+
+    def prepare_conditionals(self, audio_prompt_path: str, **kwargs):
+        rng = np.random.default_rng(sum(audio_prompt_path.encode("utf-8")))
+        self.conds = (rng.standard_normal((self.prompt_frames, self.frame)) * 0.1).astype(np.float32)
+
+    @staticmethod
+    def _tokenizer() -> Dict[str, int]:
+        return {chr(code): code % 256 for code in range(0x250)}
+
+    def _encode_conditionals(self) -> np.ndarray:
+        h = np.tanh(self.conds @ self.cond_proj)
+        for weights in self.layers:
+            h = np.tanh(h @ weights)
+        return h.mean(axis=0)
+
+    def _decode(self, tokens: np.ndarray, speaker: np.ndarray) -> np.ndarray:
+        h = self.embedding[tokens] + speaker
+        for weights in self.layers:
+            h = np.tanh(h @ weights)
+        return (h @ self.out) * 0.1
+
+    def generate(self, text: str, **kwargs):
+        table = self._tokenizer()
+        speaker = self._encode_conditionals()
+        tokens = np.array([[table.get(char, 0) for char in text]])
+        return self._decode(tokens, speaker).reshape(1, -1)
+
+    def generate_batch(self, texts: List[str], **kwargs):
+        table = self._tokenizer()
+        speaker = self._encode_conditionals()
+        tokens = np.zeros((len(texts), max(len(text) for text in texts)), dtype=np.int64)
+        for row, text in enumerate(texts):
+            tokens[row, :len(text)] = [table.get(char, 0) for char in text]
+        frames = self._decode(tokens, speaker)
+        return [frames[row, :len(text)].reshape(1, -1) for row, text in enumerate(texts)]
+
+
+class CPUBoundTTSModel:
+    """
+    Chatterbox-like model whose synthesis is pure-Python CPU work holding the GIL
+    (``work_per_char`` loop steps per character), like the token-by-token sampling
+    loop of an autoregressive model: threads cannot run it in parallel, processes can.
+    The noise it returns is seeded by the text, so every text has its own audio.
+
+    For crash-recovery tests, the text ``"!crash"`` kills the calling process, and
+    ``"!crash-once:<path>"`` does so only if ``<path>`` does not exist yet (creating it).
+    ``load_seconds`` stands in for the time a real model takes to load.
+    """
+
+    def __init__(self, sr: int = 24000, seconds_per_char: float = 0.06, work_per_char: int = 2000,
+                 load_seconds: float = 0.0):
+        time.sleep(load_seconds)
+        self.sr = sr
+        self.seconds_per_char = seconds_per_char
+        self.work_per_char = work_per_char
+
+    def generate(self, text: str, **kwargs):
+        if text.startswith("!crash"):
+            marker = text.partition(":")[2]
+            if not marker or not os.path.exists(marker):
+                if marker:
+                    open(marker, "w").close()
+                os._exit(1)
+        state = 0
+        for step in range(len(text) * self.work_per_char):
+            state = (state * 31 + step) % 1000003
+        samples = int(len(text) * self.seconds_per_char * self.sr)
+        rng = np.random.default_rng(zlib.crc32(text.encode("utf-8")))
+        return (rng.standard_normal((1, samples)) * 0.05).astype(np.float32)
+
+
+def write_reference_clip(path: str, seconds: float = 6.0, sr: int = 16000, seed: int = 0) -> str:
+    """Writes a voice-like 16-bit mono WAV (a gliding harmonic tone plus breath noise) to ``path``."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+    pitch = 110 + 20 * seed % 90 + 15 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sr
+    audio = sum(np.sin(k * phase) / k for k in range(1, 6)) * 0.2 + rng.standard_normal(t.size) * 0.01
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sr)
+        wf.writeframes((np.clip(audio, -1, 1) * 32767).astype("<i2").tobytes())
+    return path
+
+
+@dataclass
+class StubT3Cond:
+    """Shaped like Chatterbox's ``T3Cond``."""
+    speaker_emb: np.ndarray
+    cond_prompt_speech_tokens: np.ndarray
+    emotion_adv: float = 0.5
+
+
+@dataclass
+class StubConditionals:
+    """Shaped like Chatterbox's ``Conditionals``: a ``t3`` dataclass and a ``gen`` dict of arrays."""
+    t3: StubT3Cond
+    gen: Dict[str, np.ndarray]
+
+
+class VoiceCloningTTSModel:
+    """
+    Chatterbox-like model with voice cloning, for benchmarks of voice conditioning.
+
+    ``prepare_conditionals`` reads the reference clip and embeds it the way
+    Chatterbox does in outline: log-mel features, a speaker embedding from an
+    encoder network run over every frame, and discrete prompt tokens, stored in
+    ``conds`` (see :class:`StubConditionals`). ``encoder_passes`` sets how often
+    the encoder layers run, i.e. the cost of conditioning. ``generate`` accepts
+    ``audio_prompt_path`` and re-conditions on it, as Chatterbox does, and its
+    output is scaled by the speaker embedding, so the audio identifies the voice.
+    """
+
+    def __init__(self, sr: int = 24000, n_mels: int = 80, hidden: int = 256, encoder_passes: int = 8,
+                 seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.sr = sr
+        self.n_fft, self.hop = 400, 160
+        self.encoder_passes = encoder_passes
+        self.mel_basis = np.abs(rng.standard_normal((self.n_fft // 2 + 1, n_mels))).astype(np.float32) / n_mels
+        self.input_proj = (rng.standard_normal((n_mels, hidden)) / np.sqrt(n_mels)).astype(np.float32)
+        self.layers = [(rng.standard_normal((hidden, hidden)) / np.sqrt(hidden)).astype(np.float32)
+                       for _ in range(3)]
+        # Built-in voice
+        self.conds = self._embed((rng.standard_normal(16000 * 3) * 0.1).astype(np.float32))
+
+    def _embed(self, audio: np.ndarray) -> StubConditionals:
+        frames = np.lib.stride_tricks.sliding_window_view(audio, self.n_fft)[::self.hop]
+        power = np.abs(np.fft.rfft(frames * np.hanning(self.n_fft), axis=1)) ** 2
+        mel = np.log(power @ self.mel_basis + 1e-6).astype(np.float32)
+        h = np.tanh((mel - mel.mean()) / (mel.std() + 1e-6) @ self.input_proj)
+        for _ in range(self.encoder_passes):
+            for weights in self.layers:
+                h = np.tanh(h @ weights)
+        speaker = h.mean(axis=0, keepdims=True)
+        tokens = np.argmax(h[:, :64], axis=1)[None].astype(np.int64)
+        return StubConditionals(StubT3Cond(speaker, tokens),
+                                {"prompt_feat": mel[None], "embedding": speaker[:, :192].copy()})
+
+    def prepare_conditionals(self, wav_fpath: str, exaggeration: float = 0.5):
+        with wave.open(wav_fpath, "rb") as wf:
+            audio = np.frombuffer(wf.readframes(wf.getnframes()), dtype="<i2").astype(np.float32) / 32767.0
+        self.conds = self._embed(audio)
+        self.conds.t3.emotion_adv = exaggeration
+
+    def generate(self, text: str, audio_prompt_path: str = None, **kwargs):
+        if audio_prompt_path:
+            self.prepare_conditionals(audio_prompt_path)
+        level = float(np.abs(self.conds.t3.speaker_emb).mean())
+        samples = int(len(text) * 0.06 * self.sr)
+        rng = np.random.default_rng(zlib.crc32(text.encode("utf-8")))
+        return (rng.standard_normal((1, samples)) * level).astype(np.float32)
@@ -0,0 +1,127 @@
+"""
+CPU benchmark of per-call versus batched synthesis of short segments.
+
+Synthesizes the same short podcast segments (score lines, headlines,
+transitions) with :class:`benchmarks.stubs.TinyTTSModel` three ways:
+
+* ``per_call``   - one ``TTSManager.generate_audio`` call (and file) per segment
+* ``one_pass``   - ``TTSManager.generate_batch`` with batches of one text
+* ``batched``    - ``TTSManager.generate_batch`` with length-bucketed batches
+
+    python -m benchmarks.tts_batch --segments 64 --batch-size 8
+"""
+import io
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import contextlib
+from typing import Any, Dict, List, Optional
+
+from benchmarks.stubs import TinyTTSModel
+
+_TEMPLATES = [
+    "{home} {h}, {away} {a}.",
+    "Full time at {home}: {home} {h}, {away} {a}.",
+    "Next up, {away} travel to {home}.",
+    "Headline: {home} stun {away} with a late winner.",
+    "And now to the {league}.",
+    "{home} keep pace at the top after beating {away} {h} to {a} in front of a sold-out crowd.",
+]
+_TEAMS = ["Arsenal", "Chelsea", "Everton", "Fulham", "Leeds", "Burnley", "Sevilla", "Betis", "Inter", "Milan"]
+_LEAGUES = ["Premier League", "La Liga", "Serie A"]
+
+
+def sample_segments(count: int) -> List[str]:
+    """``count`` deterministic short segments of mixed length."""
+    return [
+        _TEMPLATES[i % len(_TEMPLATES)].format(home=_TEAMS[i % len(_TEAMS)], away=_TEAMS[(i * 3 + 1) % len(_TEAMS)],
+                                               h=i % 4, a=(i * 7) % 3, league=_LEAGUES[i % len(_LEAGUES)])
+        for i in range(count)
+    ]
+
+
+async def _per_call(texts: List[str], workdir: str):
+    from modules.tts import TTSManager
+
+    for i, text in enumerate(texts):
+        await TTSManager.generate_audio(text, file_name=os.path.join(workdir, f"segment_{i}.wav"))
+
+
+async def _batched(texts: List[str], batch_size: int, threads: Optional[int]):
+    from modules.tts import TTSManager
+
+    await TTSManager.generate_batch(texts, max_batch_size=batch_size, threads=threads)
+
+
+def run_benchmark(segments: int = 64, batch_size: int = 8, repeat: int = 3, threads: Optional[int] = None,
+                  model=None) -> Dict[str, Any]:
+    """Returns the best-of-``repeat`` time and throughput of each mode."""
+    from modules.tts import TTSManager
+
+    texts = sample_segments(segments)
+    model = model or TinyTTSModel()
+    audio_seconds = sum(len(text) for text in texts) * model.frame / model.sr
+    modes = {
+        "per_call": lambda workdir: _per_call(texts, workdir),
+        "one_pass": lambda workdir: _batched(texts, 1, threads),
+        "batched": lambda workdir: _batched(texts, batch_size, threads),
+    }
+
+    saved = (TTSManager._model, TTSManager._warmup_future, os.environ.pop("TTS_AUDIO_CACHE_DIR", None))
+    results = {}
+    try:
+        TTSManager._model, TTSManager._warmup_future = model, None
+        with tempfile.TemporaryDirectory() as workdir, contextlib.redirect_stdout(io.StringIO()):
+            for name, mode in modes.items():
+                best = float("inf")
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    asyncio.run(mode(workdir))
+                    best = min(best, time.perf_counter() - start)
+                results[name] = {
+                    "seconds": round(best, 4),
+                    "texts_per_second": round(len(texts) / best, 1),
+                    "audio_seconds_per_second": round(audio_seconds / best, 1),
+                }
+    finally:
+        TTSManager._model, TTSManager._warmup_future, cache_dir = saved
+        if cache_dir is not None:
+            os.environ["TTS_AUDIO_CACHE_DIR"] = cache_dir
+
+    return {
+        "segments": segments,
+        "batch_size": batch_size,
+        "mean_chars": round(sum(map(len, texts)) / len(texts), 1),
+        "results": results,
+        "speedup": round(results["per_call"]["seconds"] / results["batched"]["seconds"], 2),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare per-call and batched TTS on a tiny CPU model.")
+    parser.add_argument("--segments", type=int, default=64, help="Short segments to synthesize (default: 64)")
+    parser.add_argument("--batch-size", type=int, default=8, help="Texts per batch (default: 8)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode; the best is reported (default: 3)")
+    parser.add_argument("--threads", type=int, help="Intra-op CPU threads (torch models only)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.segments, args.batch_size, args.repeat, args.threads)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    print(f"{report['segments']} segments, {report['mean_chars']} chars on average, batch size {report['batch_size']}")
+    print(f"{'mode':<10} {'seconds':>8} {'texts/s':>9} {'audio s/s':>10}")
+    for name, result in report["results"].items():
+        print(f"{name:<10} {result['seconds']:>8.3f} {result['texts_per_second']:>9.1f} "
+              f"{result['audio_seconds_per_second']:>10.1f}")
+    print(f"Batched is {report['speedup']:.2f}x faster than per-call synthesis")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Scaling benchmark of the multi-process TTS backend.
+
+Synthesizes the same segments with :class:`benchmarks.stubs.CPUBoundTTSModel`
+(GIL-bound Python work, like an autoregressive sampling loop) for 1..N workers:
+
+* ``threads``   - one in-process model behind N threads, as ``TTSManager`` does
+* ``processes`` - :class:`modules.tts_pool.TTSProcessPool` with N worker processes
+
+and reports audio seconds synthesized per wall-clock second. Worker start-up
+(spawning and loading the model) is timed separately, since it is paid once.
+
+    python -m benchmarks.tts_pool --max-workers 4 --segments 32
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import functools
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from benchmarks.stubs import CPUBoundTTSModel
+from benchmarks.tts_batch import sample_segments
+
+
+def _threads(texts: List[str], workers: int, work_per_char: int) -> Dict[str, float]:
+    model = CPUBoundTTSModel(work_per_char=work_per_char)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        frames = sum(samples.size for samples in executor.map(model.generate, texts))
+    return {"startup_seconds": 0.0, "seconds": time.perf_counter() - start, "audio_seconds": frames / model.sr}
+
+
+def _processes(texts: List[str], workers: int, work_per_char: int) -> Dict[str, float]:
+    from modules.tts_pool import TTSProcessPool
+
+    factory = functools.partial(CPUBoundTTSModel, work_per_char=work_per_char)
+    start = time.perf_counter()
+    # The stub model is small, so only the worker count is capped here, not by RAM
+    with TTSProcessPool(workers=workers, model_factory=factory, threads_per_worker=1, worker_memory_mb=0) as pool:
+        startup = time.perf_counter() - start
+        start = time.perf_counter()
+        futures = [pool.submit(text) for text in texts]
+        frames = sum(future.result().size for future in futures)
+        elapsed = time.perf_counter() - start
+    return {"startup_seconds": startup, "seconds": elapsed, "audio_seconds": frames / pool.sr}
+
+
+def run_benchmark(segments: int = 32, max_workers: Optional[int] = None, work_per_char: int = 2000,
+                  modes: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Returns throughput per mode and worker count, with the speedup over one worker."""
+    texts = sample_segments(segments)
+    max_workers = max_workers or max(2, os.cpu_count() or 1)
+    runners = {"threads": _threads, "processes": _processes}
+    results: Dict[str, Dict[str, Any]] = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for mode in modes or list(runners):
+            results[mode] = {}
+            for workers in range(1, max_workers + 1):
+                run = runners[mode](texts, workers, work_per_char)
+                results[mode][str(workers)] = {
+                    "startup_seconds": round(run["startup_seconds"], 3),
+                    "seconds": round(run["seconds"], 3),
+                    "audio_seconds_per_second": round(run["audio_seconds"] / run["seconds"], 1),
+                }
+            single = results[mode]["1"]["audio_seconds_per_second"]
+            for result in results[mode].values():
+                result["speedup"] = round(result["audio_seconds_per_second"] / single, 2)
+    return {"segments": segments, "cpus": os.cpu_count(), "work_per_char": work_per_char, "results": results}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Scale the multi-process TTS backend from 1 to N workers.")
+    parser.add_argument("--segments", type=int, default=32, help="Segments to synthesize per run (default: 32)")
+    parser.add_argument("--max-workers", type=int,
+                        help="Largest worker count to measure (default: the number of cores, at least 2)")
+    parser.add_argument("--work-per-char", type=int, default=2000,
+                        help="Python loop steps per character of the stub model (default: 2000)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.segments, args.max_workers, args.work_per_char)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    print(f"{report['segments']} segments on {report['cpus']} CPU(s)")
+    print(f"{'mode':<10} {'workers':>7} {'startup s':>10} {'seconds':>8} {'audio s/s':>10} {'speedup':>8}")
+    for mode, runs in report["results"].items():
+        for workers, result in runs.items():
+            print(f"{mode:<10} {workers:>7} {result['startup_seconds']:>10.2f} {result['seconds']:>8.3f} "
+                  f"{result['audio_seconds_per_second']:>10.1f} {result['speedup']:>7.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Benchmark of cold versus cached voice conditioning.
+
+Conditions :class:`benchmarks.stubs.VoiceCloningTTSModel` on a reference clip:
+
+* ``cold``          - embed the clip (first use, the conditionals are persisted)
+* ``disk``          - load the persisted conditionals (a later run, ``TTS_VOICE_CACHE_DIR``)
+* ``memory``        - reuse the voice view of this process
+
+and times a few sentences synthesized the Chatterbox way (``audio_prompt_path``
+on every ``generate`` call, re-embedding the clip each time) against the same
+sentences in a registered voice.
+
+    python -m benchmarks.voice_conditioning --sentences 8 --encoder-passes 8
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import contextlib
+from typing import Any, Dict, List, Optional
+
+from benchmarks.stubs import VoiceCloningTTSModel, write_reference_clip
+from benchmarks.tts_batch import sample_segments
+
+
+def _best(run, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(sentences: int = 8, repeat: int = 3, encoder_passes: int = 8,
+                  clip_seconds: float = 6.0) -> Dict[str, Any]:
+    """Returns the best-of-``repeat`` conditioning and synthesis times."""
+    from modules.tts import TTSManager
+
+    model = VoiceCloningTTSModel(encoder_passes=encoder_passes)
+    texts = sample_segments(sentences)
+    saved = (TTSManager._model, TTSManager._warmup_future, TTSManager._voices, TTSManager._voice_registry,
+             TTSManager._voice_cache, os.environ.get("TTS_VOICE_CACHE_DIR"))
+    try:
+        TTSManager._model, TTSManager._warmup_future = model, None
+        TTSManager._voice_registry = {}
+        with tempfile.TemporaryDirectory() as workdir, contextlib.redirect_stdout(io.StringIO()):
+            clip = write_reference_clip(os.path.join(workdir, "host.wav"), seconds=clip_seconds)
+            os.environ["TTS_VOICE_CACHE_DIR"] = os.path.join(workdir, "voices")
+            TTSManager.register_voice("host", clip)
+            voice_dir = TTSManager.get_voice_cache().cache_dir
+
+            def cold():
+                TTSManager._voices = {}
+                for name in os.listdir(voice_dir):
+                    os.remove(os.path.join(voice_dir, name))
+                TTSManager.get_voice(model, "host")
+
+            def disk():
+                TTSManager._voices = {}
+                TTSManager.get_voice(model, "host")
+
+            conditioning = {
+                "cold": _best(cold, repeat),
+                "disk": _best(disk, repeat),
+                "memory": _best(lambda: TTSManager.get_voice(model, "host"), repeat),
+            }
+            voice = TTSManager.get_voice(model, "host")
+            synthesis = {
+                "audio_prompt_per_call": _best(lambda: [model.generate(text, audio_prompt_path=clip)
+                                                        for text in texts], repeat),
+                "registered_voice": _best(lambda: [voice.generate(text) for text in texts], repeat),
+            }
+    finally:
+        (TTSManager._model, TTSManager._warmup_future, TTSManager._voices, TTSManager._voice_registry,
+         TTSManager._voice_cache, cache_dir) = saved
+        if cache_dir is None:
+            os.environ.pop("TTS_VOICE_CACHE_DIR", None)
+        else:
+            os.environ["TTS_VOICE_CACHE_DIR"] = cache_dir
+
+    return {
+        "sentences": sentences,
+        "clip_seconds": clip_seconds,
+        "encoder_passes": encoder_passes,
+        "conditioning_seconds": {mode: round(seconds, 5) for mode, seconds in conditioning.items()},
+        "synthesis_seconds": {mode: round(seconds, 4) for mode, seconds in synthesis.items()},
+        "disk_speedup": round(conditioning["cold"] / conditioning["disk"], 1),
+        "synthesis_speedup": round(synthesis["audio_prompt_per_call"] / synthesis["registered_voice"], 1),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare cold and cached voice conditioning on a stub model.")
+    parser.add_argument("--sentences", type=int, default=8, help="Sentences synthesized per run (default: 8)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode; the best is reported (default: 3)")
+    parser.add_argument("--encoder-passes", type=int, default=8,
+                        help="Speaker encoder passes of the stub model, i.e. the conditioning cost (default: 8)")
+    parser.add_argument("--clip-seconds", type=float, default=6.0, help="Reference clip length (default: 6)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.sentences, args.repeat, args.encoder_passes, args.clip_seconds)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    print(f"Voice conditioning on a {report['clip_seconds']:.0f}s clip")
+    for mode, seconds in report["conditioning_seconds"].items():
+        print(f"  {mode:<8} {seconds * 1000:>9.2f} ms")
+    print(f"Loading persisted conditionals is {report['disk_speedup']:.1f}x faster than embedding the clip")
+    print(f"{report['sentences']} sentences")
+    for mode, seconds in report["synthesis_seconds"].items():
+        print(f"  {mode:<22} {seconds:>7.3f} s")
+    print(f"A registered voice synthesizes {report['synthesis_speedup']:.1f}x faster than audio_prompt_path per call")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
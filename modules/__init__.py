@@ -1 +1,11 @@
-from . import tools
+import importlib
+
+# Submodules are loaded on first attribute access (e.g. ``modules.tools``) so that
+# ``import modules`` pulls in no third-party dependencies and has no side effects.
+__all__ = ["audio_writer", "batch", "cache", "constants", "context", "dialogue", "http_client", "instrumentation", "langgraph_agent", "live", "models", "multilingual", "server", "streaming", "tools", "tts", "tts_pool", "utils"]
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
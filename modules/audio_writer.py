@@ -0,0 +1,294 @@
+import os
+import shutil
+import tempfile
+import subprocess
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import List, Optional
+
+import numpy as np
+
+from modules.constants import (
+    AUDIO_BITRATES,
+    AUDIO_LOUDNESS_BLOCK_MS,
+    AUDIO_LOUDNESS_GATE_DB,
+    AUDIO_LOUDNESS_MAX_GAIN_DB,
+    AUDIO_LOUDNESS_WINDOW_SECONDS,
+    AUDIO_PEAK_CEILING_DB,
+    TTS_OUTPUT_FORMAT,
+)
+from modules.utils import WaveStreamWriter
+
+# Output formats by file extension and the ffmpeg codec encoding them
+_FFMPEG_CODECS = {"flac": "flac", "opus": "libopus", "mp3": "libmp3lame"}
+_EXTENSIONS = {".wav": "wav", ".flac": "flac", ".opus": "opus", ".ogg": "opus", ".mp3": "mp3"}
+
+
+def to_pcm16(samples: np.ndarray) -> bytes:
+    """Converts float samples in [-1, 1] to little-endian 16-bit PCM."""
+    return (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2").tobytes()
+
+
+def _db_to_gain(db: float) -> float:
+    return float(10.0 ** (db / 20.0))
+
+
+def _ffmpeg_binary() -> Optional[str]:
+    return shutil.which(os.getenv("FFMPEG_BINARY", "ffmpeg"))
+
+
+def _has_soundfile() -> bool:
+    try:
+        import soundfile  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def output_format() -> str:
+    """The configured output format (``TTS_OUTPUT_FORMAT``, default ``wav``)."""
+    fmt = os.getenv("TTS_OUTPUT_FORMAT", TTS_OUTPUT_FORMAT).lower().lstrip(".")
+    if fmt not in _FFMPEG_CODECS and fmt != "wav":
+        raise ValueError(f"Unsupported output format {fmt!r}; choose from {['wav', *_FFMPEG_CODECS]}")
+    return fmt
+
+
+def available_formats() -> List[str]:
+    """Formats that can be encoded here: WAV always, FLAC with soundfile or ffmpeg, Opus/MP3 with ffmpeg."""
+    formats = ["wav"]
+    if _has_soundfile() or _ffmpeg_binary():
+        formats.append("flac")
+    if _ffmpeg_binary():
+        formats.extend(["opus", "mp3"])
+    return formats
+
+
+class LoudnessNormalizer:
+    """
+    Streaming loudness normalization in constant memory.
+
+    The signal is processed in blocks of ``block_ms``. The loudness of each block
+    is its mean square in dB; blocks below ``gate_db`` (silence) are ignored, as
+    with the absolute gate of EBU R128, but no K-weighting is applied, so levels
+    approximate LUFS for speech. The gain that brings the last ``window_seconds``
+    of gated blocks to ``target_db`` is limited to ``max_gain_db`` and capped so
+    the block peak stays under ``ceiling_db``. The gain ramps linearly from
+    block to block, so there are no audible steps.
+
+    Only the current partial block and the energies of one window are kept.
+    The output therefore trails the input by less than one block.
+    """
+
+    def __init__(self, sample_rate: int, target_db: float, window_seconds: float = AUDIO_LOUDNESS_WINDOW_SECONDS,
+                 block_ms: int = AUDIO_LOUDNESS_BLOCK_MS, max_gain_db: float = AUDIO_LOUDNESS_MAX_GAIN_DB,
+                 ceiling_db: float = AUDIO_PEAK_CEILING_DB, gate_db: float = AUDIO_LOUDNESS_GATE_DB):
+        self.target_db = target_db
+        self.block = max(1, int(sample_rate * block_ms / 1000))
+        self.max_gain_db = max_gain_db
+        self.ceiling = _db_to_gain(ceiling_db)
+        self.gate = 10.0 ** (gate_db / 10.0)
+        self._energies = deque(maxlen=max(1, int(window_seconds * 1000 / block_ms)))
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._gain = 1.0
+
+    def _apply(self, block: np.ndarray) -> np.ndarray:
+        energy = float(np.mean(np.square(block, dtype=np.float64))) if len(block) else 0.0
+        if energy > self.gate:
+            self._energies.append(energy)
+        gain = self._gain
+        if self._energies:
+            loudness_db = 10.0 * np.log10(sum(self._energies) / len(self._energies))
+            gain = _db_to_gain(float(np.clip(self.target_db - loudness_db, -self.max_gain_db, self.max_gain_db)))
+        start = self._gain
+        peak = float(np.max(np.abs(block))) if len(block) else 0.0
+        if peak * gain > self.ceiling:
+            # Limit without overshooting at the start of the ramp either
+            gain = self.ceiling / peak
+            start = min(start, gain)
+        ramp = np.linspace(start, gain, len(block), dtype=np.float32)
+        self._gain = gain
+        return np.clip(block * ramp, -self.ceiling, self.ceiling)
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Returns the normalized audio of every complete block seen so far."""
+        if len(self._pending):
+            samples = np.concatenate([self._pending, samples])
+        complete = len(samples) - len(samples) % self.block
+        self._pending = samples[complete:].copy()
+        if not complete:
+            return samples[:0]
+        blocks = samples[:complete].reshape(-1, self.block)
+        return np.concatenate([self._apply(block) for block in blocks])
+
+    def flush(self) -> np.ndarray:
+        """Returns the normalized remainder (a partial block)."""
+        tail, self._pending = self._pending, np.zeros(0, dtype=np.float32)
+        return self._apply(tail) if len(tail) else tail
+
+
+class AudioWriter(ABC):
+    """
+    Encodes mono float32 audio to a file chunk by chunk.
+
+    Subclasses implement one encoder. Nothing but the chunk being written (and,
+    with a normalizer, one block) is held in memory, so memory use does not grow
+    with episode length. Use :func:`open_audio_writer` to pick the encoder from
+    the file extension.
+
+    Args:
+        filename (str): Output path.
+        rate (int): Sample rate.
+        normalizer (LoudnessNormalizer, optional): Applied to the audio before encoding.
+    """
+    format = ""
+
+    def __init__(self, filename: str, rate: int, normalizer: Optional[LoudnessNormalizer] = None):
+        self.filename = filename
+        self.rate = rate
+        self.normalizer = normalizer
+        self.frames_written = 0
+        self._closed = False
+
+    @abstractmethod
+    def _encode(self, pcm: bytes):
+        """Encodes a chunk of 16-bit PCM."""
+
+    @abstractmethod
+    def _finish(self):
+        """Finalizes the file once the last chunk is encoded."""
+
+    def write(self, samples: np.ndarray):
+        """Appends float samples in [-1, 1]."""
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        if self.normalizer is not None:
+            samples = self.normalizer.process(samples)
+        if len(samples):
+            self._encode(to_pcm16(samples))
+            self.frames_written += len(samples)
+
+    @property
+    def seconds_written(self) -> float:
+        return self.frames_written / self.rate
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if self.normalizer is not None:
+                tail = self.normalizer.flush()
+                if len(tail):
+                    self._encode(to_pcm16(tail))
+                    self.frames_written += len(tail)
+        finally:
+            self._finish()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class WavAudioWriter(AudioWriter):
+    """16-bit PCM WAV through the standard library."""
+    format = "wav"
+
+    def __init__(self, filename: str, rate: int, normalizer: Optional[LoudnessNormalizer] = None):
+        super().__init__(filename, rate, normalizer)
+        self._writer = WaveStreamWriter(filename, rate=rate)
+
+    def _encode(self, pcm: bytes):
+        self._writer.write(pcm)
+
+    def _finish(self):
+        self._writer.close()
+
+
+class SoundFileAudioWriter(AudioWriter):
+    """FLAC through libsndfile (the optional ``soundfile`` package)."""
+    format = "flac"
+
+    def __init__(self, filename: str, rate: int, normalizer: Optional[LoudnessNormalizer] = None):
+        import soundfile
+
+        super().__init__(filename, rate, normalizer)
+        self._file = soundfile.SoundFile(filename, "w", samplerate=rate, channels=1, format="FLAC", subtype="PCM_16")
+
+    def _encode(self, pcm: bytes):
+        self._file.write(np.frombuffer(pcm, dtype="<i2"))
+
+    def _finish(self):
+        self._file.close()
+
+
+class FFmpegAudioWriter(AudioWriter):
+    """
+    FLAC, Opus or MP3 through an ``ffmpeg`` process (``FFMPEG_BINARY`` overrides
+    the executable) fed raw PCM over a pipe. The pipe buffer bounds how far
+    synthesis can run ahead of the encoder.
+    """
+
+    def __init__(self, filename: str, rate: int, fmt: str, normalizer: Optional[LoudnessNormalizer] = None):
+        super().__init__(filename, rate, normalizer)
+        binary = _ffmpeg_binary()
+        if binary is None:
+            raise RuntimeError(f"No encoder available for {fmt}: install ffmpeg (or soundfile for FLAC).")
+        self.format = fmt
+        command = [binary, "-hide_banner", "-loglevel", "error", "-y",
+                   "-f", "s16le", "-ar", str(rate), "-ac", "1", "-i", "pipe:0", "-c:a", _FFMPEG_CODECS[fmt]]
+        if fmt in AUDIO_BITRATES:
+            command += ["-b:a", AUDIO_BITRATES[fmt]]
+        # stderr goes to a file: a full stderr pipe would stall the encoder
+        self._stderr = tempfile.TemporaryFile()
+        self._process = subprocess.Popen(command + [filename], stdin=subprocess.PIPE,
+                                         stdout=subprocess.DEVNULL, stderr=self._stderr)
+
+    def _encode(self, pcm: bytes):
+        try:
+            self._process.stdin.write(pcm)
+        except BrokenPipeError:
+            # The encoder died; report its error instead of the broken pipe
+            self._closed = True
+            self._finish()
+
+    def _finish(self):
+        if self._stderr.closed:
+            return
+        if self._process.stdin and not self._process.stdin.closed:
+            try:
+                self._process.stdin.close()
+            except BrokenPipeError:
+                pass
+        returncode = self._process.wait()
+        self._stderr.seek(0)
+        message = self._stderr.read().decode("utf-8", "replace").strip()
+        self._stderr.close()
+        if returncode != 0:
+            raise RuntimeError(f"ffmpeg failed to encode {self.filename} (exit {returncode}): {message[-500:]}")
+
+
+def open_audio_writer(filename: str, rate: int, loudness_target: Optional[float] = None) -> AudioWriter:
+    """
+    Opens a streaming writer for ``filename``; the format follows the extension
+    (``.wav``, ``.flac``, ``.opus``/``.ogg``, ``.mp3``).
+
+    Args:
+        filename (str): Output path.
+        rate (int): Sample rate.
+        loudness_target (float, optional): Normalize to this loudness (dB, e.g. -16)
+            with a :class:`LoudnessNormalizer`. Defaults to no normalization.
+
+    Raises:
+        ValueError: For an unknown extension.
+        RuntimeError: If no encoder for the format is available.
+    """
+    fmt = _EXTENSIONS.get(os.path.splitext(filename)[1].lower())
+    if fmt is None:
+        raise ValueError(f"Unsupported audio file extension: {filename}")
+    normalizer = LoudnessNormalizer(rate, loudness_target) if loudness_target is not None else None
+    if fmt == "wav":
+        return WavAudioWriter(filename, rate, normalizer)
+    if fmt == "flac" and _has_soundfile():
+        return SoundFileAudioWriter(filename, rate, normalizer)
+    return FFmpegAudioWriter(filename, rate, fmt, normalizer)
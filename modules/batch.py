@@ -0,0 +1,339 @@
+import os
+import json
+import time
+import asyncio
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from modules.audio_writer import output_format
+from modules.constants import (
+    BACKFILL_MANIFEST_PATH,
+    BATCH_MAX_CONCURRENCY,
+    COMPETITION_NAMES,
+    DEFAULT_COMPETITIONS,
+    FOOTBALL_DATA_MAX_RANGE_DAYS,
+    LEAGUE_LLM_CONCURRENCY,
+    TOP_FLIGHT_COMPETITIONS,
+)
+from modules.models import Match, parse_matches
+from modules.tools import (
+    get_matches_by_date,
+    get_matches_by_range,
+    partition_matches_by_competition,
+    partition_matches_by_day,
+)
+
+# Manifest statuses that do not need to be generated again on resume
+COMPLETED_STATUSES = {"done", "no_matches"}
+
+
+def date_range(date_from: str, date_to: str) -> List[str]:
+    """Returns every date from ``date_from`` through ``date_to`` as YYYY-MM-DD strings."""
+    start = datetime.strptime(date_from, "%Y-%m-%d").date()
+    end = datetime.strptime(date_to, "%Y-%m-%d").date()
+    return [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range((end - start).days + 1)]
+
+
+def fetch_windows(days: List[str], max_days: int = FOOTBALL_DATA_MAX_RANGE_DAYS) -> List[Tuple[str, str]]:
+    """
+    Groups sorted YYYY-MM-DD ``days`` into ``(first, last)`` ranges of consecutive
+    days spanning at most ``max_days`` each, so no range covers a day outside ``days``.
+    """
+    windows: List[Tuple[str, str]] = []
+    start = previous = None
+    for day in days:
+        current = datetime.strptime(day, "%Y-%m-%d").date()
+        if start is None or current - previous != timedelta(days=1) or (current - start).days >= max_days:
+            windows.append((day, day))
+            start = current
+        else:
+            windows[-1] = (windows[-1][0], day)
+        previous = current
+    return windows
+
+
+class BackfillManifest:
+    """
+    Tracks the status of every episode of a backfill in a JSON file so an
+    interrupted run can resume where it stopped. The file is rewritten
+    atomically after every update.
+    """
+
+    def __init__(self, path: str, competitions: List[str]):
+        self.path = path
+        self._lock = threading.Lock()
+        self.data: Dict[str, Any] = {"competitions": list(competitions), "episodes": {}}
+
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                existing = json.load(f)
+            if sorted(existing.get("competitions", [])) != sorted(competitions):
+                raise ValueError(
+                    f"Manifest {path} was created for competitions {existing.get('competitions')}, "
+                    f"not {list(competitions)}; use a different manifest path."
+                )
+            self.data = existing
+
+    @property
+    def episodes(self) -> Dict[str, Dict[str, Any]]:
+        return self.data["episodes"]
+
+    def is_complete(self, key: str) -> bool:
+        return self.episodes.get(key, {}).get("status") in COMPLETED_STATUSES
+
+    def update(self, key: str, **fields):
+        with self._lock:
+            entry = self.episodes.setdefault(key, {})
+            entry.update(fields, updated_at=datetime.now().isoformat(timespec="seconds"))
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.data, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+
+class BackfillRunner:
+    """
+    Generates one episode per day for a date range with a single resident agent.
+
+    The matches of the days still to generate are fetched with as few
+    Football-Data.org requests as its range limit allows (see :func:`fetch_windows`)
+    and partitioned per day. Episodes then run with at most ``max_concurrency`` in
+    flight (fetch/search/LLM overlap freely) while the agent serializes the TTS
+    stage, so the TTS model, LLM client and HTTP sessions are loaded once and
+    shared by every episode. Progress is recorded in a :class:`BackfillManifest`.
+
+    Args:
+        agent (FootballPodcastAgent, optional): The agent to reuse. Defaults to a new agent
+            with ``tts_concurrency=1``.
+        competitions (list, optional): Competition codes. Defaults to DEFAULT_COMPETITIONS.
+        max_concurrency (int): Maximum number of episodes in flight.
+        manifest_path (str): Where progress is recorded.
+        output_dir (str): Directory receiving ``podcast_<date>.<format>`` files
+            (``TTS_OUTPUT_FORMAT``, WAV by default).
+    """
+
+    def __init__(self, agent=None, competitions: Optional[List[str]] = None,
+                 max_concurrency: int = BATCH_MAX_CONCURRENCY,
+                 manifest_path: str = BACKFILL_MANIFEST_PATH, output_dir: str = "output"):
+        if agent is None:
+            from modules.langgraph_agent import FootballPodcastAgent
+            agent = FootballPodcastAgent(tts_concurrency=1)
+        self.agent = agent
+        self.competitions = list(competitions or DEFAULT_COMPETITIONS)
+        self.max_concurrency = max_concurrency
+        self.manifest = BackfillManifest(manifest_path, self.competitions)
+        self.output_dir = output_dir
+
+    async def _run_episode(self, day: str, matches: List[Match], slots: asyncio.Semaphore):
+        async with slots:
+            print(f"--- [BackfillRunner] Generating episode for {day} ({len(matches)} matches) ---")
+            self.manifest.update(day, status="running", matches=len(matches))
+            try:
+                final_state = await self.agent.run(
+                    f"Football highlights for {day}",
+                    date=day,
+                    competitions=self.competitions,
+                    matches=matches,
+                    output_path=os.path.join(self.output_dir, f"podcast_{day}.{output_format()}"),
+                    # With checkpointing enabled, a failed day resumes at its first incomplete node
+                    run_id=f"backfill:{day}:{','.join(sorted(self.competitions))}",
+                    resume=True,
+                )
+            except Exception as e:
+                print(f"--- [BackfillRunner] Episode for {day} failed: {e} ---")
+                self.manifest.update(day, status="failed", errors=[str(e)])
+                return
+
+            audio_path = final_state.get("audio_path")
+            status = "done" if audio_path else "failed"
+            self.manifest.update(day, status=status, audio_path=audio_path, errors=final_state.get("errors", []))
+            print(f"--- [BackfillRunner] Episode for {day}: {status} ---")
+
+    async def run(self, date_from: str, date_to: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Generates the missing episodes between ``date_from`` and ``date_to`` (inclusive).
+
+        Returns:
+            dict: The manifest entries for the requested days, keyed by date.
+        """
+        days = date_range(date_from, date_to)
+        pending = [day for day in days if not self.manifest.is_complete(day)]
+        print(f"--- [BackfillRunner] {len(days)} day(s) requested, {len(days) - len(pending)} already complete ---")
+
+        if pending:
+            os.makedirs(self.output_dir, exist_ok=True)
+            windows = fetch_windows(pending)
+            responses = await asyncio.gather(*(
+                asyncio.to_thread(get_matches_by_range, first, last, self.competitions) for first, last in windows
+            ))
+            matches_by_day: Dict[str, List[Match]] = {}
+            fetched = set()
+            for (first, last), response in zip(windows, responses):
+                window_days = date_range(first, last)
+                if "error" in response:
+                    # Only the days of this window failed; the other windows still run
+                    print(f"--- [BackfillRunner] Error fetching matches for {first} .. {last}: {response['error']} ---")
+                    for day in window_days:
+                        self.manifest.update(day, status="failed", errors=[f"Error fetching matches: {response['error']}"])
+                    continue
+                fetched.update(window_days)
+                for day, raw in partition_matches_by_day(response).items():
+                    matches_by_day[day] = parse_matches(raw)
+
+            slots = asyncio.Semaphore(self.max_concurrency)
+            tasks = []
+            for day in (day for day in pending if day in fetched):
+                if not matches_by_day.get(day):
+                    self.manifest.update(day, status="no_matches", matches=0)
+                    continue
+                tasks.append(self._run_episode(day, matches_by_day[day], slots))
+            await asyncio.gather(*tasks)
+
+        return {day: self.manifest.episodes.get(day, {}) for day in days}
+
+
+@dataclass
+class LeagueEpisode:
+    """The outcome of one league's episode in a league-sharded run."""
+    competition: str
+    matches: int
+    audio_path: Optional[str] = None
+    script: Optional[str] = None
+    errors: List[str] = field(default_factory=list)
+    # Seconds from the start of the run until the episode was published
+    latency: float = 0.0
+
+    @property
+    def status(self) -> str:
+        if self.audio_path:
+            return "done"
+        return "no_matches" if not self.matches and not self.errors else "failed"
+
+
+@dataclass
+class LeagueShardReport:
+    """Per-league episodes of a league-sharded run, in the order they were published."""
+    date: str
+    episodes: List[LeagueEpisode] = field(default_factory=list)
+    fetch_seconds: float = 0.0
+    wall_seconds: float = 0.0
+
+    @property
+    def episodes_done(self) -> int:
+        return sum(1 for episode in self.episodes if episode.status == "done")
+
+    @property
+    def episodes_per_hour(self) -> float:
+        return self.episodes_done * 3600 / self.wall_seconds if self.wall_seconds else 0.0
+
+    def format(self) -> str:
+        lines = [f"{'league':<8} {'matches':>7} {'latency':>9}  status"]
+        for episode in self.episodes:
+            lines.append(f"{episode.competition:<8} {episode.matches:>7} {episode.latency:>8.1f}s  "
+                         f"{episode.status} {episode.audio_path or ''}".rstrip())
+        lines.append(f"{self.episodes_done} episode(s) in {self.wall_seconds:.1f}s "
+                     f"(fetch {self.fetch_seconds:.1f}s): {self.episodes_per_hour:.1f} episodes/hour")
+        return "\n".join(lines)
+
+
+class LeagueShardRunner:
+    """
+    Generates one episode per competition for a matchday with a single resident agent.
+
+    The matches of every league are fetched with one Football-Data.org request
+    and split per competition. Each league then runs its own news search and
+    script generation concurrently; the agent caps the LLM requests in flight
+    across all leagues (``llm_concurrency``) and queues the leagues for its one
+    TTS model (``tts_concurrency=1``). An episode is published, i.e. reported
+    through ``on_episode``, as soon as its league finishes, not when the slowest
+    league does.
+
+    Args:
+        agent (FootballPodcastAgent, optional): The agent to reuse. Defaults to a new agent
+            with ``tts_concurrency=1`` and ``llm_concurrency``.
+        competitions (list, optional): Competition codes. Defaults to TOP_FLIGHT_COMPETITIONS.
+        llm_concurrency (int): LLM requests in flight across leagues (only used for the
+            default agent).
+        output_dir (str): Directory receiving ``podcast_<date>_<competition>.<format>`` files.
+        on_episode (callable, optional): Called with each :class:`LeagueEpisode` as it is published.
+    """
+
+    def __init__(self, agent=None, competitions: Optional[List[str]] = None,
+                 llm_concurrency: int = LEAGUE_LLM_CONCURRENCY, output_dir: str = "output",
+                 on_episode: Optional[Callable[[LeagueEpisode], None]] = None):
+        if agent is None:
+            from modules.langgraph_agent import FootballPodcastAgent
+            agent = FootballPodcastAgent(tts_concurrency=1, llm_concurrency=llm_concurrency)
+        self.agent = agent
+        self.competitions = list(competitions or TOP_FLIGHT_COMPETITIONS)
+        self.output_dir = output_dir
+        self.on_episode = on_episode
+
+    async def _run_league(self, date: str, competition: str, matches: List[Match], start: float) -> LeagueEpisode:
+        name = COMPETITION_NAMES.get(competition, competition)
+        print(f"--- [LeagueShardRunner] Generating {name} episode ({len(matches)} matches) ---")
+        episode = LeagueEpisode(competition=competition, matches=len(matches))
+        try:
+            final_state = await self.agent.run(
+                f"{name} highlights for {date}",
+                date=date,
+                competitions=[competition],
+                matches=matches,
+                output_path=os.path.join(self.output_dir, f"podcast_{date}_{competition}.{output_format()}"),
+                run_id=f"league:{date}:{competition}",
+                resume=True,
+            )
+            episode.audio_path = final_state.get("audio_path")
+            episode.script = final_state.get("script")
+            episode.errors = final_state.get("errors", [])
+        except Exception as e:
+            print(f"--- [LeagueShardRunner] {name} episode failed: {e} ---")
+            episode.errors = [str(e)]
+        episode.latency = time.perf_counter() - start
+        return episode
+
+    def _publish(self, report: LeagueShardReport, episode: LeagueEpisode):
+        report.episodes.append(episode)
+        print(f"--- [LeagueShardRunner] {episode.competition}: {episode.status} after {episode.latency:.1f}s "
+              f"{episode.audio_path or ''}".rstrip() + " ---")
+        if self.on_episode is not None:
+            self.on_episode(episode)
+
+    async def run(self, date: Optional[str] = None) -> LeagueShardReport:
+        """Generates every league's episode for ``date`` (default today)."""
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        report = LeagueShardReport(date=date)
+        start = time.perf_counter()
+
+        response = await asyncio.to_thread(get_matches_by_date, date, self.competitions)
+        report.fetch_seconds = time.perf_counter() - start
+        if "error" in response:
+            print(f"--- [LeagueShardRunner] Error fetching matches: {response['error']} ---")
+            for competition in self.competitions:
+                self._publish(report, LeagueEpisode(competition=competition, matches=0, latency=report.fetch_seconds,
+                                                    errors=[f"Error fetching matches: {response['error']}"]))
+            report.wall_seconds = time.perf_counter() - start
+            return report
+
+        by_competition = partition_matches_by_competition(response)
+        print(f"--- [LeagueShardRunner] {sum(map(len, by_competition.values()))} match(es) across "
+              f"{len(by_competition)} of {len(self.competitions)} league(s) ---")
+        os.makedirs(self.output_dir, exist_ok=True)
+        tasks = []
+        for competition in self.competitions:
+            matches = parse_matches(by_competition.get(competition, []))
+            if not matches:
+                self._publish(report, LeagueEpisode(competition=competition, matches=0, latency=report.fetch_seconds))
+                continue
+            tasks.append(asyncio.create_task(self._run_league(date, competition, matches, start)))
+
+        for finished in asyncio.as_completed(tasks):
+            self._publish(report, await finished)
+
+        report.wall_seconds = time.perf_counter() - start
+        return report
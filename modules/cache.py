@@ -0,0 +1,441 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+def file_digest(path: str) -> str:
+    """Returns the SHA-256 hex digest of a file's bytes, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """
+    A small persistent key/value cache storing one JSON file per entry.
+
+    Entries carry an optional TTL (``None`` means they never expire) plus free-form
+    metadata (e.g. HTTP validators). The cache is bounded to ``max_entries`` and
+    evicts the least recently used entry first; recency survives restarts through
+    the entry files' modification times.
+
+    Args:
+        cache_dir (str): Directory holding the cache files. Created if missing.
+        max_entries (int): Maximum number of entries kept on disk.
+    """
+
+    def __init__(self, cache_dir: str, max_entries: int = 256):
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be >= 1, got {max_entries}")
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._lru: "OrderedDict[str, None]" = OrderedDict()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        files = [f for f in os.listdir(cache_dir) if f.endswith(".json")]
+        files.sort(key=lambda f: os.path.getmtime(os.path.join(cache_dir, f)))
+        for file_name in files:
+            self._lru[file_name] = None
+        with self._lock:
+            self._evict()
+
+    @staticmethod
+    def _file_name(key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json"
+
+    def _path(self, file_name: str) -> str:
+        return os.path.join(self.cache_dir, file_name)
+
+    def _read(self, file_name: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(file_name), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            self._lru.pop(file_name, None)
+            return None
+
+    def _write(self, file_name: str, entry: Dict[str, Any]):
+        tmp_path = self._path(file_name) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, self._path(file_name))
+        self._lru[file_name] = None
+        self._lru.move_to_end(file_name)
+
+    def _evict(self):
+        while len(self._lru) > self.max_entries:
+            file_name, _ = self._lru.popitem(last=False)
+            try:
+                os.remove(self._path(file_name))
+            except OSError:
+                pass
+            self.evictions += 1
+
+    def _touch(self, file_name: str):
+        self._lru.move_to_end(file_name)
+        try:
+            os.utime(self._path(file_name))
+        except OSError:
+            pass
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the raw entry for ``key`` whether or not it is still fresh.
+
+        The entry is a dict with ``value``, ``stored_at``, ``expires_at`` and ``meta``
+        keys. Use :meth:`is_fresh` to check it; this method does not touch the counters.
+        """
+        file_name = self._file_name(key)
+        with self._lock:
+            if file_name not in self._lru:
+                return None
+            entry = self._read(file_name)
+            if entry is None or entry.get("key") != key:
+                return None
+            self._touch(file_name)
+            return entry
+
+    @staticmethod
+    def is_fresh(entry: Dict[str, Any]) -> bool:
+        expires_at = entry.get("expires_at")
+        return expires_at is None or time.time() < expires_at
+
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the cached value if present and fresh, otherwise None."""
+        entry = self.lookup(key)
+        if entry is not None and self.is_fresh(entry):
+            self.record_hit()
+            return entry["value"]
+        self.record_miss()
+        return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, **meta):
+        """Stores ``value`` under ``key``, expiring after ``ttl`` seconds (never if None)."""
+        now = time.time()
+        entry = {
+            "key": key,
+            "stored_at": now,
+            "expires_at": None if ttl is None else now + ttl,
+            "meta": meta,
+            "value": value,
+        }
+        with self._lock:
+            self._write(self._file_name(key), entry)
+            self._evict()
+
+    def refresh(self, key: str, ttl: Optional[float] = None) -> bool:
+        """Resets the expiry of an existing entry (e.g. after a successful revalidation)."""
+        entry = self.lookup(key)
+        if entry is None:
+            return False
+        self.set(key, entry["value"], ttl=ttl, **entry.get("meta", {}))
+        return True
+
+    def record_hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss/eviction counters and the current size."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._lru),
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class AudioCache:
+    """
+    Content-addressed cache of synthesized audio segments stored as ``.npy`` files.
+
+    Segments are keyed by a hash of the normalized text, model id, voice (for a
+    cloned voice, the digest of its reference clip) and sample rate, and loaded
+    memory-mapped so a hit can be spliced straight into the output without
+    decoding. The cache is bounded to ``max_bytes`` on disk and evicts the
+    least recently used segments first.
+
+    Args:
+        cache_dir (str): Directory holding the segment files. Created if missing.
+        max_bytes (int): Maximum total size of the cached segments.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._lru: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        files = [f for f in os.listdir(cache_dir) if f.endswith(".npy")]
+        files.sort(key=lambda f: os.path.getmtime(os.path.join(cache_dir, f)))
+        for file_name in files:
+            size = os.path.getsize(os.path.join(cache_dir, file_name))
+            self._lru[file_name] = size
+            self._bytes += size
+        with self._lock:
+            self._evict()
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        return " ".join(unicodedata.normalize("NFC", text).split())
+
+    @classmethod
+    def key(cls, text: str, model_id: str, voice: str, sample_rate: int) -> str:
+        """Returns the content address of a segment."""
+        payload = "\x1f".join([cls.normalize_text(text), model_id, voice, str(sample_rate)])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, file_name: str) -> str:
+        return os.path.join(self.cache_dir, file_name)
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._lru:
+            file_name, size = self._lru.popitem(last=False)
+            self._bytes -= size
+            try:
+                os.remove(self._path(file_name))
+            except OSError:
+                pass
+            self.evictions += 1
+
+    def get(self, key: str) -> Optional["np.ndarray"]:
+        """Returns the cached samples as a read-only memory-mapped array, or None."""
+        import numpy as np
+
+        file_name = key + ".npy"
+        with self._lock:
+            if file_name not in self._lru:
+                self.misses += 1
+                return None
+            try:
+                samples = np.load(self._path(file_name), mmap_mode="r")
+                os.utime(self._path(file_name))
+            except (OSError, ValueError):
+                self._bytes -= self._lru.pop(file_name)
+                self.misses += 1
+                return None
+            self._lru.move_to_end(file_name)
+            self.hits += 1
+            return samples
+
+    def put(self, key: str, samples: "np.ndarray"):
+        """Stores the samples of a segment under ``key``."""
+        import numpy as np
+
+        file_name = key + ".npy"
+        tmp_path = self._path(file_name) + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, np.ascontiguousarray(samples, dtype=np.float32))
+        size = os.path.getsize(tmp_path)
+        with self._lock:
+            os.replace(tmp_path, self._path(file_name))
+            self._bytes += size - self._lru.pop(file_name, 0)
+            self._lru[file_name] = size
+            self._evict()
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss/eviction counters and the current size."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._lru),
+            "bytes": self._bytes,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class VoiceConditioningCache:
+    """
+    Persistent store of precomputed voice conditionals, one ``.npz`` file per voice.
+
+    Conditioning a cloned voice embeds the reference clip (speaker encoder,
+    speech tokenizer, mel features), which costs about as much as synthesizing a
+    sentence. The resulting tensors are stored as named float/int arrays under
+    :meth:`key`, a hash of the clip's bytes and the model id and version, so an
+    edited clip or an upgraded model never reuses stale conditionals.
+
+    Args:
+        cache_dir (str): Directory holding the ``.npz`` files. Created if missing.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(audio_prompt_path: str, model_id: str, model_version: str) -> str:
+        """Returns the content address of the conditionals of a reference clip."""
+        payload = "\x1f".join([file_digest(audio_prompt_path), model_id, model_version])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".npz")
+
+    def get(self, key: str) -> Optional[Dict[str, "np.ndarray"]]:
+        """Returns the stored arrays by name, or None."""
+        import numpy as np
+
+        try:
+            with np.load(self._path(key)) as data:
+                arrays = {name: data[name] for name in data.files}
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return arrays
+
+    def put(self, key: str, arrays: Dict[str, "np.ndarray"]):
+        """Stores the conditionals of a voice under ``key``."""
+        import numpy as np
+
+        tmp_path = self._path(key) + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, self._path(key))
+
+    def __len__(self) -> int:
+        return sum(1 for f in os.listdir(self.cache_dir) if f.endswith(".npz"))
+
+
+class LLMResponseCache:
+    """
+    Persistent cache of LLM completions with coalescing of concurrent identical requests.
+
+    Completions are keyed by :meth:`key` (model, endpoint, messages and sampling
+    parameters) and stored in a :class:`DiskCache`, so they survive restarts and
+    share its TTL and LRU eviction. While a completion for a key is being
+    computed, other callers asking for the same key wait for that result
+    instead of sending the same prompt again (:meth:`get_or_compute` for blocking
+    calls, :meth:`claim` / :meth:`finish` for streamed completions).
+
+    Args:
+        cache_dir (str): Directory holding the cache files. Created if missing.
+        max_entries (int): Maximum number of completions kept on disk.
+        ttl (float, optional): Seconds before a completion expires (None = never).
+    """
+
+    def __init__(self, cache_dir: str, max_entries: int = 512, ttl: Optional[float] = None):
+        self.store = DiskCache(cache_dir, max_entries=max_entries)
+        self.ttl = ttl
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, "Future"] = {}
+
+    @property
+    def cache_dir(self) -> str:
+        return self.store.cache_dir
+
+    @staticmethod
+    def key(model: str, base_url: str, messages: List[Tuple[str, str]], params: Dict[str, Any]) -> str:
+        """
+        Returns the cache key of a request.
+
+        Args:
+            model (str): Model name.
+            base_url (str): Endpoint the model is served from.
+            messages (list): ``(role, content)`` pairs, e.g. system and human message.
+            params (dict): Sampling parameters (temperature, top_p, max tokens, seed, ...).
+        """
+        payload = json.dumps(
+            {"model": model, "base_url": base_url, "messages": messages, "params": params},
+            sort_keys=True, default=str,
+        )
+        return "llm:" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached completion text, or None."""
+        return self.store.get(key)
+
+    def set(self, key: str, content: str):
+        self.store.set(key, content, ttl=self.ttl)
+
+    def claim(self, key: str) -> Tuple[Optional[str], Optional["Future"], bool]:
+        """
+        Looks ``key`` up and joins or starts its computation. Returns ``(cached,
+        future, owner)``: the stored completion on a hit; otherwise the future of the
+        in-flight completion, which the caller waits for (``owner`` False) or computes
+        itself and settles with :meth:`finish` (``owner`` True).
+        """
+        with self._lock:
+            cached = self.store.get(key)
+            if cached is not None:
+                return cached, None, False
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return None, future, False
+            future = self._inflight[key] = Future()
+            return None, future, True
+
+    def finish(self, key: str, future: "Future", content: Optional[str] = None,
+               error: Optional[BaseException] = None):
+        """Settles a claimed computation: stores a non-empty ``content``, or passes ``error`` to the waiters."""
+        try:
+            if error is not None:
+                future.set_exception(error)
+                return
+            if content:
+                self.set(key, content)
+            future.set_result(content)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def get_or_compute(self, key: str, compute: Callable[[], str]) -> Tuple[str, str]:
+        """
+        Returns ``(completion, source)`` where source is ``"hit"``, ``"miss"`` (computed
+        here and stored) or ``"coalesced"`` (computed by a concurrent caller). Exceptions
+        raised by ``compute`` propagate to every waiting caller and nothing is stored.
+        """
+        cached, future, owner = self.claim(key)
+        if cached is not None:
+            return cached, "hit"
+        if not owner:
+            return future.result(), "coalesced"
+
+        try:
+            content = compute()
+        except BaseException as e:
+            self.finish(key, future, error=e)
+            raise
+        self.finish(key, future, content)
+        return content, "miss"
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self.store.stats(), coalesced=self.coalesced)
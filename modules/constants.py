@@ -1,4 +1,156 @@
 # Centralized constants for the AIFootballPodcast project
 
+import os
+
 PREMIER_LEAGUE = "PL"
 DEFAULT_COMPETITIONS = [PREMIER_LEAGUE]
+# Leagues of the league-sharded mode, one episode each (see modules/batch.py)
+TOP_FLIGHT_COMPETITIONS = ["PL", "PD", "SA", "BL1", "FL1", "CL"]
+
+# News search fan-out (DuckDuckGo)
+NEWS_SEARCH_MAX_CONCURRENCY = 4
+NEWS_SEARCH_TIMEOUT = 15.0
+NEWS_SEARCH_MAX_RESULTS = 3
+
+# Football-Data.org API
+FOOTBALL_DATA_BASE_URL = "https://api.football-data.org/v4"
+FOOTBALL_DATA_CACHE_DIR = os.path.join("cache", "football_data")
+FOOTBALL_DATA_CACHE_MAX_ENTRIES = 256
+# Matches for today (or an unsettled past day) may still change; finished days are cached forever
+FOOTBALL_DATA_TODAY_TTL = 300
+FINISHED_MATCH_STATUSES = {"FINISHED", "AWARDED", "CANCELLED", "POSTPONED"}
+# Longest dateFrom..dateTo span (in days, inclusive) one matches request may cover
+FOOTBALL_DATA_MAX_RANGE_DAYS = 10
+HTTP_POOL_MAXSIZE = 10
+# Football-Data.org quota: 10 requests per minute on the free tier (FOOTBALL_DATA_RATE_LIMIT overrides, 0 disables)
+FOOTBALL_DATA_RATE_LIMIT = 10
+FOOTBALL_DATA_RATE_PERIOD = 60.0
+# The API reports the quota reset in whole seconds; wait this much longer to be safe
+FOOTBALL_DATA_RESET_MARGIN = 1.0
+# HTTP timeouts (seconds) and retries with exponential backoff on 429/5xx and connection errors
+HTTP_CONNECT_TIMEOUT = 5.0
+HTTP_READ_TIMEOUT = 30.0
+HTTP_MAX_RETRIES = 4
+HTTP_BACKOFF_BASE = 1.0
+HTTP_BACKOFF_MAX = 60.0
+
+# Chunked TTS synthesis
+TTS_CHUNK_MAX_CHARS = 300
+TTS_CHUNK_WORKERS = 1
+TTS_CHUNK_SILENCE_MS = 150
+TTS_CHUNK_CROSSFADE_MS = 10
+
+# Content-addressed cache for synthesized segments (enabled by setting TTS_AUDIO_CACHE_DIR)
+TTS_AUDIO_CACHE_MAX_MB = 512
+TTS_DEFAULT_VOICE = "default"
+
+# Background TTS warm-up
+TTS_WARMUP_TEXT = "Warming up."
+
+# Batched synthesis of short segments (TTSManager.generate_batch)
+TTS_BATCH_MAX_SIZE = 8
+# Longest / shortest text allowed in one batch, which bounds the padding
+TTS_BATCH_LENGTH_RATIO = 1.5
+
+# Multi-process TTS (modules/tts_pool.py, enabled by setting TTS_PROCESS_WORKERS)
+# RAM one worker needs for its copy of Chatterbox plus activations (TTS_WORKER_MEMORY_MB overrides)
+TTS_POOL_WORKER_MEMORY_MB = 3072
+# RAM left to the parent process and the rest of the machine
+TTS_POOL_MEMORY_RESERVE_MB = 1024
+# Retries of a job whose worker crashed, before the job fails
+TTS_POOL_JOB_RETRIES = 1
+
+# Batch / backfill runs
+BATCH_MAX_CONCURRENCY = 3
+BACKFILL_MANIFEST_PATH = os.path.join("output", "backfill_manifest.json")
+# League-sharded runs: script generations in flight across all leagues
+LEAGUE_LLM_CONCURRENCY = 2
+
+# Long-running podcast service
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+SERVER_WORKERS = 2
+SERVER_MAX_QUEUE = 32
+SERVER_MAX_FINISHED_JOBS = 1000
+# Stage records a PipelineTracer keeps; the oldest are dropped first
+TRACER_MAX_RECORDS = 10000
+
+# Prompt context budgeting (see modules/context.py)
+PROMPT_CONTEXT_TOKEN_BUDGET = 1500
+CONTEXT_DEDUP_THRESHOLD = 0.7
+CONTEXT_SHINGLE_SIZE = 3
+CONTEXT_MINHASH_PERMUTATIONS = 64
+
+# LLM completion cache (enabled by setting LLM_CACHE_DIR)
+LLM_CACHE_MAX_ENTRIES = 512
+LLM_CACHE_TTL = 7 * 24 * 3600
+
+# Checkpointed, resumable runs (used by run_local.py; see FootballPodcastAgent.run)
+PIPELINE_CHECKPOINT_DB = os.path.join("cache", "checkpoints.sqlite")
+
+# Display names used in league-wide news searches
+COMPETITION_NAMES = {
+    "PL": "Premier League",
+    "ELC": "Championship",
+    "PD": "La Liga",
+    "SA": "Serie A",
+    "BL1": "Bundesliga",
+    "FL1": "Ligue 1",
+    "DED": "Eredivisie",
+    "PPL": "Primeira Liga",
+    "CL": "Champions League",
+    "EC": "European Championship",
+    "WC": "World Cup",
+}
+
+# Two-host dialogue mode; reference clips per host come from TTS_VOICE_<NAME> (e.g. TTS_VOICE_ALEX)
+DIALOGUE_HOSTS = ("Alex", "Sam")
+DIALOGUE_GAP_MS = 250
+
+# Multilingual episodes (ChatterboxMultilingualTTS): fetch/search/context run once, the
+# script is written in the first language and translated into the others
+PODCAST_LANGUAGES = ["en"]
+LANGUAGE_MAX_CONCURRENCY = 2
+LANGUAGE_NAMES = {
+    "ar": "Arabic",
+    "da": "Danish",
+    "de": "German",
+    "el": "Greek",
+    "en": "English",
+    "es": "Spanish",
+    "fi": "Finnish",
+    "fr": "French",
+    "he": "Hebrew",
+    "hi": "Hindi",
+    "it": "Italian",
+    "ja": "Japanese",
+    "ko": "Korean",
+    "ms": "Malay",
+    "nl": "Dutch",
+    "no": "Norwegian",
+    "pl": "Polish",
+    "pt": "Portuguese",
+    "ru": "Russian",
+    "sv": "Swedish",
+    "sw": "Swahili",
+    "tr": "Turkish",
+    "zh": "Chinese",
+}
+
+# Episode encoding (see modules/audio_writer.py). WAV needs nothing extra; FLAC uses soundfile
+# or ffmpeg, Opus and MP3 need ffmpeg on PATH
+TTS_OUTPUT_FORMAT = "wav"
+AUDIO_BITRATES = {"opus": "48k", "mp3": "96k"}
+
+# Streaming loudness normalization (enabled by setting TTS_LOUDNESS_TARGET, e.g. -16)
+AUDIO_LOUDNESS_BLOCK_MS = 100
+AUDIO_LOUDNESS_WINDOW_SECONDS = 3.0
+AUDIO_LOUDNESS_MAX_GAIN_DB = 20.0
+AUDIO_LOUDNESS_GATE_DB = -70.0
+AUDIO_PEAK_CEILING_DB = -1.0
+
+# Live matchday mode (see modules/live.py): match snapshots and per-match segment audio
+LIVE_STATE_DIR = os.path.join("cache", "live")
+LIVE_UPDATE_INTERVAL = 15 * 60
+LIVE_SEGMENT_CACHE_MAX_MB = 256
+LIVE_SEGMENT_CONCURRENCY = 2
@@ -0,0 +1,222 @@
+import re
+import random
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Set
+
+from modules.constants import (
+    CONTEXT_DEDUP_THRESHOLD,
+    CONTEXT_MINHASH_PERMUTATIONS,
+    CONTEXT_SHINGLE_SIZE,
+    PROMPT_CONTEXT_TOKEN_BUDGET,
+)
+from modules.models import Match
+
+_WORD = re.compile(r"[a-z0-9]+")
+_MERSENNE_PRIME = (1 << 61) - 1
+# Section index of the league-wide snippets, after every match section
+_GENERAL = -1
+_STOPWORDS = {"a", "an", "and", "at", "for", "in", "of", "on", "the", "to", "vs", "with",
+              "football", "news", "today", "todays", "s"}
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap, deterministic token estimate (about four characters per token for
+    English text), good enough for budgeting without loading a tokenizer.
+    """
+    return (len(text) + 3) // 4 if text else 0
+
+
+def _words(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def shingles(text: str, size: int = CONTEXT_SHINGLE_SIZE) -> Set[str]:
+    """Word ``size``-grams of the normalized text (the whole text if it is shorter)."""
+    words = _words(text)
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class MinHasher:
+    """
+    MinHash signatures estimating the Jaccard similarity of shingle sets.
+
+    Each shingle is hashed once with BLAKE2b and then permuted with
+    ``num_perm`` universal hash functions drawn from a fixed seed, so
+    signatures are identical across runs and processes.
+    """
+
+    def __init__(self, num_perm: int = CONTEXT_MINHASH_PERMUTATIONS, seed: int = 1):
+        rng = random.Random(seed)
+        self._params = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+                        for _ in range(num_perm)]
+
+    def signature(self, items: Set[str]) -> List[int]:
+        hashes = [int.from_bytes(hashlib.blake2b(item.encode("utf-8"), digest_size=8).digest(), "big")
+                  for item in items]
+        if not hashes:
+            return [_MERSENNE_PRIME] * len(self._params)
+        return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in self._params]
+
+    @staticmethod
+    def similarity(sig_a: Sequence[int], sig_b: Sequence[int]) -> float:
+        return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+@dataclass
+class PromptContext:
+    """The context text handed to the LLM and what building it saved."""
+    text: str
+    tokens: int
+    tokens_before: int
+    duplicates_removed: int
+    snippets_dropped: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.tokens_before - self.tokens)
+
+
+class ContextBuilder:
+    """
+    Builds the "Matches Info" section of the script prompt within a token budget.
+
+    Steps, all deterministic:
+
+    1. Every match contributes its one-line summary; summaries are kept first
+       and, when even they exceed the budget, later matches are cut.
+    2. News snippets are ranked per match by relevance: mentions of either
+       team's name and overlap with the user query, ties broken by search order.
+    3. Near-duplicate snippets (MinHash-estimated Jaccard similarity of word
+       shingles at or above ``dedup_threshold``) are removed across all
+       matches, keeping the best-ranked copy.
+    4. The remaining budget is shared fairly: snippets are admitted round-robin
+       across matches (and the league-wide section, if any), one per section
+       per round, so a match with many results cannot starve the others.
+
+    Args:
+        token_budget (int): Maximum estimated tokens of the built context.
+        dedup_threshold (float): Similarity at which two snippets count as duplicates.
+        hasher (MinHasher, optional): Signature generator, mostly for tests.
+    """
+
+    def __init__(self, token_budget: int = PROMPT_CONTEXT_TOKEN_BUDGET,
+                 dedup_threshold: float = CONTEXT_DEDUP_THRESHOLD, hasher: Optional[MinHasher] = None):
+        self.token_budget = token_budget
+        self.dedup_threshold = dedup_threshold
+        self.hasher = hasher or MinHasher()
+
+    @staticmethod
+    def relevance(snippet: str, match: Optional[Match], query: str = "") -> float:
+        words = set(_words(snippet))
+        score = 0.0
+        for team in ((match.home, match.away) if match is not None else ()):
+            team_words = set(_words(team)) - _STOPWORDS
+            if team_words and team_words <= words:
+                score += 2.0
+            elif team_words & words:
+                score += 1.0
+        query_words = set(_words(query)) - _STOPWORDS
+        if query_words:
+            score += len(query_words & words) / len(query_words)
+        return score
+
+    @staticmethod
+    def _header(matches: List[Match], section: int) -> str:
+        if section == _GENERAL:
+            return "General league news:"
+        return f"Latest news around {matches[section].home} vs {matches[section].away}:"
+
+    def build(self, matches: List[Match], snippets: List[List[str]], query: str = "",
+              baseline: Optional[str] = None, general: Optional[List[str]] = None) -> PromptContext:
+        """
+        Args:
+            matches (list): The matches of the episode.
+            snippets (list): News snippets per match, aligned with ``matches``.
+            query (str): The user query, used for ranking.
+            baseline (str, optional): The context that would have been sent without
+                budgeting; defaults to every summary and snippet joined.
+            general (list, optional): League-wide snippets not tied to a match. They
+                form one more section sharing the budget round-robin with the matches.
+        """
+        general = [s for s in (general or []) if s.strip()]
+        if baseline is None:
+            baseline = "\n".join(
+                [m.summary for m in matches] + [s for per_match in snippets for s in per_match] + general
+            )
+        tokens_before = estimate_tokens(baseline)
+
+        # 1. Summaries first
+        lines: Dict[int, List[str]] = {}
+        used = 0
+        for i, match in enumerate(matches):
+            cost = estimate_tokens(match.summary) + 1
+            if used + cost > self.token_budget:
+                break
+            lines[i] = [match.summary]
+            used += cost
+        included = list(lines)
+        if general and len(included) == len(matches):
+            lines[_GENERAL] = []
+            included.append(_GENERAL)
+
+        # 2. Rank each section's snippets
+        ranked: Dict[int, List[str]] = {}
+        total_snippets = 0
+        for i in included:
+            if i == _GENERAL:
+                candidates, match = general, None
+            else:
+                candidates = [s for s in (snippets[i] if i < len(snippets) else []) if s.strip()]
+                match = matches[i]
+            total_snippets += len(candidates)
+            order = sorted(range(len(candidates)),
+                           key=lambda j: (-self.relevance(candidates[j], match, query), j))
+            ranked[i] = [candidates[j] for j in order]
+
+        # 3. Near-duplicate removal, visiting snippets rank by rank across matches
+        kept_signatures: List[List[int]] = []
+        duplicates = 0
+        unique: Dict[int, List[str]] = {i: [] for i in included}
+        for position in range(max((len(r) for r in ranked.values()), default=0)):
+            for i in included:
+                if position >= len(ranked[i]):
+                    continue
+                snippet = ranked[i][position]
+                signature = self.hasher.signature(shingles(snippet))
+                if any(self.hasher.similarity(signature, other) >= self.dedup_threshold
+                       for other in kept_signatures):
+                    duplicates += 1
+                    continue
+                kept_signatures.append(signature)
+                unique[i].append(snippet)
+        ranked = unique
+
+        # 4. Round-robin allocation of the remaining budget
+        # (a snippet that does not fit is skipped, a shorter one may still do)
+        admitted = 0
+        headed = set()
+        for position in range(max((len(r) for r in ranked.values()), default=0)):
+            for i in included:
+                if position >= len(ranked[i]):
+                    continue
+                snippet = ranked[i][position]
+                header = [] if i in headed else [self._header(matches, i)]
+                cost = sum(estimate_tokens(line) + 1 for line in header + [snippet])
+                if used + cost <= self.token_budget:
+                    lines[i].extend(header + [snippet])
+                    headed.add(i)
+                    used += cost
+                    admitted += 1
+
+        text = "\n".join(line for i in included for line in lines[i])
+        return PromptContext(
+            text=text,
+            tokens=estimate_tokens(text),
+            tokens_before=tokens_before,
+            duplicates_removed=duplicates,
+            snippets_dropped=total_snippets - duplicates - admitted,
+        )
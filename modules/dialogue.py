@@ -0,0 +1,61 @@
+import re
+from dataclasses import dataclass
+from typing import List, Sequence
+
+from modules.constants import DIALOGUE_HOSTS
+
+
+@dataclass(frozen=True)
+class Turn:
+    """One speaker turn of a dialogue script."""
+    speaker: str
+    text: str
+
+
+def dialogue_instructions(hosts: Sequence[str] = DIALOGUE_HOSTS) -> str:
+    """Prompt fragment asking the LLM for a speaker-tagged two-host script."""
+    names = " and ".join(hosts)
+    example = "\n".join(f"{host}: ..." for host in hosts)
+    return (
+        f"Write the script as a dialogue between the two hosts, {names}, who take turns.\n"
+        f"Start every turn on a new line with the host's name and a colon, for example:\n{example}"
+    )
+
+
+def parse_dialogue(script: str, hosts: Sequence[str] = DIALOGUE_HOSTS) -> List[Turn]:
+    """
+    Splits a speaker-tagged script into turns.
+
+    A line starting with a host name and a colon (optionally wrapped in markdown
+    emphasis or brackets, e.g. ``**Alex:**`` or ``[Sam]:``) starts a new turn;
+    untagged lines continue the current one. Consecutive turns of the same
+    speaker are merged. A script without any tags becomes a single turn of
+    the first host.
+    """
+    names = "|".join(re.escape(host) for host in hosts)
+    tag = re.compile(rf"^\W*({names})\W*:\s*(.*)$", re.IGNORECASE)
+    canonical = {host.lower(): host for host in hosts}
+
+    turns: List[Turn] = []
+    speaker, lines = None, []
+
+    def flush():
+        text = " ".join(" ".join(lines).split()).strip("* ")
+        if not text:
+            return
+        if turns and turns[-1].speaker == speaker:
+            turns[-1] = Turn(speaker, f"{turns[-1].text} {text}")
+        else:
+            turns.append(Turn(speaker, text))
+
+    for line in script.splitlines():
+        match = tag.match(line)
+        if match:
+            flush()
+            speaker, lines = canonical[match.group(1).lower()], [match.group(2)]
+        else:
+            if speaker is None:
+                speaker = hosts[0]
+            lines.append(line)
+    flush()
+    return turns
@@ -0,0 +1,202 @@
+import time
+import random
+import threading
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from modules.constants import (
+    HTTP_BACKOFF_BASE,
+    HTTP_BACKOFF_MAX,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_MAX_RETRIES,
+    HTTP_READ_TIMEOUT,
+)
+
+if TYPE_CHECKING:
+    import requests
+
+# Statuses worth retrying: rate limited, or a transient server-side failure
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Football-Data.org quota headers: requests left in the current window and seconds until it resets
+AVAILABLE_HEADER = "X-Requests-Available-Minute"
+RESET_HEADER = "X-RequestCounter-Reset"
+
+
+def _header_number(headers, name: str) -> Optional[float]:
+    value = headers.get(name) if headers is not None else None
+    if not isinstance(value, str):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """
+    Thread-safe limiter allowing ``capacity`` requests per ``period`` seconds.
+
+    The bucket holds ``capacity`` tokens and is refilled in full when the window
+    ends, which mirrors how Football-Data.org counts requests (a counter that
+    resets every minute); a continuously refilling bucket could overrun such a
+    window. The window opens with the first request. :meth:`update` syncs the
+    bucket with the quota the server reports, so requests made by earlier runs or
+    other processes are accounted for.
+
+    Args:
+        capacity (int): Requests allowed per window.
+        period (float): Window length in seconds.
+        reset_margin (float): Added to server-reported reset times, which may be
+            rounded down to whole seconds.
+    """
+
+    def __init__(self, capacity: int, period: float, reset_margin: float = 0.0):
+        self.capacity = capacity
+        self.period = period
+        self.reset_margin = reset_margin
+        self.tokens = capacity
+        self.waited = 0.0
+        self._reset_at: Optional[float] = None
+        self._cond = threading.Condition()
+
+    def _refill(self, now: float):
+        if self._reset_at is not None and now >= self._reset_at:
+            self.tokens = self.capacity
+            self._reset_at = None
+
+    def acquire(self):
+        """Takes a token, blocking until the window resets if none is left."""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens > 0:
+                    self.tokens -= 1
+                    if self._reset_at is None:
+                        self._reset_at = now + self.period
+                    return
+                if self._reset_at is None:
+                    # Emptied by a server reporting no reset time: wait for a full window
+                    self._reset_at = now + self.period
+                wait = self._reset_at - now
+                self.waited += wait
+                self._cond.wait(wait)
+
+    def update(self, available: Optional[float] = None, reset_seconds: Optional[float] = None):
+        """
+        Adopts the server's view of the quota: ``available`` requests left (which
+        already counts every request it has answered) and ``reset_seconds`` until
+        the window resets.
+        """
+        with self._cond:
+            now = time.monotonic()
+            if reset_seconds is not None:
+                self._reset_at = now + max(0.0, reset_seconds) + self.reset_margin
+            elif available is not None and self._reset_at is not None and now >= self._reset_at:
+                # Our window ended while the request was in flight; the server's count opens the next one
+                self._reset_at = now + self.period
+            if available is not None:
+                # Tokens of requests still in flight are already taken, so never raise the count
+                self.tokens = min(self.tokens, max(0, int(available)))
+            self._cond.notify_all()
+
+    def pause(self, seconds: float):
+        """Empties the bucket for at least ``seconds`` (after a 429)."""
+        with self._cond:
+            self.tokens = 0
+            resume_at = time.monotonic() + seconds
+            self._reset_at = max(self._reset_at or 0.0, resume_at)
+            self._cond.notify_all()
+
+
+class RateLimitedClient:
+    """
+    HTTP GET client for quota-limited APIs, built on a pooled ``requests`` session.
+
+    Every request takes a token from the shared :class:`TokenBucket` (so concurrent
+    callers use the quota fully but never exceed it) and is sent with connect/read
+    timeouts. 429 and 5xx responses and connection errors/timeouts are retried up
+    to ``max_retries`` times with exponential backoff and jitter; a 429 waits for
+    ``Retry-After`` or the quota reset instead when the server names one.
+
+    Args:
+        session (requests.Session): Keep-alive session the requests go through.
+        bucket (TokenBucket, optional): Rate limiter. Defaults to no limit.
+        max_retries (int): Retries after the first attempt.
+        backoff_base (float): Delay before the first retry; doubles with every retry.
+        backoff_max (float): Upper bound of a single delay.
+        timeout (tuple): ``(connect, read)`` timeouts in seconds.
+    """
+
+    def __init__(self, session: "requests.Session", bucket: Optional[TokenBucket] = None,
+                 max_retries: int = HTTP_MAX_RETRIES, backoff_base: float = HTTP_BACKOFF_BASE,
+                 backoff_max: float = HTTP_BACKOFF_MAX,
+                 timeout: Tuple[float, float] = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)):
+        self.session = session
+        self.bucket = bucket
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.retries = 0
+
+    def _backoff(self, attempt: int) -> float:
+        # Equal jitter: half the exponential delay plus a random share of the other half
+        delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _retry_delay(self, response: "requests.Response", attempt: int) -> float:
+        if response.status_code == 429:
+            wait = _header_number(response.headers, "Retry-After")
+            if wait is None:
+                wait = _header_number(response.headers, RESET_HEADER)
+            if wait is not None:
+                # A little jitter so callers that were throttled together do not return together
+                return min(self.backoff_max, wait) + random.uniform(0, self.backoff_base / 4)
+        return self._backoff(attempt)
+
+    def _sync(self, response: "requests.Response"):
+        if self.bucket is None:
+            return
+        available = _header_number(response.headers, AVAILABLE_HEADER)
+        reset = _header_number(response.headers, RESET_HEADER)
+        if available is not None or reset is not None:
+            self.bucket.update(available, reset)
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, **kwargs) -> "requests.Response":
+        """
+        Sends a GET request, retrying as described above.
+
+        Returns:
+            requests.Response: The first non-retryable response, or the last response
+                once the retries are used up.
+        Raises:
+            requests.RequestException: If the last attempt failed to connect or timed out.
+        """
+        import requests
+
+        attempt = 0
+        while True:
+            if self.bucket is not None:
+                self.bucket.acquire()
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                reason = type(e).__name__
+            else:
+                self._sync(response)
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                delay = self._retry_delay(response, attempt)
+                if response.status_code == 429 and self.bucket is not None:
+                    self.bucket.pause(delay)
+                reason = f"status {response.status_code}"
+
+            attempt += 1
+            self.retries += 1
+            print(f"--- [HTTPClient] {reason} from {url.split('?', 1)[0]}, "
+                  f"retry {attempt}/{self.max_retries} in {delay:.1f}s ---")
+            time.sleep(delay)
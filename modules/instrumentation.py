@@ -0,0 +1,201 @@
+import sys
+import json
+import time
+import uuid
+import inspect
+import functools
+import threading
+import contextvars
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from modules.constants import TRACER_MAX_RECORDS
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+_current_stage: contextvars.ContextVar[Optional["StageMetrics"]] = contextvars.ContextVar("current_stage", default=None)
+_current_run: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_run", default=None)
+
+
+def _peak_rss_kb() -> int:
+    """Peak resident set size of this process in KB (0 where unsupported)."""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in KB on Linux
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+@dataclass
+class StageMetrics:
+    """Measurements for one execution of a pipeline stage."""
+    stage: str
+    run_id: Optional[str] = None
+    started_at: float = 0.0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    peak_rss_delta_kb: int = 0
+    counters: Dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+class PipelineTracer:
+    """
+    Records wall time, CPU time, peak RSS growth and stage-specific counters for
+    every wrapped pipeline stage.
+
+    Stages are wrapped with :meth:`wrap`; code running inside a stage reports
+    counters through :meth:`count` / :meth:`set`, which are no-ops outside of a
+    traced stage. Records can be exported as JSON lines or in the Prometheus text
+    exposition format.
+
+    Note that CPU time is process-wide, so it includes work done by other stages
+    running concurrently.
+
+    Args:
+        max_records (int, optional): Stage records kept; the oldest are dropped first,
+            so a long-running process does not grow without bound. None keeps all.
+    """
+
+    def __init__(self, max_records: Optional[int] = TRACER_MAX_RECORDS):
+        self.stages: Deque[StageMetrics] = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+        self._last_run: Optional[str] = None
+
+    def begin_run(self, run_id: Optional[str] = None) -> str:
+        """Starts a new run; stages executed in this context are tagged with its id."""
+        run_id = run_id or uuid.uuid4().hex[:12]
+        _current_run.set(run_id)
+        self._last_run = run_id
+        return run_id
+
+    def _start(self, stage: str) -> StageMetrics:
+        metrics = StageMetrics(stage=stage, run_id=_current_run.get(), started_at=time.time())
+        metrics._t0 = (time.perf_counter(), time.process_time(), _peak_rss_kb())
+        return metrics
+
+    def _finish(self, metrics: StageMetrics, error: Optional[BaseException] = None):
+        wall0, cpu0, rss0 = metrics._t0
+        metrics.wall_seconds = time.perf_counter() - wall0
+        metrics.cpu_seconds = time.process_time() - cpu0
+        metrics.peak_rss_delta_kb = max(0, _peak_rss_kb() - rss0)
+        if error is not None:
+            metrics.error = f"{type(error).__name__}: {error}"
+        del metrics._t0
+        with self._lock:
+            self.stages.append(metrics)
+
+    def wrap(self, stage: str, fn: Callable) -> Callable:
+        """Returns ``fn`` (sync or async) instrumented as the stage ``stage``."""
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                metrics = self._start(stage)
+                token = _current_stage.set(metrics)
+                try:
+                    result = await fn(*args, **kwargs)
+                except BaseException as e:
+                    self._finish(metrics, e)
+                    raise
+                finally:
+                    _current_stage.reset(token)
+                self._finish(metrics)
+                return result
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            metrics = self._start(stage)
+            token = _current_stage.set(metrics)
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                self._finish(metrics, e)
+                raise
+            finally:
+                _current_stage.reset(token)
+            self._finish(metrics)
+            return result
+        return wrapper
+
+    @staticmethod
+    def count(name: str, value: float = 1):
+        """Adds ``value`` to a counter of the stage currently executing."""
+        metrics = _current_stage.get()
+        if metrics is not None:
+            metrics.counters[name] = metrics.counters.get(name, 0) + value
+
+    @staticmethod
+    def set(name: str, value: float):
+        """Sets a gauge-style counter (e.g. a ratio) of the stage currently executing."""
+        metrics = _current_stage.get()
+        if metrics is not None:
+            metrics.counters[name] = value
+
+    def records(self, run_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Returns the recorded stages as dicts, optionally filtered to one run."""
+        with self._lock:
+            stages = list(self.stages)
+        return [asdict(m) for m in stages if run_id is None or m.run_id == run_id]
+
+    def discard(self, run_id: str):
+        """Drops the records of one run, e.g. once a service has finished the job."""
+        with self._lock:
+            kept = [m for m in self.stages if m.run_id != run_id]
+            self.stages.clear()
+            self.stages.extend(kept)
+
+    def write_jsonl(self, path: str, run_id: Optional[str] = None):
+        """Appends one JSON object per recorded stage to ``path``."""
+        with open(path, "a", encoding="utf-8") as f:
+            for record in self.records(run_id):
+                f.write(json.dumps(record) + "\n")
+
+    def to_prometheus(self, run_id: Optional[str] = None) -> str:
+        """Renders the recorded stages in the Prometheus text exposition format."""
+        series: Dict[str, List[str]] = {}
+        for record in self.records(run_id):
+            labels = f'stage="{record["stage"]}",run_id="{record["run_id"] or ""}"'
+            values = {
+                "wall_seconds": record["wall_seconds"],
+                "cpu_seconds": record["cpu_seconds"],
+                "peak_rss_delta_kb": record["peak_rss_delta_kb"],
+            }
+            values.update(record["counters"])
+            for name, value in values.items():
+                series.setdefault(f"podcast_stage_{name}", []).append(f"{{{labels}}} {value}")
+
+        lines = []
+        for metric, samples in series.items():
+            lines.append(f"# TYPE {metric} gauge")
+            lines.extend(f"{metric}{sample}" for sample in samples)
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str, run_id: Optional[str] = None):
+        """Writes the recorded stages to ``path`` as a Prometheus textfile."""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus(run_id))
+
+    def format_breakdown(self, run_id: Optional[str] = None) -> str:
+        """Returns a human-readable per-stage table for one run (the latest by default)."""
+        records = self.records(run_id or self._last_run)
+        total = sum(r["wall_seconds"] for r in records)
+        lines = [f"{'stage':<18}{'wall (s)':>10}{'cpu (s)':>10}{'rss +KB':>10}{'share':>8}  counters"]
+        for r in records:
+            share = r["wall_seconds"] / total if total else 0.0
+            counters = ", ".join(
+                f"{k}={v:.2f}" if isinstance(v, float) else f"{k}={v}" for k, v in r["counters"].items()
+            )
+            if r["error"]:
+                counters = f"{counters}, error={r['error']}" if counters else f"error={r['error']}"
+            lines.append(
+                f"{r['stage']:<18}{r['wall_seconds']:>10.2f}{r['cpu_seconds']:>10.2f}"
+                f"{r['peak_rss_delta_kb']:>10}{share:>8.0%}  {counters}"
+            )
+        lines.append(f"{'total':<18}{total:>10.2f}")
+        return "\n".join(lines)
@@ -1,23 +1,106 @@
 import os
-from typing import Annotated, TypedDict, List, Dict, Any
+import re
+import asyncio
+import hashlib
+import operator
+import threading
+import contextlib
+from dataclasses import asdict
+from typing import Annotated, TypedDict, List, Dict, Any, Optional, Union
 from datetime import datetime
 
-from langgraph.graph import StateGraph, START, END
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
-
-from modules.tools import get_matches_by_date, local_text_to_speech, search_football_news
+from modules.tools import NewsSearchPool, get_matches_by_date, local_dialogue_to_speech, local_text_to_speech
 from modules.utils import wave_file
-from modules.constants import DEFAULT_COMPETITIONS
+from modules.models import Match, parse_matches
+from modules.context import ContextBuilder, estimate_tokens
+from modules.cache import LLMResponseCache
+from modules.instrumentation import PipelineTracer
+from modules.streaming import ScriptStreamParser
+from modules.dialogue import dialogue_instructions, parse_dialogue
+from modules.multilingual import SharedWorkSummary, language_output_path, parse_languages, translation_prompt
+from modules.constants import (
+    COMPETITION_NAMES,
+    DEFAULT_COMPETITIONS,
+    DIALOGUE_HOSTS,
+    LANGUAGE_MAX_CONCURRENCY,
+    LANGUAGE_NAMES,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_TTL,
+    NEWS_SEARCH_MAX_CONCURRENCY,
+    NEWS_SEARCH_MAX_RESULTS,
+    NEWS_SEARCH_TIMEOUT,
+    PODCAST_LANGUAGES,
+    PROMPT_CONTEXT_TOKEN_BUDGET,
+)
+
+# Sampling parameters of the LLM client that are part of the completion cache key
+_LLM_SAMPLING_PARAMS = ("temperature", "top_p", "max_tokens", "seed", "frequency_penalty",
+                        "presence_penalty", "stop", "reasoning_effort")
+
+# Graph nodes in execution order with the state key each one produces; a checkpointed
+# run resumes at the first node whose output is missing
+_NODE_OUTPUTS = (
+    ("fetch_matches", "matches"),
+    ("search_league_news", "league_news"),
+    ("prepare_tts", "tts_warmup"),
+    ("search_news", "news"),
+    ("build_context", "context"),
+    ("generate_script", "script"),
+    ("tts", "audio_path"),
+)
+
+# LangGraph, LangChain and the TTS stack are imported where they are first needed
+# (graph construction, LLM client creation, the individual nodes) so that importing
+# this module stays cheap.
+
+def extract_script(content: str) -> str:
+    """
+    Extracts the podcast script from an LLM completion: the content of the first
+    <script> block outside <think> blocks (up to the end of the completion if the
+    block is never closed), or, failing that, the completion without <think>
+    blocks. Stray script tags are removed. Falls back to the raw completion if
+    nothing is left. ``ScriptStreamParser`` applies the same rules to a stream.
+    """
+    without_thinking = re.sub(r'<think>.*?(?:</think>|$)', '', content, flags=re.DOTALL)
+    script_match = re.search(r'<script>(.*?)(?:</script>|$)', without_thinking, re.DOTALL)
+    final_script = script_match.group(1) if script_match else without_thinking
+    final_script = re.sub(r'</?script>', '', final_script).strip()
+    
+    if not final_script:
+        final_script = content
+    return final_script
 
 # Define the State
 class AgentState(TypedDict):
     query: str
-    matches: Dict[str, Any]
+    # Optional run inputs: match date (YYYY-MM-DD, default today), competition codes
+    # (default DEFAULT_COMPETITIONS) and where to write the episode audio
+    date: str
+    competitions: List[str]
+    output_path: str
+    # Compact match records parsed once at fetch time (see modules/models.py)
+    matches: List[Match]
     news: List[str]
+    # News snippets per match (aligned with ``matches``) and the budgeted prompt context
+    snippets: List[List[str]]
+    # League-wide news snippets, searched in parallel with the match fetch
+    league_news: List[str]
+    # News searches made, summed over search_news and search_league_news
+    search_calls: Annotated[int, operator.add]
+    # Football-Data requests fetch_matches made (0 when the matches were passed in)
+    match_fetches: int
+    context: str
     script: str
+    # Set by prepare_tts once the TTS model load is running in the background
+    tts_warmup: bool
     audio_path: str
-    errors: List[str]
+    # Multilingual mode: script and audio per language code (``script`` and ``audio_path``
+    # hold the first language) and what the languages shared (see SharedWorkSummary)
+    scripts: Dict[str, str]
+    audio_paths: Dict[str, str]
+    shared_work: Dict[str, Any]
+    # Merged across nodes, including ones running concurrently
+    errors: Annotated[List[str], operator.add]
 
 class FootballPodcastAgent:
     """
@@ -25,62 +108,236 @@ class FootballPodcastAgent:
     and converting it to audio using LangGraph.
     """
 
-    def __init__(self):
+    def __init__(self, news_max_concurrency: int = NEWS_SEARCH_MAX_CONCURRENCY,
+                 news_timeout: float = NEWS_SEARCH_TIMEOUT,
+                 tts_chunked: Optional[bool] = None,
+                 warmup_tts: Optional[bool] = None,
+                 warmup_synthesis: Optional[bool] = None,
+                 tracer: Optional[PipelineTracer] = None,
+                 stream_tts: Optional[bool] = None,
+                 tts_concurrency: Optional[int] = None,
+                 context_token_budget: Optional[int] = None,
+                 llm_cache: Optional[LLMResponseCache] = None,
+                 checkpoint_path: Optional[str] = None,
+                 parallel: bool = True,
+                 dialogue: Optional[bool] = None,
+                 languages: Optional[Union[str, List[str]]] = None,
+                 language_concurrency: int = LANGUAGE_MAX_CONCURRENCY,
+                 llm_concurrency: Optional[int] = None):
+        self.news_max_concurrency = news_max_concurrency
+        self.news_timeout = news_timeout
+        # News search pool shared by both search nodes and every run; see news_pool()
+        self._news_pool: Optional[NewsSearchPool] = None
+        self._news_pool_loop: Optional[asyncio.AbstractEventLoop] = None
+        # Sentence-chunked, streaming synthesis (opt-in, also via TTS_CHUNKED=1)
+        self.tts_chunked = os.getenv("TTS_CHUNKED", "0") == "1" if tts_chunked is None else tts_chunked
+        # Fan-out/fan-in topology; False runs every node in one sequential chain
+        self.parallel = parallel
+        # Stream LLM tokens straight into chunked TTS (opt-in, also via LLM_STREAM_TTS=1)
+        self.stream_tts = os.getenv("LLM_STREAM_TTS", "0") == "1" if stream_tts is None else stream_tts
+        # Two-host dialogue with one voice per host (opt-in, also via PODCAST_DIALOGUE=1);
+        # reference clips come from TTS_VOICE_<HOST>, e.g. TTS_VOICE_ALEX
+        self.dialogue = os.getenv("PODCAST_DIALOGUE", "0") == "1" if dialogue is None else dialogue
+        self.voices = {host: os.getenv(f"TTS_VOICE_{host.upper()}") for host in DIALOGUE_HOSTS}
+        # Voice of single-host episodes: a registered voice name (TTS_VOICES) or a reference clip
+        self.voice = os.getenv("TTS_VOICE") or None
+        # Episode languages (also via PODCAST_LANGUAGES=en,ar); anything but English alone uses
+        # the multilingual TTS model and writes one file per language
+        self.languages = parse_languages(languages or os.getenv("PODCAST_LANGUAGES") or PODCAST_LANGUAGES)
+        self.multilingual = self.languages != ["en"]
+        # Translations in flight at once
+        self.language_concurrency = language_concurrency
+        if self.multilingual and self.dialogue:
+            raise ValueError("Dialogue mode supports English episodes only; drop PODCAST_LANGUAGES or dialogue.")
+        # Caps concurrent synthesis when several runs share this agent (None = unbounded)
+        self._tts_semaphore = asyncio.Semaphore(tts_concurrency) if tts_concurrency else None
+        # Caps LLM requests in flight across all runs sharing this agent (None = unbounded); a
+        # thread semaphore, as completions run in worker threads
+        self._llm_semaphore = threading.BoundedSemaphore(llm_concurrency) if llm_concurrency else None
+        # Token budget of the prompt context (also via PROMPT_CONTEXT_TOKENS); see modules/context.py
+        if context_token_budget is None:
+            context_token_budget = int(os.getenv("PROMPT_CONTEXT_TOKENS", PROMPT_CONTEXT_TOKEN_BUDGET))
+        self.context_builder = ContextBuilder(token_budget=context_token_budget)
+        # Per-node timings and counters; see modules/instrumentation.py
+        self.tracer = tracer or PipelineTracer()
         self.llm = self._get_llm()
+        # Persistent completion cache (opt-in, also via LLM_CACHE_DIR)
+        self.llm_cache = llm_cache or self._get_llm_cache()
+        # SQLite file persisting every node's output per run (opt-in, also via PIPELINE_CHECKPOINT_DB)
+        self.checkpoint_path = checkpoint_path or os.getenv("PIPELINE_CHECKPOINT_DB") or None
+        # Opt-in: load the TTS model in the background so it overlaps the fetch/search/LLM stages
+        if warmup_tts is None:
+            warmup_tts = os.getenv("TTS_WARMUP", "0") == "1"
+        if warmup_synthesis is None:
+            warmup_synthesis = os.getenv("TTS_WARMUP_SYNTHESIS", "0") == "1"
+        self.warmup_tts = warmup_tts
+        self.warmup_synthesis = warmup_synthesis
         self.graph = self._create_podcast_graph()
 
+        if warmup_tts:
+            from modules.tts import TTSManager
+            TTSManager.start_warmup(dummy_synthesis=warmup_synthesis, **self._warmup_options())
+
+    def _warmup_options(self) -> Dict[str, Any]:
+        return {"multilingual": True} if self.multilingual else {}
+
     def _get_llm(self):
+        from langchain_openai import ChatOpenAI
+
         local_base_url = os.getenv("LOCAL_OPENAI_BASE_URL", "http://localhost:11434/v1")
         local_model = os.getenv("LOCAL_MODEL_NAME", "qwen3:0.6b")
+        self.llm_base_url = local_base_url
+        self.llm_model_name = local_model
         return ChatOpenAI(
             model=local_model,
             openai_api_key="none",
             base_url=local_base_url,
         )
 
+    @staticmethod
+    def _get_llm_cache() -> Optional[LLMResponseCache]:
+        cache_dir = os.getenv("LLM_CACHE_DIR")
+        if not cache_dir:
+            return None
+        ttl = float(os.getenv("LLM_CACHE_TTL", LLM_CACHE_TTL))
+        return LLMResponseCache(
+            cache_dir,
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", LLM_CACHE_MAX_ENTRIES)),
+            ttl=ttl if ttl > 0 else None,
+        )
+
+    def _llm_cache_key(self, messages) -> str:
+        params = {}
+        for name in _LLM_SAMPLING_PARAMS:
+            value = getattr(self.llm, name, None)
+            if value is None or isinstance(value, (str, int, float, bool, list, tuple)):
+                params[name] = value
+        return LLMResponseCache.key(
+            self.llm_model_name,
+            self.llm_base_url,
+            [(message.type, message.content) for message in messages],
+            params,
+        )
+
+    def complete(self, messages) -> str:
+        """Returns the completion text for ``messages``, going through the LLM cache if enabled."""
+        def invoke():
+            with self._llm_semaphore or contextlib.nullcontext():
+                response = self.llm.invoke(messages)
+            self._record_token_usage(response)
+            return response.content
+
+        if self.llm_cache is None:
+            return invoke()
+        content, source = self.llm_cache.get_or_compute(self._llm_cache_key(messages), invoke)
+        print(f"--- [FootballPodcastAgent] LLM cache {source} ---")
+        self.tracer.count(f"llm_cache_{source}")
+        return content
+
     # Node 1: Fetch Matches
     def fetch_matches_node(self, state: AgentState):
         print("--- [FootballPodcastAgent] Node: fetch_matches_node ---")
-        today = datetime.now().strftime("%Y-%m-%d")
+        if state.get("matches"):
+            # Matches were fetched up front (e.g. one range request for a whole backfill)
+            self.tracer.count("matches_fetched", len(state["matches"]))
+            return {"match_fetches": 0}
+        date = state.get("date") or datetime.now().strftime("%Y-%m-%d")
+        competitions = state.get("competitions") or DEFAULT_COMPETITIONS
         try:
-            result = get_matches_by_date(today, DEFAULT_COMPETITIONS)
-            matches_list = result.get("matches", [])
+            result = get_matches_by_date(date, competitions)
+            if "error" in result:
+                print(f"--- [FootballPodcastAgent] Error in fetch_matches_node: {result['error']} ---")
+                return {"matches": [], "match_fetches": 1, "errors": [f"Error fetching matches: {result['error']}"]}
+            matches_list = parse_matches(result)
             print(f"--- [FootballPodcastAgent] Matches Fetched: {len(matches_list)} ---")
-            return {"matches": result, "errors": []}
+            self.tracer.count("matches_fetched", len(matches_list))
+            return {"matches": matches_list, "match_fetches": 1, "errors": []}
         except Exception as e:
             print(f"--- [FootballPodcastAgent] Error in fetch_matches_node: {e} ---")
-            return {"errors": [f"Error fetching matches: {str(e)}"]}
+            return {"matches": [], "match_fetches": 1, "errors": [f"Error fetching matches: {str(e)}"]}
 
     # Node 2: Search Web for News
-    def search_news_node(self, state: AgentState):
+    async def search_news_node(self, state: AgentState):
         print("--- [FootballPodcastAgent] Node: search_news_node ---")
-        matches_data = state.get("matches", {})
-        matches_list = matches_data.get("matches", [])
+        matches_list = state.get("matches") or []
         
         if not matches_list:
             return {"news": ["No matches found today."]}
         
+        queries = [match.news_query for match in matches_list]
+
+        # Fetch recent news for all matches concurrently; results come back in match order
+        self.tracer.count("search_calls", len(queries))
+        snippets_per_match = await self.news_pool().search_many(queries, max_results=NEWS_SEARCH_MAX_RESULTS)
+
         all_news = []
-        for match in matches_list:
-            home = match.get('homeTeam', {}).get('name', 'Unknown')
-            away = match.get('awayTeam', {}).get('name', 'Unknown')
-            score = f"{match.get('score', {}).get('fullTime', {}).get('home', '?')}-{match.get('score', {}).get('fullTime', {}).get('away', '?')}"
-            
-            match_summary = f"Match: {home} vs {away}. Result: {score}."
-            all_news.append(match_summary)
-            
-            # Fetch recent news related to this match
-            query = f"{home} vs {away} football news"
-            news_snippets = search_football_news(query, max_results=3)
+        snippets = []
+        for match, news_snippets in zip(matches_list, snippets_per_match):
+            all_news.append(match.summary)
             if news_snippets:
-                all_news.append(f"Latest news around {home} vs {away}:\n{news_snippets}")
+                all_news.append(f"Latest news around {match.home} vs {match.away}:\n{news_snippets}")
+            # Search errors and timeouts carry no "- title: body" lines and are left out
+            snippets.append([line for line in news_snippets.splitlines() if line.startswith("- ")])
         
-        return {"news": all_news}
+        return {"news": all_news, "snippets": snippets, "search_calls": len(queries)}
 
-    # Node 3: Generate Script
-    def generate_script_node(self, state: AgentState):
-        print("--- [FootballPodcastAgent] Node: generate_script_node ---")
-        context = "\n".join(state.get("news", []))
+    # Node 2b (parallel to the match fetch): Search league-wide news
+    async def search_league_news_node(self, state: AgentState):
+        print("--- [FootballPodcastAgent] Node: search_league_news_node ---")
+        competitions = state.get("competitions") or DEFAULT_COMPETITIONS
+        queries = [f"{COMPETITION_NAMES.get(code, code)} football news" for code in competitions]
+        self.tracer.count("search_calls", len(queries))
+        results = await self.news_pool().search_many(queries, max_results=NEWS_SEARCH_MAX_RESULTS)
+        return {"league_news": [line for result in results for line in result.splitlines() if line.startswith("- ")],
+                "search_calls": len(queries)}
+
+    # Node 2c (parallel to everything before TTS): Start loading the TTS model
+    def prepare_tts_node(self, state: AgentState):
+        """
+        Kicks off the TTS model load in the background and returns at once. Graph
+        steps only advance when every node of a step is done, so awaiting the load
+        here would hold back the news search; the tts node (or the streaming script
+        node) waits for it instead, and retries the load if the warm-up failed.
+
+        Only part of the parallel graph when warm-up is enabled (``warmup_tts``);
+        a warm-up that failed in an earlier run is restarted here.
+        """
+        print("--- [FootballPodcastAgent] Node: prepare_tts_node ---")
+        from modules.tts import TTSManager
+        TTSManager.start_warmup(dummy_synthesis=self.warmup_synthesis, **self._warmup_options())
+        return {"tts_warmup": True}
+
+    # Node 3: Build the prompt context within the token budget
+    def build_context_node(self, state: AgentState):
+        print("--- [FootballPodcastAgent] Node: build_context_node ---")
+        baseline = "\n".join(state.get("news", []))
+        matches_list = state.get("matches") or []
+        league_news = state.get("league_news") or []
+        if not matches_list and not league_news:
+            return {"context": baseline}
+
+        result = self.context_builder.build(matches_list, state.get("snippets") or [],
+                                            query=state.get("query", ""),
+                                            baseline="\n".join(state.get("news", []) + league_news),
+                                            general=league_news)
+        print(f"--- [FootballPodcastAgent] Context: {result.tokens} tokens "
+              f"({result.tokens_saved} saved, {result.duplicates_removed} duplicates removed) ---")
+        self.tracer.count("context_tokens", result.tokens)
+        self.tracer.count("context_tokens_saved", result.tokens_saved)
+        self.tracer.count("duplicates_removed", result.duplicates_removed)
+        self.tracer.count("snippets_dropped", result.snippets_dropped)
+        if not matches_list:
+            # Keep the "no matches" note ahead of the league news
+            return {"context": "\n".join(filter(None, [baseline, result.text]))}
+        return {"context": result.text}
+
+    def _build_messages(self, state: AgentState, language: Optional[str] = None):
+        context = state.get("context") or "\n".join(state.get("news", []))
+        style = "The script should be conversational and professional. "
+        if self.dialogue:
+            style += dialogue_instructions(DIALOGUE_HOSTS)
+        if language and language != "en":
+            style += f"Write the script in {LANGUAGE_NAMES[language]}. "
         
         prompt = f"""
         Write a short, exciting podcast script summarizing today's football matches.
@@ -90,70 +347,442 @@ class FootballPodcastAgent:
         Matches Info:
         {context}
         
-        The script should be conversational and professional. 
+        {style}
         Wrap the final script in <script> tags.
         """
         
-        messages = [
+        from langchain_core.messages import HumanMessage, SystemMessage
+
+        return [
             SystemMessage(content="You are a football podcast writer. You provide concise match summaries."),
             HumanMessage(content=prompt)
         ]
+
+    # Node 4: Generate Script
+    def generate_script_node(self, state: AgentState):
+        print("--- [FootballPodcastAgent] Node: generate_script_node ---")
+        messages = self._build_messages(state)
         
         try:
-            response = self.llm.invoke(messages)
-            content = response.content
-            
-            import re
-            script_match = re.search(r'<script>(.*?)</script>', content, re.DOTALL)
-            if script_match:
-                final_script = script_match.group(1).strip()
-            else:
-                final_script = re.sub(r'<think>.*?(?:</think>|$)', '', content, flags=re.DOTALL).strip()
-                final_script = re.sub(r'</?script>', '', final_script).strip()
+            content = self.complete(messages)
             
-            if not final_script:
-                final_script = content
+            final_script = extract_script(content)
             
             print(f"--- [FootballPodcastAgent] Script Generated Successfully ---")
             return {"script": final_script}
         except Exception as e:
             print(f"--- [FootballPodcastAgent] Error in generate_script_node: {e} ---")
-            return {"script": "", "errors": state.get("errors", []) + [f"Error generating script: {str(e)}"]}
+            return {"script": "", "errors": [f"Error generating script: {str(e)}"]}
+
+    @staticmethod
+    def _build_translation_messages(script: str, language: str):
+        from langchain_core.messages import HumanMessage, SystemMessage
+
+        return [
+            SystemMessage(content="You are a football podcast translator."),
+            HumanMessage(content=translation_prompt(script, language)),
+        ]
+
+    # Node 4 (multilingual mode): Write the script once, translate it per language
+    async def generate_scripts_node(self, state: AgentState):
+        """
+        Writes the script in the first language from the shared context, then
+        translates it into the other languages with at most ``language_concurrency``
+        LLM calls in flight. Translation prompts carry only the script, not the
+        match and news context. A failed translation drops that language.
+        """
+        print("--- [FootballPodcastAgent] Node: generate_scripts_node ---")
+        primary, others = self.languages[0], self.languages[1:]
+        try:
+            content = await asyncio.to_thread(self.complete, self._build_messages(state, language=primary))
+        except Exception as e:
+            print(f"--- [FootballPodcastAgent] Error in generate_scripts_node: {e} ---")
+            return {"script": "", "errors": [f"Error generating script: {str(e)}"]}
+        scripts = {primary: extract_script(content)}
+        slots = asyncio.Semaphore(self.language_concurrency)
 
-    # Node 4: Text to Speech
+        async def translate(language: str) -> str:
+            async with slots:
+                print(f"--- [FootballPodcastAgent] Translating script into {LANGUAGE_NAMES[language]} ---")
+                messages = self._build_translation_messages(scripts[primary], language)
+                return extract_script(await asyncio.to_thread(self.complete, messages))
+
+        errors = []
+        results = await asyncio.gather(*(translate(language) for language in others), return_exceptions=True)
+        for language, result in zip(others, results):
+            if isinstance(result, Exception):
+                print(f"--- [FootballPodcastAgent] Error translating into {language}: {result} ---")
+                errors.append(f"Error translating script into {language}: {str(result)}")
+            else:
+                scripts[language] = result
+        self.tracer.count("scripts_translated", len(scripts) - 1)
+        print(f"--- [FootballPodcastAgent] Scripts Generated: {', '.join(scripts)} ---")
+        return {"script": scripts[primary], "scripts": scripts, "errors": errors}
+
+    # Node 4 (streaming mode): Generate Script and synthesize it while it streams
+    async def generate_script_streaming_node(self, state: AgentState):
+        """
+        Streams the LLM completion, pushes each complete script sentence into the
+        chunked TTS pipeline as soon as it is parsed, and returns both the script
+        and the audio path. The LLM and TTS stages therefore overlap; the tts node
+        is skipped when this node already produced audio.
+        """
+        print("--- [FootballPodcastAgent] Node: generate_script_streaming_node ---")
+        from modules.tts import TTSManager
+
+        messages = self._build_messages(state)
+        parser = ScriptStreamParser()
+        sentences: asyncio.Queue = asyncio.Queue()
+
+        cache_key = self._llm_cache_key(messages) if self.llm_cache is not None else None
+
+        async def stream():
+            async with self._llm_stream_slot():
+                async for chunk in self.llm.astream(messages):
+                    self._record_token_usage(chunk)
+                    for sentence in parser.feed(chunk.content or ""):
+                        sentences.put_nowait(sentence)
+
+        async def produce():
+            try:
+                if cache_key is None:
+                    await stream()
+                else:
+                    cached, future, owner = await asyncio.to_thread(self.llm_cache.claim, cache_key)
+                    if owner:
+                        self.tracer.count("llm_cache_miss")
+                        try:
+                            await stream()
+                        except BaseException as e:
+                            self.llm_cache.finish(cache_key, future, error=e)
+                            raise
+                        await asyncio.to_thread(self.llm_cache.finish, cache_key, future, parser.content)
+                    else:
+                        if cached is None:
+                            # An identical request is streaming right now: wait for its completion
+                            self.tracer.count("llm_cache_coalesced")
+                            cached = await asyncio.wrap_future(future)
+                        else:
+                            print("--- [FootballPodcastAgent] LLM cache hit ---")
+                            self.tracer.count("llm_cache_hit")
+                        # Replay the completion through the same parser
+                        for sentence in parser.feed(cached):
+                            sentences.put_nowait(sentence)
+                for sentence in parser.close():
+                    sentences.put_nowait(sentence)
+            finally:
+                sentences.put_nowait(None)
+
+        async def consume():
+            while (sentence := await sentences.get()) is not None:
+                yield sentence
+
+        async def synthesize():
+            async with self.tts_slot():
+                voice_options = {"voice": self.voice} if self.voice else {}
+                path = await TTSManager.generate_audio_stream(consume(), file_name=state.get("output_path") or None,
+                                                              **voice_options)
+                self._record_audio_stats()
+                return path
+
+        llm_task = asyncio.create_task(produce())
+        tts_task = asyncio.create_task(synthesize())
+        llm_result, tts_result = await asyncio.gather(llm_task, tts_task, return_exceptions=True)
+
+        if isinstance(llm_result, Exception):
+            print(f"--- [FootballPodcastAgent] Error in generate_script_streaming_node: {llm_result} ---")
+            if not isinstance(tts_result, Exception) and os.path.exists(tts_result):
+                os.remove(tts_result)
+            return {"script": "", "errors": [f"Error generating script: {str(llm_result)}"]}
+
+        result = {"script": extract_script(parser.content)}
+        print("--- [FootballPodcastAgent] Script Generated Successfully ---")
+        if isinstance(tts_result, Exception):
+            # Leave audio_path unset so the tts node retries with the full script
+            print(f"--- [FootballPodcastAgent] Error in streaming TTS: {tts_result} ---")
+        elif parser.sentences_emitted == 0:
+            os.remove(tts_result)
+        else:
+            result["audio_path"] = tts_result
+        return result
+
+    # Node 5: Text to Speech
     async def tts_node(self, state: AgentState):
         print("--- [FootballPodcastAgent] Node: tts_node ---")
         script = state.get("script", "")
         if not script:
             return {"errors": ["No script available for TTS."]}
+        if state.get("audio_path"):
+            # Already synthesized while the script was streaming
+            return {}
         
         try:
-            audio_path = await local_text_to_speech(script)
+            from modules.tts import TTSManager
+            await TTSManager.wait_until_ready()
+            tts_options = {"chunked": True} if self.tts_chunked else {}
+            if state.get("output_path"):
+                tts_options["file_name"] = state["output_path"]
+            async with self.tts_slot():
+                if self.dialogue:
+                    tts_options.pop("chunked", None)
+                    audio_path = await local_dialogue_to_speech(
+                        parse_dialogue(script, DIALOGUE_HOSTS), voices=self.voices, **tts_options
+                    )
+                else:
+                    if self.voice:
+                        tts_options["voice"] = self.voice
+                    audio_path = await local_text_to_speech(script, **tts_options)
+                self._record_audio_stats()
             return {"audio_path": audio_path}
         except Exception as e:
             print(f"--- [FootballPodcastAgent] Error in local TTS: {e} ---")
             return {"errors": [f"Error in local TTS: {str(e)}"]}
 
+    # Node 5 (multilingual mode): One episode per language on the shared multilingual model
+    async def tts_multilingual_node(self, state: AgentState):
+        """
+        Synthesizes every language's script with the multilingual model, loaded
+        once for all of them, into ``<output>_<lang>.wav``. Languages already
+        synthesized (when resuming) are kept. ``audio_path`` is set once every
+        script has audio, so a resumed run retries only the missing languages.
+        """
+        print("--- [FootballPodcastAgent] Node: tts_multilingual_node ---")
+        scripts = state.get("scripts") or {}
+        if not scripts:
+            return {"errors": ["No script available for TTS."]}
+
+        from modules.tts import TTSManager
+        audio_paths = dict(state.get("audio_paths") or {})
+        base_path = state.get("output_path") or TTSManager._new_output_path()
+        errors = []
+        for language in (language for language in self.languages if language in scripts):
+            if language in audio_paths:
+                continue
+            tts_options = {"chunked": True} if self.tts_chunked else {}
+            if self.voice:
+                tts_options["voice"] = self.voice
+            try:
+                await TTSManager.wait_until_ready()
+                async with self.tts_slot():
+                    audio_paths[language] = await local_text_to_speech(
+                        scripts[language], language=language,
+                        file_name=language_output_path(base_path, language), **tts_options
+                    )
+                    self._record_audio_stats()
+            except Exception as e:
+                print(f"--- [FootballPodcastAgent] Error in local TTS ({language}): {e} ---")
+                errors.append(f"Error in local TTS ({language}): {str(e)}")
+
+        summary = SharedWorkSummary(
+            languages=len(self.languages),
+            match_fetches=state.get("match_fetches", 0),
+            search_calls=state.get("search_calls", 0),
+            context_tokens=estimate_tokens(state.get("context", "")),
+            scripts_written=1,
+            scripts_translated=len(scripts) - 1,
+            audio_files=len(audio_paths),
+        )
+        print(f"--- [FootballPodcastAgent] Multilingual run: {summary.format()} ---")
+        self.tracer.set("languages", summary.languages)
+        self.tracer.set("search_calls_saved", summary.search_calls_saved)
+        self.tracer.set("context_tokens_saved", summary.context_tokens_saved)
+        self.tracer.set("tts_models_saved", summary.tts_models_saved)
+
+        result = {"audio_paths": audio_paths, "shared_work": asdict(summary), "errors": errors}
+        if audio_paths and all(language in audio_paths for language in scripts):
+            result["audio_path"] = audio_paths[self.languages[0]]
+        return result
+
+    def news_pool(self) -> NewsSearchPool:
+        """
+        Returns the news search pool of this agent, so concurrent searches of every node
+        and run share ``news_max_concurrency`` slots and reuse the same DDGS sessions.
+
+        The pool belongs to the running event loop; a call from another loop closes the
+        old pool and starts a new one.
+        """
+        loop = asyncio.get_running_loop()
+        if self._news_pool is None or self._news_pool_loop is not loop:
+            if self._news_pool is not None:
+                self._news_pool.close()
+            self._news_pool = NewsSearchPool(max_concurrency=self.news_max_concurrency, timeout=self.news_timeout)
+            self._news_pool_loop = loop
+        return self._news_pool
+
+    def tts_slot(self):
+        """Context manager holding one of the ``tts_concurrency`` synthesis slots (a no-op when unbounded)."""
+        return self._tts_semaphore or contextlib.nullcontext()
+
+    @contextlib.asynccontextmanager
+    async def _llm_stream_slot(self):
+        """Holds one of the ``llm_concurrency`` LLM slots while a completion streams."""
+        if self._llm_semaphore is None:
+            yield
+            return
+        await asyncio.to_thread(self._llm_semaphore.acquire)
+        try:
+            yield
+        finally:
+            self._llm_semaphore.release()
+
+    def _record_token_usage(self, response):
+        usage = getattr(response, "usage_metadata", None)
+        if isinstance(usage, dict):
+            self.tracer.count("prompt_tokens", usage.get("input_tokens", 0))
+            self.tracer.count("completion_tokens", usage.get("output_tokens", 0))
+
+    def _record_audio_stats(self):
+        from modules.tts import TTSManager
+        stats = TTSManager.last_stats
+        if stats is not None:
+            self.tracer.count("audio_seconds", stats.audio_seconds)
+            self.tracer.set("real_time_factor", stats.real_time_factor)
+            if stats.time_to_first_audio is not None:
+                self.tracer.set("time_to_first_audio", stats.time_to_first_audio)
+        if self.dialogue:
+            for speaker, speaker_stats in TTSManager.last_speaker_stats.items():
+                self.tracer.set(f"{speaker.lower()}_audio_seconds_per_second", speaker_stats.audio_seconds_per_second)
+
     # Build the Graph
-    def _create_podcast_graph(self):
+    def _create_podcast_graph(self, checkpointer=None):
+        from langgraph.graph import StateGraph, START, END
+
         workflow = StateGraph(AgentState)
 
-        workflow.add_node("fetch_matches", self.fetch_matches_node)
-        workflow.add_node("search_news", self.search_news_node)
-        workflow.add_node("generate_script", self.generate_script_node)
-        workflow.add_node("tts", self.tts_node)
+        workflow.add_node("fetch_matches", self.tracer.wrap("fetch_matches", self.fetch_matches_node))
+        workflow.add_node("search_league_news", self.tracer.wrap("search_league_news", self.search_league_news_node))
+        # The warm-up node only pays off when it overlaps the other stages
+        warmup = self.warmup_tts and self.parallel
+        if warmup:
+            workflow.add_node("prepare_tts", self.tracer.wrap("prepare_tts", self.prepare_tts_node))
+        workflow.add_node("search_news", self.tracer.wrap("search_news", self.search_news_node))
+        workflow.add_node("build_context", self.tracer.wrap("build_context", self.build_context_node))
+        # Dialogue turns and translations need the whole script, so neither mode streams
+        streaming = self.stream_tts and not self.dialogue and not self.multilingual
+        if self.multilingual:
+            generate_script, tts = self.generate_scripts_node, self.tts_multilingual_node
+        else:
+            generate_script = self.generate_script_streaming_node if streaming else self.generate_script_node
+            tts = self.tts_node
+        workflow.add_node("generate_script", self.tracer.wrap("generate_script", generate_script))
+        workflow.add_node("tts", self.tracer.wrap("tts", tts))
 
-        workflow.add_edge(START, "fetch_matches")
-        workflow.add_edge("fetch_matches", "search_news")
-        workflow.add_edge("search_news", "generate_script")
-        workflow.add_edge("generate_script", "tts")
+        if self.parallel:
+            # League news and the TTS model load need nothing from the matches or the
+            # script, so they start together with the fetch and join where needed:
+            #
+            #   START ─┬─ fetch_matches ─ search_news ─┬─ build_context ─ generate_script ─┬─ tts ─ END
+            #          ├─ search_league_news ──────────┘                                  │
+            #          └─ prepare_tts (warm-up enabled) ──────────────────────────────────┘
+            workflow.add_edge(START, "fetch_matches")
+            workflow.add_edge(START, "search_league_news")
+            workflow.add_edge("fetch_matches", "search_news")
+            workflow.add_edge(["search_news", "search_league_news"], "build_context")
+            workflow.add_edge("build_context", "generate_script")
+            if warmup:
+                workflow.add_edge(START, "prepare_tts")
+                workflow.add_edge(["generate_script", "prepare_tts"], "tts")
+            else:
+                workflow.add_edge("generate_script", "tts")
+        else:
+            chain = ["fetch_matches", "search_news", "search_league_news", "build_context",
+                     "generate_script", "tts"]
+            workflow.add_edge(START, chain[0])
+            for source, target in zip(chain, chain[1:]):
+                workflow.add_edge(source, target)
         workflow.add_edge("tts", END)
 
-        return workflow.compile()
+        return workflow.compile(checkpointer=checkpointer)
+
+    @contextlib.asynccontextmanager
+    async def _checkpointer(self):
+        """Opens the SQLite checkpointer; the connection is bound to the running event loop."""
+        import aiosqlite
+        from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+        directory = os.path.dirname(self.checkpoint_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        serde = JsonPlusSerializer(allowed_msgpack_modules=[(Match.__module__, Match.__name__)])
+        async with aiosqlite.connect(self.checkpoint_path) as conn:
+            saver = AsyncSqliteSaver(conn, serde=serde)
+            await saver.setup()
+            yield saver
+
+    @staticmethod
+    def default_run_id(query: str, date: Optional[str] = None, competitions: Optional[List[str]] = None) -> str:
+        """Deterministic run id, so rerunning the same command with ``resume=True`` finds its checkpoints."""
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        competitions = ",".join(sorted(competitions or DEFAULT_COMPETITIONS))
+        return hashlib.sha256(f"{query}|{date}|{competitions}".encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    async def _resume_config(graph, config):
+        """
+        Returns the checkpoint config to resume from, ``None`` to start from scratch
+        (no checkpoints) or ``"done"`` if every node already produced its output.
+        """
+        snapshot = await graph.aget_state(config)
+        if not snapshot.values:
+            return None
+        pending = next((node for node, key in _NODE_OUTPUTS
+                        if node in graph.nodes and snapshot.values.get(key) in (None, "")), None)
+        if pending is None:
+            return "done"
+        # Newest checkpoint taken right before the first incomplete node ran
+        async for past in graph.aget_state_history(config):
+            if pending in past.next:
+                print(f"--- [FootballPodcastAgent] Resuming at node: {pending} ---")
+                return past.config
+        return None
+
+    async def run(self, query: str, date: Optional[str] = None, competitions: Optional[List[str]] = None,
+                  matches: Optional[Union[List[Match], Dict[str, Any]]] = None, output_path: Optional[str] = None,
+                  run_id: Optional[str] = None, resume: bool = False):
+        """
+        Runs the agent graph with the given query.
+
+        Args:
+            query (str): What the podcast should be about.
+            date (str, optional): Match date (YYYY-MM-DD). Defaults to today.
+            competitions (list, optional): Competition codes. Defaults to DEFAULT_COMPETITIONS.
+            matches (list, optional): Pre-fetched matches (``Match`` records or a raw
+                Football-Data response); skips the fetch.
+            output_path (str, optional): Where to write the episode audio.
+            run_id (str, optional): Checkpoint thread id, also tagging the tracer records.
+                Defaults to :meth:`default_run_id`.
+            resume (bool): Continue the checkpointed run ``run_id`` from its first incomplete
+                node instead of starting over. Ignored when checkpointing is disabled.
+        """
+        self.tracer.begin_run(run_id)
+        inputs = {"query": query, "date": date, "competitions": competitions,
+                  "matches": parse_matches(matches) if matches is not None else None, "output_path": output_path}
+        inputs = {k: v for k, v in inputs.items() if v is not None}
+        if not self.checkpoint_path:
+            return await self.graph.ainvoke(inputs)
+
+        run_id = run_id or self.default_run_id(query, date, competitions)
+        config = {"configurable": {"thread_id": run_id}}
+        print(f"--- [FootballPodcastAgent] Run id: {run_id} ---")
+        async with self._checkpointer() as saver:
+            graph = self._create_podcast_graph(checkpointer=saver)
+            resume_config = await self._resume_config(graph, config) if resume else None
+            if resume_config == "done":
+                print(f"--- [FootballPodcastAgent] Run {run_id} already complete ---")
+                return (await graph.aget_state(config)).values
+            if resume_config is not None:
+                return await graph.ainvoke(None, resume_config)
+            # A fresh run must not inherit outputs of an earlier run with the same id
+            await saver.adelete_thread(run_id)
+            return await graph.ainvoke(inputs, config)
 
-    async def run(self, query: str):
-        """Runs the agent graph with the given query."""
-        return await self.graph.ainvoke({"query": query})
+    async def delete_run(self, run_id: str):
+        """Deletes the checkpoints of ``run_id`` (a no-op when checkpointing is disabled)."""
+        if not self.checkpoint_path:
+            return
+        async with self._checkpointer() as saver:
+            await saver.adelete_thread(run_id)
 
 # Maintain legacy creator for compatibility if needed
 def create_podcast_graph():
@@ -0,0 +1,223 @@
+import os
+import json
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from modules.cache import AudioCache
+from modules.constants import (
+    DEFAULT_COMPETITIONS,
+    LIVE_SEGMENT_CACHE_MAX_MB,
+    LIVE_SEGMENT_CONCURRENCY,
+    LIVE_STATE_DIR,
+    NEWS_SEARCH_MAX_RESULTS,
+)
+from modules.models import Match, parse_matches
+from modules.tools import get_matches_by_date
+
+
+def snapshot_key(match: Match) -> str:
+    """The Football-Data match id, or the fixture itself for records without one."""
+    return str(match.id) if match.id is not None else f"{match.home} vs {match.away}"
+
+
+def match_fingerprint(match: Match) -> List[Any]:
+    """What makes a match worth a new segment: its status and score."""
+    return [match.status, match.home_score, match.away_score]
+
+
+class MatchSnapshot:
+    """
+    The matches of the previous live update and the script segment written for
+    each, keyed on the Football-Data match id (see :func:`snapshot_key`) and
+    persisted as JSON. The file is rewritten atomically.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f).get("matches", {})
+
+    def _entry(self, match: Match) -> Optional[Dict[str, Any]]:
+        return self.entries.get(snapshot_key(match))
+
+    def diff(self, matches: List[Match]) -> Tuple[List[Match], List[Match]]:
+        """
+        Splits ``matches`` into ``(changed, unchanged)``. New matches and matches
+        whose status or score moved count as changed.
+        """
+        changed, unchanged = [], []
+        for match in matches:
+            entry = self._entry(match)
+            if entry and entry.get("segment") and entry.get("fingerprint") == match_fingerprint(match):
+                unchanged.append(match)
+            else:
+                changed.append(match)
+        return changed, unchanged
+
+    def segment(self, match: Match) -> Optional[str]:
+        entry = self._entry(match)
+        return entry.get("segment") if entry else None
+
+    def save(self, matches: List[Match], segments: Dict[str, str], stale: Optional[set] = None):
+        """
+        Records the segment of every current match (matches that left the feed are
+        dropped). ``segments`` and ``stale`` hold snapshot keys; stale matches keep no
+        fingerprint, so the next update writes them again.
+        """
+        stale = stale or set()
+        self.entries = {
+            snapshot_key(match): {
+                "fingerprint": None if snapshot_key(match) in stale else match_fingerprint(match),
+                "segment": segments[snapshot_key(match)],
+            }
+            for match in matches
+        }
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"updated_at": datetime.now().isoformat(timespec="seconds"), "matches": self.entries}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+@dataclass
+class LiveUpdate:
+    """The outcome of one incremental live update."""
+    audio_path: Optional[str]
+    script: str
+    changed: List[Match] = field(default_factory=list)
+    unchanged: List[Match] = field(default_factory=list)
+    search_calls: int = 0
+    segments_written: int = 0
+    chunks_synthesized: int = 0
+    chunks_reused: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+class LiveRunner:
+    """
+    Regenerates a matchday episode incrementally, e.g. every 15 minutes during live matches.
+
+    The episode is an intro followed by one short segment per match. Each update
+    fetches the matches, diffs them against the previous update's snapshot
+    (:class:`MatchSnapshot`) and only for matches whose status or score changed
+    searches news and asks the LLM for a new segment. Segments are synthesized
+    through a content-addressed segment cache, so the audio of unchanged segments
+    (and of the intro) is spliced in from disk and only updated segments are
+    synthesized.
+
+    Args:
+        agent (FootballPodcastAgent, optional): Provides the LLM client, completion cache
+            and TTS slots. Defaults to a new agent with ``tts_concurrency=1``.
+        competitions (list, optional): Competition codes. Defaults to DEFAULT_COMPETITIONS.
+        state_dir (str): Directory holding the match snapshots and the segment audio.
+        max_concurrency (int): Segments written by the LLM concurrently.
+    """
+
+    def __init__(self, agent=None, competitions: Optional[List[str]] = None, state_dir: str = LIVE_STATE_DIR,
+                 max_concurrency: int = LIVE_SEGMENT_CONCURRENCY):
+        if agent is None:
+            from modules.langgraph_agent import FootballPodcastAgent
+            agent = FootballPodcastAgent(tts_concurrency=1)
+        self.agent = agent
+        self.competitions = list(competitions or DEFAULT_COMPETITIONS)
+        self.state_dir = state_dir
+        self.max_concurrency = max_concurrency
+        self.segment_cache = AudioCache(os.path.join(state_dir, "segments"),
+                                        max_bytes=LIVE_SEGMENT_CACHE_MAX_MB * 1024 * 1024)
+
+    def _snapshot_path(self, date: str) -> str:
+        return os.path.join(self.state_dir, f"snapshot_{date}_{'-'.join(sorted(self.competitions))}.json")
+
+    @staticmethod
+    def _segment_messages(match: Match, previous: Optional[str], news: str):
+        from langchain_core.messages import HumanMessage, SystemMessage
+
+        status = (match.status or "scheduled").replace("_", " ").lower()
+        prompt = (
+            f"Write a two or three sentence live update about this match for a football podcast.\n"
+            f"{match.summary} Status: {status}.\n"
+            + (f"Previous update: {previous}\n" if previous else "")
+            + f"Latest news:\n{news or 'none'}\n"
+            f"Wrap the update in <script> tags."
+        )
+        return [
+            SystemMessage(content="You are a football podcast writer. You provide concise match summaries."),
+            HumanMessage(content=prompt),
+        ]
+
+    async def run(self, date: Optional[str] = None, output_path: Optional[str] = None) -> LiveUpdate:
+        """
+        Runs one incremental update and writes the full episode to ``output_path``
+        (a timestamped file in ``output/`` by default).
+        """
+        from modules.langgraph_agent import extract_script
+        from modules.tts import TTSManager, split_into_chunks
+
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        response = await asyncio.to_thread(get_matches_by_date, date, self.competitions)
+        if "error" in response:
+            print(f"--- [LiveRunner] Error fetching matches: {response['error']} ---")
+            return LiveUpdate(audio_path=None, script="", errors=[f"Error fetching matches: {response['error']}"])
+
+        matches = parse_matches(response)
+        snapshot = MatchSnapshot(self._snapshot_path(date))
+        changed, unchanged = snapshot.diff(matches)
+        update = LiveUpdate(audio_path=None, script="", changed=changed, unchanged=unchanged)
+        print(f"--- [LiveRunner] {len(matches)} match(es): {len(changed)} changed, {len(unchanged)} unchanged ---")
+
+        news: List[str] = []
+        if changed:
+            update.search_calls = len(changed)
+            news = await self.agent.news_pool().search_many([m.news_query for m in changed],
+                                                            max_results=NEWS_SEARCH_MAX_RESULTS)
+
+        slots = asyncio.Semaphore(self.max_concurrency)
+
+        async def write_segment(match: Match, match_news: str) -> str:
+            async with slots:
+                messages = self._segment_messages(match, snapshot.segment(match), match_news)
+                return extract_script(await asyncio.to_thread(self.agent.complete, messages))
+
+        segments = {snapshot_key(match): snapshot.segment(match) for match in unchanged}
+        stale = set()
+        results = await asyncio.gather(*(write_segment(m, n) for m, n in zip(changed, news)), return_exceptions=True)
+        for match, result in zip(changed, results):
+            if isinstance(result, Exception):
+                # Keep the last segment (or the bare result line) and retry on the next update
+                print(f"--- [LiveRunner] Error writing segment for {match.home} vs {match.away}: {result} ---")
+                update.errors.append(f"Error writing segment for {match.home} vs {match.away}: {str(result)}")
+                segments[snapshot_key(match)] = snapshot.segment(match) or match.summary
+                stale.add(snapshot_key(match))
+            else:
+                segments[snapshot_key(match)] = result
+                update.segments_written += 1
+
+        intro = f"Live matchday update for {date}."
+        if not matches:
+            intro += " There are no matches on today."
+        update.script = "\n\n".join([intro] + [segments[snapshot_key(match)] for match in matches])
+
+        hits, misses = self.segment_cache.hits, self.segment_cache.misses
+        try:
+            async with self.agent.tts_slot():
+                update.audio_path = await TTSManager.generate_audio_stream(
+                    split_into_chunks(update.script), file_name=output_path, cache=self.segment_cache
+                )
+        except Exception as e:
+            print(f"--- [LiveRunner] Error in local TTS: {e} ---")
+            update.errors.append(f"Error in local TTS: {str(e)}")
+            return update
+        update.chunks_reused = self.segment_cache.hits - hits
+        update.chunks_synthesized = self.segment_cache.misses - misses
+
+        # Only a published update becomes the baseline of the next one
+        snapshot.save(matches, segments, stale)
+        print(f"--- [LiveRunner] Update ready: {update.audio_path} ({update.segments_written} segment(s) written, "
+              f"{update.chunks_synthesized} chunk(s) synthesized, {update.chunks_reused} reused) ---")
+        return update
@@ -0,0 +1,68 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+
+@dataclass(frozen=True, slots=True)
+class Match:
+    """
+    The subset of a Football-Data.org match the pipeline actually uses.
+
+    Raw responses carry referees, areas, odds, season and team crest objects for
+    every match; only these fields are kept so the graph state stays small and
+    nodes read plain attributes instead of chained ``.get()`` lookups.
+    """
+    home: str
+    away: str
+    home_score: Optional[int] = None
+    away_score: Optional[int] = None
+    status: Optional[str] = None
+    utc_date: Optional[str] = None
+    competition: Optional[str] = None
+    id: Optional[int] = None
+
+    @classmethod
+    def from_api(cls, raw: Dict[str, Any]) -> "Match":
+        """Builds a match from one entry of a Football-Data.org ``matches`` list."""
+        full_time = (raw.get("score") or {}).get("fullTime") or {}
+        return cls(
+            home=(raw.get("homeTeam") or {}).get("name") or "Unknown",
+            away=(raw.get("awayTeam") or {}).get("name") or "Unknown",
+            home_score=full_time.get("home"),
+            away_score=full_time.get("away"),
+            status=raw.get("status"),
+            utc_date=raw.get("utcDate"),
+            competition=(raw.get("competition") or {}).get("name"),
+            id=raw.get("id"),
+        )
+
+    @property
+    def day(self) -> Optional[str]:
+        """Match day (YYYY-MM-DD, UTC)."""
+        return self.utc_date[:10] if self.utc_date else None
+
+    @property
+    def score(self) -> str:
+        home = "?" if self.home_score is None else self.home_score
+        away = "?" if self.away_score is None else self.away_score
+        return f"{home}-{away}"
+
+    @property
+    def summary(self) -> str:
+        return f"Match: {self.home} vs {self.away}. Result: {self.score}."
+
+    @property
+    def news_query(self) -> str:
+        return f"{self.home} vs {self.away} football news"
+
+
+def parse_matches(data: Union[Dict[str, Any], Iterable[Union[Dict[str, Any], Match]], None]) -> List[Match]:
+    """
+    Converts a Football-Data.org response (or its ``matches`` list) into
+    :class:`Match` records. Entries that already are ``Match`` objects are kept
+    as they are, so the function is safe to call on already parsed data.
+    """
+    if not data:
+        return []
+    if isinstance(data, dict):
+        data = data.get("matches") or []
+    return [m if isinstance(m, Match) else Match.from_api(m) for m in data]
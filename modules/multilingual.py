@@ -0,0 +1,90 @@
+import os
+from dataclasses import dataclass
+from typing import Iterable, List, Union
+
+from modules.constants import LANGUAGE_NAMES
+
+
+def parse_languages(languages: Union[str, Iterable[str]]) -> List[str]:
+    """
+    Normalizes language codes given as a list or a comma-separated string
+    (e.g. ``"en,ar"``), dropping duplicates while keeping their order.
+
+    Raises:
+        ValueError: If a code is not supported by the multilingual TTS model.
+    """
+    if isinstance(languages, str):
+        languages = languages.split(",")
+    codes = list(dict.fromkeys(code.strip().lower() for code in languages if code.strip()))
+    unknown = [code for code in codes if code not in LANGUAGE_NAMES]
+    if unknown:
+        raise ValueError(f"Unsupported language(s) {unknown}; choose from {sorted(LANGUAGE_NAMES)}")
+    return codes
+
+
+def language_output_path(path: str, language: str) -> str:
+    """``output/podcast.wav`` -> ``output/podcast_fr.wav``."""
+    root, ext = os.path.splitext(path)
+    return f"{root}_{language}{ext or '.wav'}"
+
+
+def translation_prompt(script: str, language: str) -> str:
+    """Prompt asking the LLM to translate a finished script into ``language``."""
+    return (
+        f"Translate the following football podcast script into {LANGUAGE_NAMES[language]}.\n"
+        f"Keep team names, player names and scores unchanged and keep the tone conversational. "
+        f"Return only the translation, wrapped in <script> tags.\n\n"
+        f"<script>{script}</script>"
+    )
+
+
+@dataclass
+class SharedWorkSummary:
+    """
+    What one multilingual run did once instead of once per language.
+
+    Attributes:
+        languages (int): Languages requested.
+        match_fetches (int): Football-Data requests made (0 when matches were given).
+        search_calls (int): News searches made.
+        context_tokens (int): Tokens of the prompt context, built once.
+        scripts_written (int): Scripts written from the context.
+        scripts_translated (int): Scripts translated from the written one.
+        audio_files (int): Episodes synthesized.
+        tts_models (int): TTS models the languages were synthesized with.
+    """
+    languages: int
+    match_fetches: int
+    search_calls: int
+    context_tokens: int
+    scripts_written: int
+    scripts_translated: int
+    audio_files: int
+    tts_models: int = 1
+
+    @property
+    def match_fetches_saved(self) -> int:
+        return self.match_fetches * (self.languages - 1)
+
+    @property
+    def search_calls_saved(self) -> int:
+        return self.search_calls * (self.languages - 1)
+
+    @property
+    def context_tokens_saved(self) -> int:
+        """Context tokens not re-sent to the LLM, since translations only carry the script."""
+        return self.context_tokens * self.scripts_translated
+
+    @property
+    def tts_models_saved(self) -> int:
+        return max(0, self.languages - self.tts_models)
+
+    def format(self) -> str:
+        return (
+            f"{self.languages} language(s), {self.audio_files} episode(s); shared: "
+            f"{self.match_fetches} match fetch(es) ({self.match_fetches_saved} saved), "
+            f"{self.search_calls} news searches ({self.search_calls_saved} saved), "
+            f"1 context of {self.context_tokens} tokens ({self.context_tokens_saved} prompt tokens saved), "
+            f"{self.tts_models} TTS model ({self.tts_models_saved} model loads saved); "
+            f"{self.scripts_written} script(s) written, {self.scripts_translated} translated"
+        )
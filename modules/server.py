@@ -0,0 +1,284 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import itertools
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from modules.audio_writer import output_format
+from modules.constants import (
+    SERVER_HOST,
+    SERVER_MAX_FINISHED_JOBS,
+    SERVER_MAX_QUEUE,
+    SERVER_PORT,
+    SERVER_WORKERS,
+)
+
+_REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+            405: "Method Not Allowed", 409: "Conflict", 429: "Too Many Requests",
+            500: "Internal Server Error"}
+_MAX_BODY_BYTES = 64 * 1024
+
+
+@dataclass
+class Job:
+    """A queued episode request and, once it has run, its outcome."""
+    id: str
+    query: str
+    date: Optional[str] = None
+    competitions: Optional[List[str]] = None
+    priority: int = 0
+    status: str = "queued"
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    audio_path: Optional[str] = None
+    script: Optional[str] = None
+    errors: List[str] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop("script")
+        return data
+
+
+class PodcastServer:
+    """
+    Long-running podcast service keeping one :class:`FootballPodcastAgent` resident.
+
+    The compiled graph, LLM client and TTS model are created once and shared by
+    every job, so an episode only pays for its own fetch/search/LLM/TTS work.
+    Jobs are accepted over a small JSON-over-HTTP API (TCP or a Unix socket) into
+    a bounded priority queue (lower ``priority`` runs first, FIFO within a
+    priority) and processed by ``workers`` concurrent workers; TTS stays
+    serialized by the agent. When the queue is full new jobs are rejected with
+    ``429`` so clients back off instead of piling up work.
+
+    Endpoints:
+        POST /jobs                 Submit ``{"query", "date", "competitions", "priority"}``.
+        GET  /jobs/<id>            Job status.
+        GET  /jobs/<id>/result     Script, audio path and errors of a finished job.
+        GET  /health               Queue depth, worker count and job counters.
+
+    Args:
+        agent (FootballPodcastAgent, optional): The agent to keep resident. Defaults to a new
+            agent with ``tts_concurrency=1`` that warms up the TTS model on start.
+        workers (int): Number of jobs processed concurrently.
+        max_queue (int): Maximum number of queued (not yet running) jobs.
+        output_dir (str): Directory receiving ``podcast_<job id>.<format>`` files
+            (``TTS_OUTPUT_FORMAT``, WAV by default).
+    """
+
+    def __init__(self, agent=None, workers: int = SERVER_WORKERS, max_queue: int = SERVER_MAX_QUEUE,
+                 output_dir: str = "output"):
+        if agent is None:
+            from modules.langgraph_agent import FootballPodcastAgent
+            agent = FootballPodcastAgent(tts_concurrency=1, warmup_tts=True)
+        self.agent = agent
+        self.workers = workers
+        self.max_queue = max_queue
+        self.output_dir = output_dir
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._seq = itertools.count()
+        self._worker_tasks: List[asyncio.Task] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    # Lifecycle
+
+    async def start(self, host: str = SERVER_HOST, port: int = SERVER_PORT, unix_socket: Optional[str] = None):
+        """Starts the workers and begins accepting connections."""
+        self._queue = asyncio.PriorityQueue(maxsize=self.max_queue)
+        self._worker_tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        if unix_socket:
+            self._server = await asyncio.start_unix_server(self._handle_connection, path=unix_socket)
+            print(f"--- [PodcastServer] Listening on unix:{unix_socket} with {self.workers} worker(s) ---")
+        else:
+            self._server = await asyncio.start_server(self._handle_connection, host, port)
+            print(f"--- [PodcastServer] Listening on http://{host}:{self.port} with {self.workers} worker(s) ---")
+
+    @property
+    def port(self) -> Optional[int]:
+        """The TCP port actually bound (useful with ``port=0``)."""
+        if self._server is None or not self._server.sockets:
+            return None
+        address = self._server.sockets[0].getsockname()
+        return address[1] if isinstance(address, tuple) else None
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        """Stops accepting connections and cancels the workers; running jobs are abandoned."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # Jobs
+
+    def submit(self, query: str, date: Optional[str] = None, competitions: Optional[List[str]] = None,
+               priority: int = 0) -> Optional[Job]:
+        """Queues a job, or returns None when the queue is full."""
+        job = Job(id=uuid.uuid4().hex[:12], query=query, date=date, competitions=competitions, priority=priority)
+        try:
+            self._queue.put_nowait((priority, next(self._seq), job.id))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return None
+        self.jobs[job.id] = job
+        return job
+
+    def _forget_finished_jobs(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.status in ("done", "failed")]
+        for job_id in finished[:max(0, len(finished) - SERVER_MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+
+    async def _worker(self, index: int):
+        while True:
+            _, _, job_id = await self._queue.get()
+            job = self.jobs[job_id]
+            job.status = "running"
+            job.started_at = time.time()
+            print(f"--- [PodcastServer] Worker {index} running job {job.id} (priority {job.priority}) ---")
+            run_id = f"job:{job.id}"
+            try:
+                final_state = await self.agent.run(
+                    job.query,
+                    date=job.date,
+                    competitions=job.competitions,
+                    output_path=os.path.join(self.output_dir, f"podcast_{job.id}.{output_format()}"),
+                    # One checkpoint thread per job, so identical concurrent requests never share one
+                    run_id=run_id,
+                )
+                job.script = final_state.get("script")
+                job.audio_path = final_state.get("audio_path")
+                job.errors = final_state.get("errors", [])
+            except Exception as e:
+                print(f"--- [PodcastServer] Job {job.id} failed: {e} ---")
+                job.errors = [str(e)]
+            finally:
+                job.finished_at = time.time()
+                await self._release_run(run_id)
+                self._queue.task_done()
+
+            job.status = "done" if job.audio_path else "failed"
+            if job.status == "done":
+                self.completed += 1
+            else:
+                self.failed += 1
+            self._forget_finished_jobs()
+
+    async def _release_run(self, run_id: str):
+        """
+        Drops what a finished job left in the resident agent: its tracer records and,
+        with checkpointing enabled, its checkpoint thread (jobs are never resumed).
+        """
+        self.agent.tracer.discard(run_id)
+        try:
+            await self.agent.delete_run(run_id)
+        except Exception as e:
+            print(f"--- [PodcastServer] Could not delete checkpoints of {run_id}: {e} ---")
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "max_queue": self.max_queue,
+            "running": sum(1 for job in self.jobs.values() if job.status == "running"),
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+    # HTTP
+
+    def _route(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        parts = [p for p in path.split("?", 1)[0].split("/") if p]
+
+        if parts == ["health"]:
+            return (200, self.health()) if method == "GET" else (405, {"error": "Use GET."})
+
+        if parts == ["jobs"]:
+            if method != "POST":
+                return 405, {"error": "Use POST to submit a job."}
+            try:
+                payload = json.loads(body or b"{}")
+                if not isinstance(payload, dict):
+                    raise ValueError("expected a JSON object")
+                priority = int(payload.get("priority", 0))
+            except (ValueError, TypeError) as e:
+                return 400, {"error": f"Invalid job: {e}"}
+            competitions = payload.get("competitions")
+            if isinstance(competitions, str):
+                competitions = competitions.split(",")
+            job = self.submit(payload.get("query") or "Today's football highlights",
+                              date=payload.get("date"), competitions=competitions, priority=priority)
+            if job is None:
+                return 429, {"error": "Job queue is full, retry later.", "max_queue": self.max_queue}
+            return 202, {"id": job.id, "status": job.status}
+
+        if len(parts) in (2, 3) and parts[0] == "jobs":
+            if method != "GET":
+                return 405, {"error": "Use GET."}
+            job = self.jobs.get(parts[1])
+            if job is None:
+                return 404, {"error": f"Unknown job {parts[1]}."}
+            if len(parts) == 2:
+                return 200, job.summary()
+            if parts[2] != "result":
+                return 404, {"error": f"Unknown resource {path}."}
+            if job.status not in ("done", "failed"):
+                return 409, {"error": f"Job {job.id} is {job.status}.", "status": job.status}
+            return 200, {"id": job.id, "status": job.status, "audio_path": job.audio_path,
+                         "script": job.script, "errors": job.errors}
+
+        return 404, {"error": f"Unknown resource {path}."}
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await reader.readline()
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get("content-length", 0))
+            if length > _MAX_BODY_BYTES:
+                status, payload = 400, {"error": "Request body too large."}
+            else:
+                body = await reader.readexactly(length) if length else b""
+                status, payload = self._route(method.upper(), path, body)
+        except (ValueError, asyncio.IncompleteReadError):
+            status, payload = 400, {"error": "Malformed request."}
+        except Exception as e:
+            status, payload = 500, {"error": str(e)}
+
+        data = json.dumps(payload).encode("utf-8")
+        head = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+                "Content-Type: application/json",
+                f"Content-Length: {len(data)}",
+                "Connection: close"]
+        if status == 429:
+            head.append("Retry-After: 1")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + data)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
@@ -0,0 +1,140 @@
+import re
+from typing import List
+
+_OPEN_THINK = "<think>"
+_CLOSE_THINK = "</think>"
+_OPEN_SCRIPT = "<script>"
+_CLOSE_SCRIPT = "</script>"
+
+_SENTENCE_END = re.compile(r"[.!?][\"')\]]*\s+|\n\s*\n")
+
+
+def _partial_tag_start(text: str, tags) -> int:
+    """Index where a possibly incomplete tag starts at the end of ``text`` (len(text) if none)."""
+    start = text.rfind("<")
+    if start == -1:
+        return len(text)
+    tail = text[start:]
+    if any(tag.startswith(tail) for tag in tags):
+        return start
+    return len(text)
+
+
+class ScriptStreamParser:
+    """
+    Incrementally parses an LLM token stream into complete script sentences.
+
+    Follows the extraction rules of ``extract_script``: ``<think>`` blocks are
+    dropped, and once a ``<script>`` tag is seen only its content is spoken, up to
+    the first ``</script>`` or, if it is never closed, the end of the completion.
+    Text outside any script tag is held back, because a script tag may still
+    follow; it is only released by :meth:`close` when the completion contained no
+    script tag at all.
+
+    Usage::
+
+        parser = ScriptStreamParser()
+        for token in stream:
+            for sentence in parser.feed(token):
+                ...
+        for sentence in parser.close():
+            ...
+    """
+
+    def __init__(self):
+        self.content = ""
+        self.sentences_emitted = 0
+        self._buffer = ""
+        self._mode = "outside"
+        self._seen_script = False
+        self._outside = ""
+        self._pending = ""
+
+    def feed(self, token: str) -> List[str]:
+        """Consumes the next chunk of the completion and returns any complete sentences."""
+        self.content += token
+        self._buffer += token
+        self._advance(final=False)
+        return self._drain_sentences(final=False)
+
+    def close(self) -> List[str]:
+        """Flushes the stream at the end of the completion and returns the remaining sentences."""
+        self._advance(final=True)
+        if not self._seen_script:
+            self._pending += self._outside
+            self._outside = ""
+        return self._drain_sentences(final=True)
+
+    def _advance(self, final: bool):
+        while self._buffer:
+            if self._mode == "think":
+                end = self._buffer.find(_CLOSE_THINK)
+                if end == -1:
+                    # Keep only what could be the start of the closing tag
+                    keep = _partial_tag_start(self._buffer, [_CLOSE_THINK])
+                    self._buffer = "" if final else self._buffer[keep:]
+                    return
+                self._buffer = self._buffer[end + len(_CLOSE_THINK):]
+                self._mode = "script" if self._seen_script else "outside"
+            elif self._mode == "script":
+                end = self._buffer.find(_CLOSE_SCRIPT)
+                think = self._buffer.find(_OPEN_THINK)
+                if think != -1 and (end == -1 or think < end):
+                    self._pending += self._buffer[:think]
+                    self._buffer = self._buffer[think + len(_OPEN_THINK):]
+                    self._mode = "think"
+                    continue
+                if end == -1:
+                    # An unclosed script runs to the end of the completion
+                    cut = len(self._buffer) if final else _partial_tag_start(self._buffer, [_CLOSE_SCRIPT, _OPEN_THINK])
+                    self._pending += self._buffer[:cut]
+                    self._buffer = self._buffer[cut:]
+                    return
+                self._pending += self._buffer[:end]
+                self._buffer = ""
+                self._mode = "done"
+            elif self._mode == "outside":
+                think = self._buffer.find(_OPEN_THINK)
+                script = self._buffer.find(_OPEN_SCRIPT)
+                hits = [i for i in (think, script) if i != -1]
+                if not hits:
+                    cut = len(self._buffer) if final else _partial_tag_start(self._buffer, [_OPEN_THINK, _OPEN_SCRIPT])
+                    self._outside += self._buffer[:cut]
+                    self._buffer = self._buffer[cut:]
+                    return
+                first = min(hits)
+                self._outside += self._buffer[:first]
+                if first == script:
+                    self._buffer = self._buffer[first + len(_OPEN_SCRIPT):]
+                    self._seen_script = True
+                    self._mode = "script"
+                else:
+                    self._buffer = self._buffer[first + len(_OPEN_THINK):]
+                    self._mode = "think"
+            else:  # done: everything after the first </script> is ignored
+                self._buffer = ""
+                return
+
+    def _drain_sentences(self, final: bool) -> List[str]:
+        if final:
+            text, self._pending = self._pending, ""
+        else:
+            boundary = 0
+            for match in _SENTENCE_END.finditer(self._pending):
+                boundary = match.end()
+            if not boundary:
+                return []
+            text, self._pending = self._pending[:boundary], self._pending[boundary:]
+
+        pieces = []
+        start = 0
+        for match in _SENTENCE_END.finditer(text):
+            pieces.append(text[start:match.end()])
+            start = match.end()
+        pieces.append(text[start:])
+
+        # Stray script tags are removed just like extract_script's fallback does
+        sentences = [" ".join(re.sub(r"</?script>", "", p).split()) for p in pieces]
+        sentences = [s for s in sentences if s]
+        self.sentences_emitted += len(sentences)
+        return sentences
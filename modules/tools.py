@@ -1,77 +1,167 @@
 import os
 import sys
-import requests
+import threading
 
 base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../'))
 if base_path not in sys.path:
     sys.path.insert(0, base_path)
 
-from datetime import datetime
-from typing import Dict, Optional, Union
-from dotenv import load_dotenv
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
 
 import asyncio
-import logging
-from duckduckgo_search import DDGS
+from modules.cache import DiskCache
+from modules.http_client import RateLimitedClient, TokenBucket
 from modules.utils import wave_file
+from modules.constants import (
+    COMPETITION_NAMES,
+    FINISHED_MATCH_STATUSES,
+    FOOTBALL_DATA_BASE_URL,
+    FOOTBALL_DATA_CACHE_DIR,
+    FOOTBALL_DATA_CACHE_MAX_ENTRIES,
+    FOOTBALL_DATA_RATE_LIMIT,
+    FOOTBALL_DATA_RATE_PERIOD,
+    FOOTBALL_DATA_RESET_MARGIN,
+    FOOTBALL_DATA_TODAY_TTL,
+    HTTP_POOL_MAXSIZE,
+    NEWS_SEARCH_MAX_CONCURRENCY,
+    NEWS_SEARCH_MAX_RESULTS,
+    NEWS_SEARCH_TIMEOUT,
+)
 
+if TYPE_CHECKING:
+    import requests
 
-load_dotenv()
+# Heavy third-party clients (requests, duckduckgo_search, the TTS stack) are imported
+# lazily by the functions that use them, so importing this module stays cheap.
 
-print(f"SPORT_DEV_KEY Key set: {'Yes' if os.environ.get('SPORT_DEV_KEY') and os.environ['SPORT_DEV_KEY'] != 'SPORT_DEV_KEY' else 'No (REPLACE PLACEHOLDER!)'}")
 
+_session: Optional["requests.Session"] = None
+_response_cache: Optional[DiskCache] = None
+_football_data_client: Optional[RateLimitedClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_session() -> "requests.Session":
+    """Returns the shared, connection-pooled HTTP session used for API calls."""
+    global _session
+    with _client_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_MAXSIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+    return _session
 
-def get_matches_by_date(date_str: str, leagues_id: list) -> dict:
 
+def get_football_data_client() -> RateLimitedClient:
     """
-        Fetches all matches for a given date from the Sportdevs API.
+    Returns the shared Football-Data.org client. Every caller in the process draws
+    from one token bucket sized to the API quota (``FOOTBALL_DATA_RATE_LIMIT``
+    requests per minute, 0 disables the limit), so concurrent runs share it.
+    """
+    global _football_data_client
+    session = get_http_session()
+    with _client_lock:
+        if _football_data_client is None:
+            limit = int(os.getenv("FOOTBALL_DATA_RATE_LIMIT", FOOTBALL_DATA_RATE_LIMIT))
+            bucket = (TokenBucket(limit, FOOTBALL_DATA_RATE_PERIOD, reset_margin=FOOTBALL_DATA_RESET_MARGIN)
+                      if limit > 0 else None)
+            _football_data_client = RateLimitedClient(session, bucket=bucket)
+    return _football_data_client
 
-        Args:
-            date_str (str): The date to fetch matches for in the format YYYY-MM-DD (e.g. "2023-05-31").
-        Returns:
-           dict: A dictionary with a status key set to "success" in case matches are found, "error" in case no matches are found. 
-                In case of matches are found, the result will contain a dictionary with match ID as the key,
-                and a dictionary containing the competition, home team, away team, home score and away score as the value if matches are found,
-                or an error message if no matches are found.
-    """ 
-    tool_name = "get_matches_by_date"
 
-    result: Dict[str, Union[str, Dict]] = {"status": "success"}
+def get_response_cache() -> Optional[DiskCache]:
+    """
+    Returns the shared on-disk Football-Data response cache, or None if caching is
+    disabled with ``FOOTBALL_DATA_CACHE=0``.
+    """
+    global _response_cache
+    if os.getenv("FOOTBALL_DATA_CACHE", "1") == "0":
+        return None
+    with _client_lock:
+        if _response_cache is None:
+            _response_cache = DiskCache(
+                os.getenv("FOOTBALL_DATA_CACHE_DIR", FOOTBALL_DATA_CACHE_DIR),
+                max_entries=int(os.getenv("FOOTBALL_DATA_CACHE_MAX_ENTRIES", FOOTBALL_DATA_CACHE_MAX_ENTRIES)),
+            )
+    return _response_cache
 
-    print(f"--- Tool : {tool_name} called for date: {date_str} ---")
 
-    date = datetime.now()
+def _matches_cache_ttl(date, current_date, response_json: dict) -> Optional[float]:
+    """Finished matchdays never expire; anything that may still change gets a short TTL."""
+    matches = response_json.get("matches", [])
+    if date < current_date and all(m.get("status") in FINISHED_MATCH_STATUSES for m in matches):
+        return None
+    return FOOTBALL_DATA_TODAY_TTL
+
+
+def _fetch_matches(tool_name: str, date_from, last_date, leagues_id: list) -> dict:
+    """
+    Fetches matches played from ``date_from`` through ``last_date`` (inclusive) with a
+    single Football-Data.org request, going through the on-disk response cache.
+    """
     current_date = datetime.now().date()
-    
-    if date_str is not None:
-        date = datetime.strptime(date_str, "%Y-%m-%d").date()
-    
-    if date > current_date:
-        return {"error": f"Date must not be in the future, provided date: {date}, current date: {current_date}"}
-        
-    date_formatted = date.strftime("%Y-%m-%d")
-    from datetime import timedelta
-    date_to = (date + timedelta(days=1)).strftime("%Y-%m-%d")
+    date_formatted = date_from.strftime("%Y-%m-%d")
+    date_to = (last_date + timedelta(days=1)).strftime("%Y-%m-%d")
 
-    print(f"--- Tool : {tool_name} Fetching matches for date: {date_formatted}, current date: {current_date}")
+    cache = get_response_cache()
+    span = date_formatted if last_date == date_from else f"{date_formatted}..{last_date.strftime('%Y-%m-%d')}"
+    cache_key = f"matches:{span}:{','.join(sorted(map(str, leagues_id or [])))}"
+    cached = cache.lookup(cache_key) if cache is not None else None
+
+    if cached is not None and cache.is_fresh(cached):
+        cache.record_hit()
+        print(f"--- Tool : {tool_name} Cache hit for {cache_key} ---")
+        return cached["value"]
+    if cache is not None:
+        cache.record_miss()
 
     api_key = os.getenv("FOOTBALL_DATA_API_KEY")
+    base_url = os.getenv("FOOTBALL_DATA_BASE_URL", FOOTBALL_DATA_BASE_URL)
     # Football-Data.org uri for matches
     competitions = ""
     if leagues_id:
         competitions = "&competitions=" + ",".join(map(str, leagues_id))
     
-    uri = f"https://api.football-data.org/v4/matches?dateFrom={date_formatted}&dateTo={date_to}{competitions}"
+    uri = f"{base_url}/matches?dateFrom={date_formatted}&dateTo={date_to}{competitions}"
 
     print(f"--- Tool : {tool_name} URI: {uri} ---")
 
     headers = { 'X-Auth-Token': f"{api_key}" }
+    if cached is not None:
+        # Conditional request: let the API answer 304 if nothing changed
+        if cached["meta"].get("etag"):
+            headers["If-None-Match"] = cached["meta"]["etag"]
+        if cached["meta"].get("last_modified"):
+            headers["If-Modified-Since"] = cached["meta"]["last_modified"]
+
+    import requests
 
-    response = requests.get(uri, headers=headers)
+    try:
+        response = get_football_data_client().get(uri, headers=headers)
+    except requests.RequestException as e:
+        print(f"--- Tool : {tool_name} Error: request failed: {e} ---")
+        if cached is not None:
+            print(f"--- Tool : {tool_name} Serving stale cached response for {cache_key} ---")
+            return cached["value"]
+        return {"status": "error", "error": f"Request failed: {e}", "matches": {}}
+
+    if response.status_code == 304 and cached is not None:
+        print(f"--- Tool : {tool_name} Not modified, revalidated cache for {cache_key} ---")
+        cache.refresh(cache_key, ttl=_matches_cache_ttl(last_date, current_date, cached["value"]))
+        return cached["value"]
     
     if response.status_code != 200:
         print(f"--- Tool : {tool_name} Error: API returned status {response.status_code} ---")
         print(f"--- Raw Error Response: {response.text} ---")
+        if cached is not None:
+            print(f"--- Tool : {tool_name} Serving stale cached response for {cache_key} ---")
+            return cached["value"]
         return {"status": "error", "error": f"API returned status {response.status_code}", "matches": {}}
 
     try:
@@ -83,10 +173,125 @@ def get_matches_by_date(date_str: str, leagues_id: list) -> dict:
         print(f"--- Tool : {tool_name} Error parsing JSON: {e} ---")
         return {"status": "error", "error": "Invalid JSON response", "matches": {}}
 
+    if cache is not None:
+        cache.set(
+            cache_key,
+            response_json,
+            ttl=_matches_cache_ttl(last_date, current_date, response_json),
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+
     return response_json
 
 
-def search_football_news(query: str, max_results: int = 3) -> str:
+def get_matches_by_date(date_str: str, leagues_id: list) -> dict:
+
+    """
+        Fetches all matches for a given date from the Football-Data.org API.
+
+        Responses are cached on disk keyed by (date, competitions). Finished matchdays are
+        served from the cache indefinitely, today's matches are revalidated after a short TTL
+        using the ETag/Last-Modified validators returned by the API.
+
+        Args:
+            date_str (str): The date to fetch matches for in the format YYYY-MM-DD (e.g. "2023-05-31").
+            leagues_id (list): Competition codes to filter on (e.g. ["PL"]).
+        Returns:
+           dict: The Football-Data.org response, containing a "matches" list, or a dictionary with
+                a status key set to "error" and an error message if the request failed.
+    """ 
+    tool_name = "get_matches_by_date"
+
+    print(f"--- Tool : {tool_name} called for date: {date_str} ---")
+
+    date = datetime.now().date()
+    current_date = datetime.now().date()
+    
+    if date_str is not None:
+        date = datetime.strptime(date_str, "%Y-%m-%d").date()
+    
+    if date > current_date:
+        return {"error": f"Date must not be in the future, provided date: {date}, current date: {current_date}"}
+
+    print(f"--- Tool : {tool_name} Fetching matches for date: {date.strftime('%Y-%m-%d')}, current date: {current_date}")
+
+    return _fetch_matches(tool_name, date, date, leagues_id)
+
+
+def get_matches_by_range(date_from_str: str, date_to_str: str, leagues_id: list) -> dict:
+    """
+        Fetches all matches between two dates (inclusive) with a single Football-Data.org request.
+
+        Args:
+            date_from_str (str): First date, in the format YYYY-MM-DD.
+            date_to_str (str): Last date, in the format YYYY-MM-DD. Must not be in the future.
+            leagues_id (list): Competition codes to filter on (e.g. ["PL", "PD"]).
+        Returns:
+           dict: The Football-Data.org response, containing a "matches" list, or a dictionary with
+                an "error" message if the range is invalid or the request failed.
+    """
+    tool_name = "get_matches_by_range"
+
+    print(f"--- Tool : {tool_name} called for range: {date_from_str} .. {date_to_str} ---")
+
+    current_date = datetime.now().date()
+    date_from = datetime.strptime(date_from_str, "%Y-%m-%d").date()
+    last_date = datetime.strptime(date_to_str, "%Y-%m-%d").date()
+
+    if last_date < date_from:
+        return {"error": f"Range end {last_date} is before range start {date_from}"}
+    if last_date > current_date:
+        return {"error": f"Date must not be in the future, provided date: {last_date}, current date: {current_date}"}
+
+    return _fetch_matches(tool_name, date_from, last_date, leagues_id)
+
+
+def partition_matches_by_day(response_json: dict) -> Dict[str, List[dict]]:
+    """Splits a Football-Data.org matches response into {YYYY-MM-DD: [match, ...]} by kick-off (UTC) date."""
+    days: Dict[str, List[dict]] = {}
+    for match in response_json.get("matches", []) or []:
+        day = (match.get("utcDate") or "")[:10]
+        if day:
+            days.setdefault(day, []).append(match)
+    return days
+
+
+def partition_matches_by_competition(response_json: dict) -> Dict[str, List[dict]]:
+    """Splits a Football-Data.org matches response into {competition code: [match, ...]}."""
+    codes_by_name = {name: code for code, name in COMPETITION_NAMES.items()}
+    competitions: Dict[str, List[dict]] = {}
+    for match in response_json.get("matches", []) or []:
+        competition = match.get("competition") or {}
+        code = competition.get("code") or codes_by_name.get(competition.get("name"))
+        if code:
+            competitions.setdefault(code, []).append(match)
+    return competitions
+
+
+def _new_ddgs():
+    from duckduckgo_search import DDGS
+
+    return DDGS()
+
+
+def _close_session(session):
+    exit_fn = getattr(session, "__exit__", None)
+    if exit_fn is not None:
+        exit_fn(None, None, None)
+
+
+def _search_with_session(ddgs, query: str, max_results: int) -> List[str]:
+    """Runs a news search (with text-search fallback) on an open DDGS session."""
+    # First try the news endpoint
+    hits = list(ddgs.news(query, max_results=max_results))
+    if not hits:
+        # Fallback to general text search
+        hits = list(ddgs.text(query, max_results=max_results))
+    return [f"- {r.get('title', '')}: {r.get('body', '')}" for r in hits]
+
+
+def search_football_news(query: str, max_results: int = NEWS_SEARCH_MAX_RESULTS) -> str:
     """
     Searches the web for recent news related to a specific football query using DuckDuckGo.
     
@@ -101,18 +306,8 @@ def search_football_news(query: str, max_results: int = 3) -> str:
     print(f"--- Tool : {tool_name} called for query: {query} ---")
     
     try:
-        results = []
-        with DDGS() as ddgs:
-            # First try the news endpoint
-            ddgs_news = list(ddgs.news(query, max_results=max_results))
-            if ddgs_news:
-                for r in ddgs_news:
-                    results.append(f"- {r.get('title', '')}: {r.get('body', '')}")
-            else:
-                # Fallback to general text search
-                ddgs_text = list(ddgs.text(query, max_results=max_results))
-                for r in ddgs_text:
-                    results.append(f"- {r.get('title', '')}: {r.get('body', '')}")
+        with _new_ddgs() as ddgs:
+            results = _search_with_session(ddgs, query, max_results)
                     
         print(f"--- Tool : {tool_name} found {len(results)} results ---")
         return "\n".join(results)
@@ -121,18 +316,123 @@ def search_football_news(query: str, max_results: int = 3) -> str:
         return f"Error fetching news: {str(e)}"
 
 
-from .tts import TTSManager
+class NewsSearchPool:
+    """
+    Runs DuckDuckGo news searches concurrently over a bounded pool of reusable
+    DDGS sessions.
+
+    At most ``max_concurrency`` searches are in flight at any time, each one
+    bounded by ``timeout`` seconds. Sessions are created lazily and handed back
+    to the pool once their search thread finishes, so a timed-out query keeps
+    its slot until it actually returns; a session that comes back after the
+    pool was closed is closed right away.
 
-async def local_text_to_speech(text: str, speaker_name: str = "en-US-ChristopherNeural") -> str:
+    Args:
+        max_concurrency (int): Maximum number of searches in flight.
+        timeout (float): Per-query timeout in seconds.
+        session_factory (callable, optional): Creates a DDGS-compatible session. Defaults to a new DDGS().
+    """
+
+    def __init__(self, max_concurrency: int = NEWS_SEARCH_MAX_CONCURRENCY,
+                 timeout: Optional[float] = NEWS_SEARCH_TIMEOUT,
+                 session_factory: Optional[Callable[[], Any]] = None):
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be >= 1, got {max_concurrency}")
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.session_factory = session_factory or _new_ddgs
+        self.sessions_created = 0
+        self._idle: List[Any] = []
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Closes every idle session, and any still searching once its search returns."""
+        self._closed = True
+        while self._idle:
+            _close_session(self._idle.pop())
+
+    def _acquire_session(self):
+        if self._idle:
+            return self._idle.pop()
+        self.sessions_created += 1
+        session = self.session_factory()
+        enter_fn = getattr(session, "__enter__", None)
+        return enter_fn() if enter_fn is not None else session
+
+    async def search(self, query: str, max_results: int = NEWS_SEARCH_MAX_RESULTS) -> str:
+        """
+        Searches news for a single query using a pooled session.
+
+        Returns:
+            str: The concatenated snippets, an empty string on timeout, or an
+                "Error fetching news" message if the search failed.
+        """
+        tool_name = "search_football_news"
+        print(f"--- Tool : {tool_name} called for query: {query} ---")
+
+        await self._slots.acquire()
+        session = self._acquire_session()
+        task = asyncio.ensure_future(asyncio.to_thread(_search_with_session, session, query, max_results))
+
+        def _release(done: asyncio.Future):
+            if not done.cancelled():
+                done.exception()  # Mark as retrieved when the caller already timed out
+            if self._closed:
+                _close_session(session)
+            else:
+                self._idle.append(session)
+            self._slots.release()
+
+        task.add_done_callback(_release)
+
+        try:
+            results = await asyncio.wait_for(asyncio.shield(task), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            print(f"--- Tool : {tool_name} Timed out after {self.timeout}s for query: {query} ---")
+            return ""
+        except Exception as e:
+            print(f"--- Tool : {tool_name} Error searching web: {e} ---")
+            return f"Error fetching news: {str(e)}"
+
+        print(f"--- Tool : {tool_name} found {len(results)} results ---")
+        return "\n".join(results)
+
+    async def search_many(self, queries: List[str], max_results: int = NEWS_SEARCH_MAX_RESULTS) -> List[str]:
+        """Searches all queries concurrently and returns results in the order of ``queries``."""
+        return list(await asyncio.gather(*(self.search(q, max_results) for q in queries)))
+
+
+async def local_text_to_speech(text: str, speaker_name: str = "en-US-ChristopherNeural", **tts_options) -> str:
     """
     Legacy wrapper for TTSManager to maintain compatibility with existing nodes.
+    Extra keyword arguments (e.g. ``chunked=True``) are forwarded to ``TTSManager.generate_audio``.
     """
-    return await TTSManager.generate_audio(text)
+    from modules.tts import TTSManager
+
+    return await TTSManager.generate_audio(text, **tts_options)
+
+
+async def local_dialogue_to_speech(turns: list, voices: Optional[dict] = None, **tts_options) -> str:
+    """
+    Renders speaker-tagged dialogue turns (see ``modules.dialogue``) with one voice per speaker.
+    Extra keyword arguments (e.g. ``file_name``) are forwarded to ``TTSManager.generate_dialogue``.
+    """
+    from modules.tts import TTSManager
+
+    return await TTSManager.generate_dialogue(turns, voices=voices, **tts_options)
 
 
 
 if __name__ == "__main__":
-    import asyncio
+    from dotenv import load_dotenv
+    load_dotenv()
     # Simple test for local tts
     async def test():
         await local_text_to_speech("Testing local podcast generation.")
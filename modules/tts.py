@@ -1,64 +1,996 @@
 import os
+import re
+import atexit
+import copy
+import time
+import functools
+import contextlib
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
+from typing import TYPE_CHECKING, Any, AsyncIterable, Dict, Iterable, List, Optional, Tuple, Union
+
 import numpy as np
 
+from modules.cache import AudioCache, VoiceConditioningCache, file_digest
+from modules.constants import (
+    DIALOGUE_GAP_MS,
+    TTS_AUDIO_CACHE_MAX_MB,
+    TTS_BATCH_LENGTH_RATIO,
+    TTS_BATCH_MAX_SIZE,
+    TTS_CHUNK_CROSSFADE_MS,
+    TTS_CHUNK_MAX_CHARS,
+    TTS_CHUNK_SILENCE_MS,
+    TTS_CHUNK_WORKERS,
+    TTS_DEFAULT_VOICE,
+    TTS_POOL_WORKER_MEMORY_MB,
+    TTS_WARMUP_TEXT,
+)
+from modules.audio_writer import AudioWriter, open_audio_writer, output_format
+
+if TYPE_CHECKING:
+    from modules.dialogue import Turn
+    from modules.tts_pool import TTSProcessPool
+
+
+_PARAGRAPH_SPLIT = re.compile(r"\n\s*\n")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])[\"')\]]*\s+")
+
+
+def split_into_chunks(text: str, max_chars: int = TTS_CHUNK_MAX_CHARS) -> List[str]:
+    """
+    Splits a script into synthesis chunks at paragraph and sentence boundaries.
+
+    Consecutive sentences of the same paragraph are packed together up to
+    ``max_chars``; a chunk never spans two paragraphs. Sentences longer than
+    ``max_chars`` are split further at whitespace.
+    """
+    chunks = []
+    for paragraph in _PARAGRAPH_SPLIT.split(text):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+
+        current = ""
+        for sentence in _SENTENCE_SPLIT.split(paragraph):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            while len(sentence) > max_chars:
+                cut = sentence.rfind(" ", 0, max_chars)
+                cut = cut if cut > 0 else max_chars
+                if current:
+                    chunks.append(current)
+                    current = ""
+                chunks.append(sentence[:cut].strip())
+                sentence = sentence[cut:].strip()
+            if current and len(current) + 1 + len(sentence) > max_chars:
+                chunks.append(current)
+                current = sentence
+            else:
+                current = f"{current} {sentence}" if current else sentence
+        if current:
+            chunks.append(current)
+    return chunks
+
+
+def batch_by_length(texts: List[str], max_batch_size: int = TTS_BATCH_MAX_SIZE,
+                    max_length_ratio: float = TTS_BATCH_LENGTH_RATIO) -> List[List[int]]:
+    """
+    Groups ``texts`` into batches of similar length and returns the indices of each batch.
+
+    Texts are sorted by length and packed into batches of at most
+    ``max_batch_size`` whose longest text is at most ``max_length_ratio`` times
+    the shortest, so a batch padded to its longest text wastes little work.
+    """
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    batches: List[List[int]] = []
+    for i in order:
+        batch = batches[-1] if batches else None
+        if (batch is None or len(batch) >= max_batch_size
+                or len(texts[i]) > max(1, len(texts[batch[0]])) * max_length_ratio):
+            batches.append([i])
+        else:
+            batch.append(i)
+    return batches
+
+
+@contextlib.contextmanager
+def inference_mode(threads: Optional[int] = None):
+    """
+    Runs the block under ``torch.inference_mode`` with ``threads`` intra-op CPU
+    threads (the previous count is restored afterwards). Without torch, e.g. with
+    a stub model, this does nothing.
+    """
+    try:
+        import torch
+    except ImportError:
+        yield
+        return
+    previous = torch.get_num_threads()
+    if threads:
+        torch.set_num_threads(threads)
+    try:
+        with torch.inference_mode():
+            yield
+    finally:
+        if threads:
+            torch.set_num_threads(previous)
+
+
+def _to_numpy(wav) -> np.ndarray:
+    """Converts a model output (torch tensor or array) to a mono float32 numpy array."""
+    if hasattr(wav, "detach"):
+        wav = wav.detach().cpu().numpy()
+    return np.asarray(wav, dtype=np.float32).reshape(-1)
+
+
+def _leaves(node, path: str = ""):
+    """Yields ``(path, value)`` for every tensor/array in nested dataclasses, objects and dicts."""
+    if hasattr(node, "detach") or isinstance(node, np.ndarray):
+        yield path, node
+    elif isinstance(node, dict):
+        for name, child in node.items():
+            yield from _leaves(child, f"{path}/{name}" if path else str(name))
+    elif hasattr(node, "__dict__"):
+        for name, child in vars(node).items():
+            yield from _leaves(child, f"{path}/{name}" if path else name)
+
+
+def export_conditionals(conds) -> Dict[str, np.ndarray]:
+    """
+    Flattens voice conditionals (Chatterbox's ``Conditionals``: dataclasses and
+    dicts of tensors) into numpy arrays named by their path, e.g. ``t3/speaker_emb``.
+    Values that are not tensors or arrays are left out.
+    """
+    return {path: value.detach().cpu().numpy() if hasattr(value, "detach") else value
+            for path, value in _leaves(conds)}
+
+
+def import_conditionals(template, arrays: Dict[str, np.ndarray]):
+    """
+    Rebuilds conditionals from :func:`export_conditionals` output. ``template``
+    (e.g. the model's built-in voice) provides the structure, the values that
+    were not exported, and the device and dtype of every tensor.
+    """
+    conds = copy.deepcopy(template)
+    tensors = [value for _, value in _leaves(conds) if hasattr(value, "detach")]
+    for name, array in arrays.items():
+        *parents, leaf = name.split("/")
+        node = conds
+        for part in parents:
+            node = node[part] if isinstance(node, dict) else getattr(node, part)
+        current = node.get(leaf) if isinstance(node, dict) else getattr(node, leaf, None)
+        value = np.array(array)
+        if tensors:
+            import torch
+
+            like = current if hasattr(current, "detach") else tensors[0]
+            value = torch.from_numpy(value).to(like.device)
+            if hasattr(current, "detach"):
+                value = value.to(current.dtype)
+        if isinstance(node, dict):
+            node[leaf] = value
+        else:
+            setattr(node, leaf, value)
+    return conds
+
+
+@functools.lru_cache(maxsize=None)
+def _package_version(module_name: str) -> str:
+    from importlib import metadata
+
+    package = module_name.split(".")[0]
+    for distribution in metadata.packages_distributions().get(package, [package]):
+        try:
+            return metadata.version(distribution)
+        except metadata.PackageNotFoundError:
+            continue
+    return "unknown"
+
+
+@dataclass
+class SynthesisStats:
+    """Timing report for one synthesis run."""
+    chunks: int
+    audio_seconds: float
+    synthesis_seconds: float
+    time_to_first_audio: Optional[float] = None
+
+    @property
+    def real_time_factor(self) -> float:
+        """Seconds of compute per second of audio (lower is faster)."""
+        return self.synthesis_seconds / self.audio_seconds if self.audio_seconds else 0.0
+
+
+@dataclass
+class SpeakerStats:
+    """Per-speaker synthesis throughput of a dialogue."""
+    turns: int = 0
+    characters: int = 0
+    audio_seconds: float = 0.0
+    synthesis_seconds: float = 0.0
+
+    @property
+    def audio_seconds_per_second(self) -> float:
+        """Seconds of audio produced per second of compute (higher is faster)."""
+        return self.audio_seconds / self.synthesis_seconds if self.synthesis_seconds else 0.0
+
+    @property
+    def characters_per_second(self) -> float:
+        return self.characters / self.synthesis_seconds if self.synthesis_seconds else 0.0
+
+
+class _ChunkStitcher:
+    """
+    Joins synthesized chunks into one stream, inserting silence and/or
+    crossfades between them, and writes the result to an AudioWriter.
+
+    The last ``crossfade`` samples of each chunk are held back until the next
+    chunk (or the end of the stream) arrives.
+    """
+
+    def __init__(self, writer: AudioWriter, sample_rate: int, silence_ms: int = 0, crossfade_ms: int = 0):
+        self.writer = writer
+        self.silence = np.zeros(int(sample_rate * silence_ms / 1000), dtype=np.float32)
+        self.crossfade = int(sample_rate * crossfade_ms / 1000)
+        self._tail: Optional[np.ndarray] = None
+
+    def add(self, samples: np.ndarray):
+        if self._tail is not None:
+            n = min(self.crossfade, len(self._tail), len(samples))
+            if n and not len(self.silence):
+                # Overlap-add the held-back tail with the head of the new chunk
+                ramp = np.linspace(0.0, 1.0, n, dtype=np.float32)
+                mixed = self._tail[-n:] * (1.0 - ramp) + samples[:n] * ramp
+                self.writer.write(np.concatenate([self._tail[:-n], mixed]))
+                samples = samples[n:]
+            else:
+                if n:
+                    # Fade both sides of the silence gap to avoid clicks
+                    samples = samples.copy()
+                    samples[:n] *= np.linspace(0.0, 1.0, n, dtype=np.float32)
+                    self._tail[-n:] *= np.linspace(1.0, 0.0, n, dtype=np.float32)
+                self.writer.write(np.concatenate([self._tail, self.silence]))
+
+        keep = min(self.crossfade, len(samples))
+        if keep:
+            self.writer.write(samples[:-keep])
+            self._tail = samples[-keep:].copy()
+        else:
+            self._tail = samples[:0]
+            self.writer.write(samples)
+
+    def flush(self):
+        if self._tail is not None and len(self._tail):
+            self.writer.write(self._tail)
+        self._tail = None
+
+
 class TTSManager:
     """
     Manages the ChatterboxTTS model to ensure it is loaded only once and
     provides an interface for speech synthesis.
     """
     _model = None
+    # ChatterboxMultilingualTTS, loaded on first use by multilingual episodes
+    _multilingual_model = None
     _device = None
+    _model_lock = threading.Lock()
+    _warmup_lock = threading.Lock()
+    _warmup_future: Optional[Future] = None
+    # load_seconds, warmup_seconds and ready_wait_seconds, when measured
+    metrics: Dict[str, float] = {}
+    _audio_cache: Optional[AudioCache] = None
+    last_stats: Optional[SynthesisStats] = None
+    # Per-speaker model views with prepared voice conditionals, keyed by (model id, prompt path)
+    _voices: Dict[Tuple[str, Optional[str]], Any] = {}
+    _voice_lock = threading.Lock()
+    last_speaker_stats: Dict[str, SpeakerStats] = {}
+    # Named voices: name -> reference clip (register_voice, or TTS_VOICES="name=clip.wav,...")
+    _voice_registry: Dict[str, str] = {}
+    _voice_cache: Optional[VoiceConditioningCache] = None
+    # Reference clip digests by (path, size, mtime), so a clip is hashed once until it changes
+    _clip_digests: Dict[Tuple[str, int, int], str] = {}
+    # Multi-process backend, started on first use when TTS_PROCESS_WORKERS is set
+    _process_pool: Optional["TTSProcessPool"] = None
+    _pool_lock = threading.Lock()
 
     @classmethod
-    def get_model(cls):
-        """Loads and returns the ChatterboxTTS model (Singleton)."""
+    def _load_model(cls):
+        """Imports Chatterbox and loads the pretrained model on the best available device."""
+        try:
+            from chatterbox.tts import ChatterboxTTS
+            import torch
+
+            cls._device = "cuda" if torch.cuda.is_available() else "cpu"
+
+            print(f"--- [TTSManager] Loading Chatterbox model on {cls._device}... ---")
+            model = ChatterboxTTS.from_pretrained(device=cls._device)
+            print("--- [TTSManager] Model loaded successfully. ---")
+            return model
+        except ImportError as e:
+            print(f"--- [TTSManager] Error: Required packages not found or structure changed: {e} ---")
+            print("--- [TTSManager] Please ensure chatterbox is installed and up to date. ---")
+            raise
+        except Exception as e:
+            print(f"--- [TTSManager] Error loading model: {e} ---")
+            raise
+
+    @classmethod
+    def _load_multilingual_model(cls):
+        """Imports Chatterbox and loads the pretrained multilingual model on the best available device."""
+        try:
+            from chatterbox.mtl_tts import ChatterboxMultilingualTTS
+            import torch
+
+            cls._device = "cuda" if torch.cuda.is_available() else "cpu"
+
+            print(f"--- [TTSManager] Loading Chatterbox multilingual model on {cls._device}... ---")
+            model = ChatterboxMultilingualTTS.from_pretrained(device=cls._device)
+            print("--- [TTSManager] Multilingual model loaded successfully. ---")
+            return model
+        except ImportError as e:
+            print(f"--- [TTSManager] Error: Required packages not found or structure changed: {e} ---")
+            print("--- [TTSManager] Please ensure chatterbox is installed and up to date. ---")
+            raise
+        except Exception as e:
+            print(f"--- [TTSManager] Error loading multilingual model: {e} ---")
+            raise
+
+    @classmethod
+    def get_model(cls, multilingual: bool = False):
+        """
+        Loads and returns the ChatterboxTTS model (Singleton), or with
+        ``multilingual=True`` the ChatterboxMultilingualTTS model, which every
+        language of a multilingual episode shares.
+        """
+        if multilingual:
+            if cls._multilingual_model is None:
+                with cls._model_lock:
+                    if cls._multilingual_model is None:
+                        start = time.perf_counter()
+                        cls._multilingual_model = cls._load_multilingual_model()
+                        cls.metrics["multilingual_load_seconds"] = time.perf_counter() - start
+            return cls._multilingual_model
         if cls._model is None:
-            try:
-                from chatterbox.tts import ChatterboxTTS
-                import torch
-                
-                cls._device = "cuda" if torch.cuda.is_available() else "cpu"
-                
-                print(f"--- [TTSManager] Loading Chatterbox model on {cls._device}... ---")
-                cls._model = ChatterboxTTS.from_pretrained(device=cls._device)
-                print(f"--- [TTSManager] Model loaded successfully. ---")
-            except ImportError as e:
-                print(f"--- [TTSManager] Error: Required packages not found or structure changed: {e} ---")
-                print("--- [TTSManager] Please ensure chatterbox is installed and up to date. ---")
-                raise
-            except Exception as e:
-                print(f"--- [TTSManager] Error loading model: {e} ---")
-                raise
+            with cls._model_lock:
+                if cls._model is None:
+                    start = time.perf_counter()
+                    cls._model = cls._load_model()
+                    cls.metrics["load_seconds"] = time.perf_counter() - start
         return cls._model
 
     @classmethod
-    async def generate_audio(cls, text: str) -> str:
-        """Synthesizes speech from text and saves it to a file."""
-        import torchaudio
-        
-        model = cls.get_model()
-        
+    def _synthesizer(cls, language: Optional[str] = None, voice: Optional[str] = None):
+        """
+        Returns the model for ``language`` and a ``text -> wav`` callable bound to it,
+        speaking with ``voice`` (see :meth:`get_voice`). When the multi-process
+        backend is enabled (see :meth:`get_process_pool`), English is synthesized by
+        its workers: the returned "model" is the pool and no model is loaded here.
+        """
+        if language is None:
+            pool = cls.get_process_pool()
+            if pool is not None:
+                # Workers condition the voice themselves, sharing the persisted conditionals
+                audio_prompt_path = cls.resolve_voice(voice)
+                if audio_prompt_path:
+                    return pool, functools.partial(pool.generate, voice=audio_prompt_path)
+                return pool, pool.generate
+            model = cls.get_model()
+            return model, cls.get_voice(model, voice).generate
+        model = cls.get_model(multilingual=True)
+        return model, functools.partial(cls.get_voice(model, voice).generate, language_id=language)
+
+    @classmethod
+    def start_warmup(cls, dummy_synthesis: bool = False, multilingual: bool = False) -> Future:
+        """
+        Starts loading the model in a background thread and returns a future that
+        resolves to the model once it is ready.
+
+        With ``dummy_synthesis=True`` a tiny synthesis is run after loading to
+        trigger lazy kernel initialization and allocations. ``multilingual=True``
+        warms up the multilingual model instead. Calling this again while a
+        warm-up is pending or done returns the same future.
+        """
+        with cls._warmup_lock:
+            if cls._warmup_future is not None:
+                return cls._warmup_future
+            future = Future()
+            cls._warmup_future = future
+
+        def _warmup():
+            try:
+                # With the multi-process backend this starts the workers instead of loading a model here
+                pool = None if multilingual else cls.get_process_pool()
+                model = pool or cls.get_model(multilingual=multilingual)
+                if dummy_synthesis:
+                    start = time.perf_counter()
+                    cls._synthesizer("en" if multilingual else None)[1](TTS_WARMUP_TEXT)
+                    cls.metrics["warmup_seconds"] = time.perf_counter() - start
+                print("--- [TTSManager] Warm-up complete. ---")
+                future.set_result(model)
+            except BaseException as e:
+                print(f"--- [TTSManager] Warm-up failed: {e} ---")
+                future.set_exception(e)
+
+        print("--- [TTSManager] Warming up model in the background... ---")
+        # Daemon thread so an abandoned warm-up never blocks interpreter exit
+        threading.Thread(target=_warmup, name="tts-warmup", daemon=True).start()
+        return future
+
+    @classmethod
+    def get_process_pool(cls) -> Optional["TTSProcessPool"]:
+        """
+        Returns the multi-process backend configured through ``TTS_PROCESS_WORKERS``
+        (a worker count, or ``auto`` for one per core) and ``TTS_WORKER_MEMORY_MB``,
+        starting it on first use, or None when it is disabled. See ``modules/tts_pool.py``.
+
+        When enabled, every English synthesis (single call, chunked, batch, dialogue)
+        and the warm-up go to the workers and no model is loaded in this process.
+        Multilingual synthesis keeps using the in-process multilingual model, and
+        does not start the pool.
+        """
+        setting = os.getenv("TTS_PROCESS_WORKERS", "").strip().lower()
+        if setting in ("", "0"):
+            return None
+        if cls._process_pool is None:
+            with cls._pool_lock:
+                if cls._process_pool is None:
+                    from modules.tts_pool import TTSProcessPool
+
+                    memory_mb = float(os.getenv("TTS_WORKER_MEMORY_MB", TTS_POOL_WORKER_MEMORY_MB))
+                    pool = TTSProcessPool(workers=None if setting == "auto" else int(setting),
+                                          worker_memory_mb=memory_mb)
+                    pool.start()
+                    atexit.register(pool.close)
+                    cls._process_pool = pool
+        return cls._process_pool
+
+    @classmethod
+    async def wait_until_ready(cls):
+        """
+        Waits for a pending background warm-up without blocking the event loop.
+        Does nothing if no warm-up was started. A failed warm-up is cleared so the
+        next call to :meth:`get_model` retries the load.
+        """
+        future = cls._warmup_future
+        if future is None:
+            return
+        start = time.perf_counter()
+        try:
+            await asyncio.wrap_future(future)
+        except BaseException:
+            with cls._warmup_lock:
+                if cls._warmup_future is future:
+                    cls._warmup_future = None
+            raise
+        finally:
+            cls.metrics["ready_wait_seconds"] = time.perf_counter() - start
+
+    @classmethod
+    def get_audio_cache(cls) -> Optional[AudioCache]:
+        """
+        Returns the segment cache configured through ``TTS_AUDIO_CACHE_DIR`` (and
+        ``TTS_AUDIO_CACHE_MAX_MB``), or None when segment caching is disabled.
+        """
+        cache_dir = os.getenv("TTS_AUDIO_CACHE_DIR")
+        if not cache_dir:
+            return None
+        if cls._audio_cache is None or cls._audio_cache.cache_dir != cache_dir:
+            max_mb = float(os.getenv("TTS_AUDIO_CACHE_MAX_MB", TTS_AUDIO_CACHE_MAX_MB))
+            cls._audio_cache = AudioCache(cache_dir, max_bytes=int(max_mb * 1024 * 1024))
+        return cls._audio_cache
+
+    @classmethod
+    def get_voice_cache(cls) -> Optional[VoiceConditioningCache]:
+        """
+        Returns the store of precomputed voice conditionals configured through
+        ``TTS_VOICE_CACHE_DIR``, or None when they are not persisted.
+        """
+        cache_dir = os.getenv("TTS_VOICE_CACHE_DIR")
+        if not cache_dir:
+            return None
+        if cls._voice_cache is None or cls._voice_cache.cache_dir != cache_dir:
+            cls._voice_cache = VoiceConditioningCache(cache_dir)
+        return cls._voice_cache
+
+    @staticmethod
+    def _model_id(model) -> str:
+        model_id = getattr(model, "model_id", None)
+        return model_id if isinstance(model_id, str) else f"{type(model).__module__}.{type(model).__name__}"
+
+    @staticmethod
+    def _model_version(model) -> str:
+        """The model's ``version``, or the version of the package it comes from."""
+        version = getattr(model, "version", None)
+        return version if isinstance(version, str) else _package_version(type(model).__module__)
+
+    @staticmethod
+    def _new_output_path() -> str:
         out_dir = "output"
         if not os.path.exists(out_dir):
             os.makedirs(out_dir)
+        return f"{out_dir}/podcast_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{output_format()}"
+
+    @staticmethod
+    def open_writer(file_name: str, sample_rate: int) -> AudioWriter:
+        """
+        Opens the streaming encoder for ``file_name`` (format from the extension, see
+        ``modules/audio_writer.py``), normalizing loudness to ``TTS_LOUDNESS_TARGET``
+        dB when that is set.
+        """
+        target = os.getenv("TTS_LOUDNESS_TARGET")
+        return open_audio_writer(file_name, sample_rate, loudness_target=float(target) if target else None)
+
+    @classmethod
+    async def generate_audio(cls, text: str, chunked: bool = False, file_name: Optional[str] = None,
+                             workers: int = TTS_CHUNK_WORKERS, silence_ms: int = TTS_CHUNK_SILENCE_MS,
+                             crossfade_ms: int = TTS_CHUNK_CROSSFADE_MS,
+                             max_chars: int = TTS_CHUNK_MAX_CHARS, language: Optional[str] = None,
+                             voice: str = TTS_DEFAULT_VOICE) -> str:
+        """
+        Synthesizes speech from text and saves it to a file.
+
+        With ``chunked=True`` the script is split at sentence/paragraph boundaries and
+        synthesized chunk by chunk (see :meth:`generate_audio_stream`), so audio is
+        written to disk as soon as the first chunk is ready. With a ``language``
+        code (e.g. ``"fr"``) the shared multilingual model speaks that language.
+        ``voice`` names a registered voice or a reference clip (see :meth:`get_voice`).
+        """
+        if chunked:
+            return await cls.generate_audio_stream(
+                split_into_chunks(text, max_chars=max_chars), file_name=file_name,
+                workers=workers, silence_ms=silence_ms, crossfade_ms=crossfade_ms, language=language,
+                voice=voice,
+            )
+
+        await cls.wait_until_ready()
+        model, generate = await asyncio.to_thread(cls._synthesizer, language, voice)
+
+        file_name = file_name or cls._new_output_path()
+
+        print("--- [TTSManager] Synthesizing speech... ---")
 
-        file_name = f"{out_dir}/podcast_{datetime.now().strftime('%Y%m%d_%H%M%S')}.wav"
-        
-        print(f"--- [TTSManager] Synthesizing speech... ---")
-        
         try:
-            import asyncio
-            # Run the heavy, synchronous generation task in a separate thread 
+            start = time.perf_counter()
+            # Run the heavy, synchronous generation task in a separate thread
             # to avoid blocking the LangGraph asyncio event loop.
-            wav = await asyncio.to_thread(model.generate, text)
-            
-            # Save to file, ensuring the tensor is on CPU 
-            torchaudio.save(file_name, wav.cpu(), sample_rate=model.sr)
-            
+            wav = await asyncio.to_thread(generate, text)
+            elapsed = time.perf_counter() - start
+
+            # Encode to file, ensuring the tensor is on CPU
+            samples = _to_numpy(wav)
+            with cls.open_writer(file_name, model.sr) as writer:
+                writer.write(samples)
+            cls.last_stats = SynthesisStats(
+                chunks=1, audio_seconds=len(samples) / model.sr,
+                synthesis_seconds=elapsed, time_to_first_audio=elapsed,
+            )
+
             print(f"--- [TTSManager] Audio saved: {file_name} ---")
             return file_name
-            
+
+        except Exception as e:
+            print(f"--- [TTSManager] Error during synthesis: {e} ---")
+            raise
+
+    @classmethod
+    async def generate_batch(cls, texts: List[str], voice_prompt: Optional[str] = None,
+                             language: Optional[str] = None, max_batch_size: int = TTS_BATCH_MAX_SIZE,
+                             max_length_ratio: float = TTS_BATCH_LENGTH_RATIO,
+                             threads: Optional[int] = None) -> List[np.ndarray]:
+        """
+        Synthesizes many short texts (score lines, headlines, transitions) and
+        returns their audio as float32 arrays in input order.
+
+        Per-call synthesis pays the conditioning, tokenizer setup and a thread
+        handoff for every text. Here the voice is conditioned once (see
+        :meth:`get_voice`), the texts are grouped into length-bucketed batches
+        (see :func:`batch_by_length`) and all batches run in one worker thread
+        under :func:`inference_mode`. Only models exposing ``generate_batch(texts)``
+        synthesize a whole batch in one padded pass. Chatterbox has no such method,
+        so with it the texts of a batch are synthesized one after another, which
+        saves the per-call thread handoff and voice conditioning but not the
+        per-text model passes. Segments in the segment cache are not synthesized
+        again. Timing is recorded in ``TTSManager.last_stats``.
+
+        Args:
+            texts (list): The texts to synthesize.
+            voice_prompt (str, optional): Registered voice name or reference clip. Defaults to the
+                built-in voice.
+            language (str, optional): Language code spoken by the multilingual model.
+            max_batch_size (int): Texts per batch.
+            max_length_ratio (float): Longest / shortest text allowed in one batch.
+            threads (int, optional): Intra-op CPU threads (also via ``TTS_THREADS``). Defaults to
+                torch's setting.
+
+        Returns:
+            list: One mono float32 array per text (at ``model.sr``).
+        """
+        await cls.wait_until_ready()
+        # Loading the model and conditioning the voice both block, so keep them off the event loop
+        model, _ = await asyncio.to_thread(cls._synthesizer, language, voice_prompt)
+        pooled = cls._process_pool is not None and model is cls._process_pool
+        if not pooled:
+            # The view conditioned above, so it may synthesize whole batches
+            model = cls.get_voice(model, voice_prompt)
+        if threads is None and os.getenv("TTS_THREADS"):
+            threads = int(os.getenv("TTS_THREADS"))
+        cache = cls.get_audio_cache()
+        model_id = cls._model_id(model)
+        voice = cls._voice_key(voice_prompt)
+        if language is not None:
+            voice = f"{voice}@{language}"
+        options = {"language_id": language} if language is not None else {}
+
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+        keys = [AudioCache.key(text, model_id, voice, model.sr) for text in texts] if cache is not None else []
+        for i, key in enumerate(keys):
+            results[i] = cache.get(key)
+        todo = [i for i, samples in enumerate(results) if samples is None]
+        batches = [[todo[j] for j in batch] for batch in
+                   batch_by_length([texts[i] for i in todo], max_batch_size, max_length_ratio)]
+        print(f"--- [TTSManager] Synthesizing {len(todo)} text(s) in {len(batches)} batch(es)"
+              f"{f', {len(texts) - len(todo)} from cache' if len(todo) < len(texts) else ''}... ---")
+
+        def _store(i: int, wav):
+            results[i] = _to_numpy(wav)
+            if cache is not None:
+                cache.put(keys[i], results[i])
+
+        def _run_batches():
+            if pooled:
+                # The worker processes take the texts off the pool's queue in parallel
+                audio_prompt_path = cls.resolve_voice(voice_prompt)
+                pool_options = {"voice": audio_prompt_path} if audio_prompt_path else {}
+                futures = [(i, model.submit(texts[i], **pool_options)) for i in todo]
+                for i, future in futures:
+                    _store(i, future.result())
+                return
+            with inference_mode(threads):
+                for batch in batches:
+                    batch_texts = [texts[i] for i in batch]
+                    if hasattr(model, "generate_batch"):
+                        wavs = model.generate_batch(batch_texts, **options)
+                    else:
+                        wavs = [model.generate(text, **options) for text in batch_texts]
+                    for i, wav in zip(batch, wavs):
+                        _store(i, wav)
+
+        start = time.perf_counter()
+        try:
+            await asyncio.to_thread(_run_batches)
+        except Exception as e:
+            print(f"--- [TTSManager] Error during batched synthesis: {e} ---")
+            raise
+        elapsed = time.perf_counter() - start
+
+        cls.last_stats = SynthesisStats(
+            chunks=len(texts), audio_seconds=sum(len(samples) for samples in results) / model.sr,
+            synthesis_seconds=elapsed,
+        )
+        print(f"--- [TTSManager] Batched synthesis done: {cls.last_stats.audio_seconds:.1f}s audio, "
+              f"RTF {cls.last_stats.real_time_factor:.2f} ---")
+        return results
+
+    @classmethod
+    async def generate_audio_stream(cls, chunks: Union[Iterable[str], AsyncIterable[str]],
+                                    file_name: Optional[str] = None, workers: int = TTS_CHUNK_WORKERS,
+                                    silence_ms: int = TTS_CHUNK_SILENCE_MS,
+                                    crossfade_ms: int = TTS_CHUNK_CROSSFADE_MS,
+                                    voice: str = TTS_DEFAULT_VOICE, language: Optional[str] = None,
+                                    cache: Optional[AudioCache] = None) -> str:
+        """
+        Synthesizes a sequence of text chunks through a worker pool and streams the
+        finished audio to a WAV file in input order.
+
+        ``chunks`` may be a plain iterable or an async iterable, so callers can keep
+        feeding text while earlier chunks are already being synthesized. Timing is
+        recorded in ``TTSManager.last_stats``. When the segment cache is enabled
+        (see :meth:`get_audio_cache`), chunks synthesized before are spliced in
+        from the cache instead of being regenerated. When the multi-process backend
+        is enabled (see :meth:`get_process_pool`), chunks are synthesized by its
+        worker processes, at least one chunk per worker at a time.
+
+        Args:
+            chunks: The text chunks to synthesize, in playback order.
+            file_name (str, optional): Output path. Defaults to a timestamped file in ``output/``.
+            workers (int): Number of chunks synthesized concurrently.
+            silence_ms (int): Silence inserted between consecutive chunks.
+            crossfade_ms (int): Overlap between chunks (or fade length around silence).
+            voice (str): Registered voice name or reference clip (see :meth:`get_voice`); the
+                clip's content is part of the segment cache key. ``"default"`` is the built-in voice.
+            language (str, optional): Language code spoken by the multilingual model.
+            cache (AudioCache, optional): Segment cache to use instead of the one configured
+                through ``TTS_AUDIO_CACHE_DIR``.
+
+        Returns:
+            str: The path of the written WAV file.
+        """
+        await cls.wait_until_ready()
+        model, generate = await asyncio.to_thread(cls._synthesizer, language, voice)
+        if cls._process_pool is not None and model is cls._process_pool:
+            workers = max(workers, model.workers)
+        voice_key = cls._voice_key(voice)
+        if language is not None:
+            voice_key = f"{voice_key}@{language}"
+        if cache is None:
+            cache = cls.get_audio_cache()
+        model_id = cls._model_id(model)
+        file_name = file_name or cls._new_output_path()
+        loop = asyncio.get_running_loop()
+        max_ahead = max(1, workers) * 2
+
+        print(f"--- [TTSManager] Synthesizing speech in chunks ({workers} worker(s))... ---")
+
+        start = time.perf_counter()
+        time_to_first_audio = None
+        count = 0
+        pending = deque()
+
+        def _synthesize(text: str) -> np.ndarray:
+            if cache is None:
+                return _to_numpy(generate(text))
+            key = AudioCache.key(text, model_id, voice_key, model.sr)
+            samples = cache.get(key)
+            if samples is None:
+                samples = _to_numpy(generate(text))
+                cache.put(key, samples)
+            return samples
+
+        async def _write_next():
+            nonlocal time_to_first_audio
+            stitcher.add(await pending.popleft())
+            if time_to_first_audio is None and writer.frames_written:
+                time_to_first_audio = time.perf_counter() - start
+                print(f"--- [TTSManager] First audio after {time_to_first_audio:.2f}s ---")
+
+        async def _iterate():
+            if hasattr(chunks, "__aiter__"):
+                async for chunk in chunks:
+                    yield chunk
+            else:
+                for chunk in chunks:
+                    yield chunk
+
+        executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="tts-chunk")
+        try:
+            with cls.open_writer(file_name, model.sr) as writer:
+                stitcher = _ChunkStitcher(writer, model.sr, silence_ms=silence_ms, crossfade_ms=crossfade_ms)
+                async for chunk in _iterate():
+                    if not chunk.strip():
+                        continue
+                    pending.append(loop.run_in_executor(executor, _synthesize, chunk))
+                    count += 1
+                    if len(pending) >= max_ahead:
+                        await _write_next()
+                while pending:
+                    await _write_next()
+                stitcher.flush()
+                audio_seconds = writer.seconds_written
         except Exception as e:
+            for future in pending:
+                future.cancel()
             print(f"--- [TTSManager] Error during synthesis: {e} ---")
             raise
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        cls.last_stats = SynthesisStats(
+            chunks=count, audio_seconds=audio_seconds,
+            synthesis_seconds=time.perf_counter() - start, time_to_first_audio=time_to_first_audio,
+        )
+        print(f"--- [TTSManager] Audio saved: {file_name} ({count} chunks, "
+              f"{audio_seconds:.1f}s audio, RTF {cls.last_stats.real_time_factor:.2f}) ---")
+        if cache is not None:
+            stats = cache.stats()
+            print(f"--- [TTSManager] Segment cache: {stats['hits']} hits, {stats['misses']} misses "
+                  f"(hit rate {stats['hit_rate']:.0%}) ---")
+        return file_name
+
+    @classmethod
+    def register_voice(cls, name: str, audio_prompt_path: str, precompute: bool = False):
+        """
+        Registers the reference clip ``audio_prompt_path`` as voice ``name``, which
+        every synthesis method then accepts as its voice. With ``precompute=True``
+        the voice is conditioned on the model right away (loading it if needed),
+        so the first episode does not pay for it.
+        """
+        if not os.path.isfile(audio_prompt_path):
+            raise FileNotFoundError(f"Reference clip not found: {audio_prompt_path}")
+        with cls._voice_lock:
+            cls._voice_registry[name] = audio_prompt_path
+        print(f"--- [TTSManager] Registered voice {name}: {audio_prompt_path} ---")
+        if precompute:
+            cls.get_voice(cls.get_model(), name)
+
+    @classmethod
+    def resolve_voice(cls, voice: Optional[str]) -> Optional[str]:
+        """
+        Returns the reference clip of ``voice``: a name registered with
+        :meth:`register_voice` or in ``TTS_VOICES`` (``name=clip.wav,...``), or else
+        a clip path as given. None stands for the built-in voice.
+        """
+        if not voice or voice == TTS_DEFAULT_VOICE:
+            return None
+        if voice in cls._voice_registry:
+            return cls._voice_registry[voice]
+        for entry in os.getenv("TTS_VOICES", "").split(","):
+            name, _, path = entry.partition("=")
+            if path and name.strip() == voice:
+                return path.strip()
+        return voice
+
+    @classmethod
+    def _voice_key(cls, voice: Optional[str]) -> str:
+        """
+        Identity of ``voice`` in segment cache keys: the digest of its reference
+        clip, so re-registering a name or replacing the clip behind a path never
+        returns audio of the old voice. The built-in voice is ``"default"``.
+        """
+        audio_prompt_path = cls.resolve_voice(voice)
+        if audio_prompt_path is None:
+            return TTS_DEFAULT_VOICE
+        try:
+            stat = os.stat(audio_prompt_path)
+        except OSError:
+            return audio_prompt_path
+        key = (os.path.abspath(audio_prompt_path), stat.st_size, stat.st_mtime_ns)
+        digest = cls._clip_digests.get(key)
+        if digest is None:
+            digest = cls._clip_digests[key] = file_digest(audio_prompt_path)
+        return f"clip:{digest}"
+
+    @classmethod
+    def _condition_voice(cls, view, audio_prompt_path: str) -> str:
+        """Sets the conditionals of ``view`` from the voice cache or the clip; returns which was used."""
+        cache = cls.get_voice_cache()
+        template = getattr(view, "conds", None)
+        key = None
+        if cache is not None and template is not None and os.path.isfile(audio_prompt_path):
+            key = VoiceConditioningCache.key(audio_prompt_path, cls._model_id(view), cls._model_version(view))
+            arrays = cache.get(key)
+            if arrays is not None:
+                view.conds = import_conditionals(template, arrays)
+                return "the voice cache"
+        view.prepare_conditionals(audio_prompt_path)
+        if key is not None:
+            cache.put(key, export_conditionals(view.conds))
+        return audio_prompt_path
+
+    @classmethod
+    def get_voice(cls, model, voice: Optional[str] = None):
+        """
+        Returns a view of ``model`` conditioned on ``voice``, a registered voice
+        name (see :meth:`resolve_voice`) or the path of a reference clip.
+
+        Chatterbox keeps the speaker conditionals on the model (``model.conds``),
+        so the view is a shallow copy sharing every weight with ``model`` but
+        holding its own conditionals. Each reference clip is embedded once per
+        process; later turns (and episodes) of that speaker reuse the view, and
+        views of different speakers can synthesize concurrently. When
+        ``TTS_VOICE_CACHE_DIR`` is set the conditionals are also persisted, so
+        later runs load them instead of embedding the clip again. Without a
+        voice the model's built-in voice is used.
+        """
+        audio_prompt_path = cls.resolve_voice(voice)
+        if audio_prompt_path is None:
+            return model
+        key = (cls._model_id(model), audio_prompt_path)
+        with cls._voice_lock:
+            view = cls._voices.get(key)
+            if view is None:
+                start = time.perf_counter()
+                view = copy.copy(model)
+                source = cls._condition_voice(view, audio_prompt_path)
+                elapsed = time.perf_counter() - start
+                cls.metrics["voice_conditioning_seconds"] = elapsed
+                cls._voices[key] = view
+                print(f"--- [TTSManager] Voice {voice} conditioned from {source} in {elapsed:.2f}s ---")
+            return view
+
+    @classmethod
+    async def generate_dialogue(cls, turns: List["Turn"], voices: Optional[Dict[str, Optional[str]]] = None,
+                                file_name: Optional[str] = None, gap_ms: int = DIALOGUE_GAP_MS,
+                                crossfade_ms: int = TTS_CHUNK_CROSSFADE_MS) -> str:
+        """
+        Synthesizes a multi-speaker dialogue and writes it to one WAV file.
+
+        Turns are grouped by speaker: every speaker gets a worker thread and a
+        voice-conditioned model view (see :meth:`get_voice`) and synthesizes its
+        own turns in script order, so speakers run in parallel and no turn pays
+        for re-conditioning. Finished turns are written in script order with
+        ``gap_ms`` of silence between them. Per-speaker throughput is recorded
+        in ``TTSManager.last_speaker_stats``.
+
+        Args:
+            turns (list): The dialogue turns, in playback order.
+            voices (dict, optional): Reference clip (``audio_prompt_path``) per speaker;
+                speakers without one use the model's default voice.
+            file_name (str, optional): Output path. Defaults to a timestamped file in ``output/``.
+            gap_ms (int): Silence between consecutive turns.
+            crossfade_ms (int): Fade length around each gap.
+
+        Returns:
+            str: The path of the written WAV file.
+        """
+        await cls.wait_until_ready()
+        model, _ = await asyncio.to_thread(cls._synthesizer)
+        cache = cls.get_audio_cache()
+        model_id = cls._model_id(model)
+        voices = voices or {}
+        file_name = file_name or cls._new_output_path()
+
+        speakers = list(dict.fromkeys(turn.speaker for turn in turns))
+        results: List[Future] = [Future() for _ in turns]
+        stats = {speaker: SpeakerStats() for speaker in speakers}
+        print(f"--- [TTSManager] Synthesizing dialogue: {len(turns)} turns, {len(speakers)} speaker(s)... ---")
+
+        def _speaker_worker(speaker: str):
+            try:
+                generate = cls._synthesizer(None, voices.get(speaker))[1]
+            except BaseException as e:
+                for i, turn in enumerate(turns):
+                    if turn.speaker == speaker:
+                        results[i].set_exception(e)
+                return
+            voice_id = cls._voice_key(voices.get(speaker))
+            for i, turn in enumerate(turns):
+                if turn.speaker != speaker or results[i].cancelled():
+                    continue
+                try:
+                    start = time.perf_counter()
+                    key = AudioCache.key(turn.text, model_id, voice_id, model.sr) if cache is not None else None
+                    samples = cache.get(key) if cache is not None else None
+                    if samples is None:
+                        samples = _to_numpy(generate(turn.text))
+                        if cache is not None:
+                            cache.put(key, samples)
+                    speaker_stats = stats[speaker]
+                    speaker_stats.turns += 1
+                    speaker_stats.characters += len(turn.text)
+                    speaker_stats.audio_seconds += len(samples) / model.sr
+                    speaker_stats.synthesis_seconds += time.perf_counter() - start
+                    results[i].set_result(samples)
+                except BaseException as e:
+                    results[i].set_exception(e)
+
+        start = time.perf_counter()
+        time_to_first_audio = None
+        executor = ThreadPoolExecutor(max_workers=max(1, len(speakers)), thread_name_prefix="tts-speaker")
+        try:
+            for speaker in speakers:
+                executor.submit(_speaker_worker, speaker)
+            with cls.open_writer(file_name, model.sr) as writer:
+                stitcher = _ChunkStitcher(writer, model.sr, silence_ms=gap_ms, crossfade_ms=crossfade_ms)
+                for result in results:
+                    stitcher.add(await asyncio.wrap_future(result))
+                    if time_to_first_audio is None and writer.frames_written:
+                        time_to_first_audio = time.perf_counter() - start
+                stitcher.flush()
+                audio_seconds = writer.seconds_written
+        except Exception as e:
+            for result in results:
+                result.cancel()
+            print(f"--- [TTSManager] Error during dialogue synthesis: {e} ---")
+            raise
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        cls.last_stats = SynthesisStats(
+            chunks=len(turns), audio_seconds=audio_seconds,
+            synthesis_seconds=time.perf_counter() - start, time_to_first_audio=time_to_first_audio,
+        )
+        cls.last_speaker_stats = stats
+        for speaker, speaker_stats in stats.items():
+            print(f"--- [TTSManager] {speaker}: {speaker_stats.turns} turns, "
+                  f"{speaker_stats.audio_seconds:.1f}s audio, "
+                  f"{speaker_stats.audio_seconds_per_second:.2f}s audio/s, "
+                  f"{speaker_stats.characters_per_second:.0f} chars/s ---")
+        print(f"--- [TTSManager] Audio saved: {file_name} ({audio_seconds:.1f}s audio, "
+              f"RTF {cls.last_stats.real_time_factor:.2f}) ---")
+        return file_name
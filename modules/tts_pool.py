@@ -0,0 +1,360 @@
+"""
+Multi-process TTS backend.
+
+:class:`TTSManager` keeps one model per process and synthesizes on threads, so
+the Python parts of synthesis (tokenization, sampling loops, vocoder glue) share
+one GIL. :class:`TTSProcessPool` runs the model in worker processes instead:
+
+* every worker loads the model once and limits torch to its share of the cores
+  (``threads_per_worker``), so the workers partition the CPU instead of fighting
+  over it
+* the parent sends text jobs over a pipe; the worker writes the finished float32
+  PCM into a :mod:`multiprocessing.shared_memory` block and replies with its name,
+  so audio is copied once instead of being pickled
+* the number of workers is capped by the RAM available for a model copy each
+* a worker that dies (segfault, OOM kill) is restarted and its job retried once
+
+Enable it with ``TTS_PROCESS_WORKERS``: every English synthesis path of
+``TTSManager`` then runs in the workers (see ``TTSManager.get_process_pool``).
+"""
+import os
+import queue
+import asyncio
+import importlib
+import threading
+import multiprocessing
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from typing import Callable, List, Optional, Union
+
+import numpy as np
+
+from modules.constants import (
+    TTS_POOL_JOB_RETRIES,
+    TTS_POOL_MEMORY_RESERVE_MB,
+    TTS_POOL_WORKER_MEMORY_MB,
+)
+
+DEFAULT_MODEL_FACTORY = "modules.tts_pool:load_default_model"
+
+# How often a waiting parent thread checks that its worker is still alive
+_POLL_INTERVAL = 0.1
+
+
+class WorkerCrashed(RuntimeError):
+    """A TTS worker process exited while loading the model or synthesizing."""
+
+
+def load_default_model():
+    """Loads the Chatterbox model in a worker process."""
+    from modules.tts import TTSManager
+
+    return TTSManager.get_model()
+
+
+def _resolve_factory(factory: Union[str, Callable]) -> Callable:
+    if callable(factory):
+        return factory
+    module_name, _, attribute = factory.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def available_memory_mb() -> Optional[float]:
+    """RAM available for new processes in MB (``MemAvailable``), or None if unknown."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def plan_workers(requested: Optional[int] = None, worker_memory_mb: float = TTS_POOL_WORKER_MEMORY_MB,
+                 reserve_mb: float = TTS_POOL_MEMORY_RESERVE_MB) -> int:
+    """
+    Number of workers to start: ``requested`` (default: one per core), capped so
+    that ``worker_memory_mb`` per worker fits in the available RAM after keeping
+    ``reserve_mb`` free. Always at least one.
+    """
+    workers = requested or os.cpu_count() or 1
+    available = available_memory_mb()
+    if available is not None and worker_memory_mb > 0:
+        fits = int((available - reserve_mb) // worker_memory_mb)
+        if fits < workers:
+            print(f"--- [TTSProcessPool] {available:.0f} MB available fits {max(1, fits)} worker(s) "
+                  f"of {worker_memory_mb:.0f} MB, not {workers} ---")
+            workers = fits
+    return max(1, workers)
+
+
+def _worker_main(conn, factory: Union[str, Callable], threads: int):
+    """Worker process: loads the model, then answers jobs until told to stop."""
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[variable] = str(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+    from modules.tts import TTSManager, _to_numpy, inference_mode
+
+    try:
+        model = _resolve_factory(factory)()
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+        return
+    conn.send(("ready", model.sr, TTSManager._model_id(model)))
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        if message[0] == "stop":
+            return
+        _, text, kwargs = message
+        try:
+            # A voice (reference clip) is conditioned once per worker, see TTSManager.get_voice
+            voice = TTSManager.get_voice(model, kwargs.pop("voice", None))
+            with inference_mode():
+                samples = _to_numpy(voice.generate(text, **kwargs))
+            block = shared_memory.SharedMemory(create=True, size=max(1, samples.nbytes))
+            np.ndarray(samples.shape, dtype=np.float32, buffer=block.buf)[:] = samples
+            # The parent unlinks the block once it has copied the samples out
+            conn.send(("ok", block.name, len(samples)))
+            block.close()
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+def _read_shared(name: str, frames: int) -> np.ndarray:
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        return np.ndarray((frames,), dtype=np.float32, buffer=block.buf).copy()
+    finally:
+        block.close()
+        block.unlink()
+
+
+class _Worker:
+    """Parent-side handle of one worker process, served by its own dispatcher thread."""
+
+    def __init__(self, pool: "TTSProcessPool", index: int):
+        self.pool = pool
+        self.index = index
+        self.process = None
+        self.conn = None
+        self.thread = threading.Thread(target=self._run, name=f"tts-pool-{index}", daemon=True)
+
+    def spawn(self):
+        """Starts the process and waits until it has loaded the model."""
+        self.start_process()
+        self.await_ready()
+
+    def start_process(self):
+        """Starts the process without waiting for its model load (see :meth:`await_ready`)."""
+        pool = self.pool
+        parent_conn, child_conn = pool._context.Pipe()
+        self.process = pool._context.Process(
+            target=_worker_main, args=(child_conn, pool.model_factory, pool.threads_per_worker),
+            name=f"tts-worker-{self.index}", daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+
+    def await_ready(self):
+        """Waits for the "ready" reply of a started process; stops it if the model failed to load."""
+        reply = self._receive()
+        if reply[0] == "error":
+            self.stop()
+            raise WorkerCrashed(f"Worker {self.index} failed to load the model: {reply[1]}")
+        _, sample_rate, model_id = reply
+        self.pool.sr, self.pool.model_id = sample_rate, model_id
+
+    def _receive(self):
+        while not self.conn.poll(_POLL_INTERVAL):
+            if not self.process.is_alive():
+                break
+        try:
+            return self.conn.recv()
+        except (EOFError, OSError):
+            self.process.join(timeout=1)
+            raise WorkerCrashed(f"Worker {self.index} exited with code {self.process.exitcode}") from None
+
+    def _synthesize(self, text: str, kwargs: dict) -> np.ndarray:
+        self.conn.send(("job", text, kwargs))
+        reply = self._receive()
+        if reply[0] == "error":
+            raise RuntimeError(reply[1])
+        _, name, frames = reply
+        return _read_shared(name, frames)
+
+    def _run(self):
+        pool = self.pool
+        while True:
+            job = pool._jobs.get()
+            if job is None:
+                self.stop()
+                return
+            text, kwargs, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            attempts = 0
+            while True:
+                try:
+                    future.set_result(self._synthesize(text, kwargs))
+                    break
+                except WorkerCrashed as e:
+                    attempts += 1
+                    pool.restarts += 1
+                    print(f"--- [TTSProcessPool] {e}; restarting it ---")
+                    try:
+                        self.spawn()
+                    except Exception as spawn_error:
+                        future.set_exception(spawn_error)
+                        pool._worker_lost(self)
+                        return
+                    if attempts > pool.job_retries:
+                        # The same text keeps killing workers: fail it instead of crashing forever
+                        future.set_exception(WorkerCrashed(f"{e} (after {attempts} attempt(s))"))
+                        break
+                except Exception as e:
+                    future.set_exception(e)
+                    break
+
+    def stop(self):
+        if self.process is None:
+            return
+        if self.process.is_alive():
+            try:
+                self.conn.send(("stop",))
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(timeout=5)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join()
+        self.conn.close()
+
+
+class TTSProcessPool:
+    """
+    Pool of TTS worker processes, each holding its own copy of the model.
+
+    It quacks like a model (``sr``, ``model_id`` and a blocking, thread-safe
+    ``generate``), so :meth:`TTSManager.generate_audio_stream` can use it in place
+    of the in-process model; :meth:`synthesize` is the asyncio variant.
+
+    Args:
+        workers (int, optional): Worker processes. Defaults to one per core, capped by RAM.
+        model_factory (str or callable): ``"module:function"`` (or a picklable callable)
+            returning the model, called once in every worker.
+        threads_per_worker (int, optional): Torch intra-op threads per worker.
+            Defaults to an equal share of the cores.
+        worker_memory_mb (float): RAM one worker needs, used to cap ``workers``.
+        job_retries (int): Times a job is retried after its worker crashed.
+    """
+
+    def __init__(self, workers: Optional[int] = None, model_factory: Union[str, Callable] = DEFAULT_MODEL_FACTORY,
+                 threads_per_worker: Optional[int] = None, worker_memory_mb: float = TTS_POOL_WORKER_MEMORY_MB,
+                 job_retries: int = TTS_POOL_JOB_RETRIES):
+        self.workers = plan_workers(workers, worker_memory_mb)
+        self.model_factory = model_factory
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // self.workers)
+        self.job_retries = job_retries
+        self.sr: Optional[int] = None
+        self.model_id: Optional[str] = None
+        self.restarts = 0
+        # spawn: forking a process that already runs threads (or CUDA) is unsafe
+        self._context = multiprocessing.get_context("spawn")
+        self._jobs: "queue.Queue" = queue.Queue()
+        self._workers: List[_Worker] = []
+        self._lock = threading.Lock()
+        self._started = False
+
+    def start(self) -> "TTSProcessPool":
+        """
+        Starts the workers and waits until every one has loaded the model. All
+        processes are started first, so the models load in parallel and startup
+        takes about one load time rather than one per worker.
+        """
+        with self._lock:
+            if self._started:
+                return self
+            print(f"--- [TTSProcessPool] Starting {self.workers} worker(s), "
+                  f"{self.threads_per_worker} thread(s) each... ---")
+            try:
+                for index in range(self.workers):
+                    worker = _Worker(self, index)
+                    worker.start_process()
+                    self._workers.append(worker)
+                for worker in self._workers:
+                    worker.await_ready()
+            except Exception:
+                for worker in self._workers:
+                    worker.stop()
+                self._workers.clear()
+                raise
+            for worker in self._workers:
+                worker.thread.start()
+            self._started = True
+            print(f"--- [TTSProcessPool] Ready ({self.model_id} at {self.sr} Hz). ---")
+        return self
+
+    def _worker_lost(self, worker: _Worker):
+        """Drops a worker that could not be restarted; fails queued jobs once none is left."""
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+            if self._workers:
+                return
+        while True:
+            try:
+                job = self._jobs.get_nowait()
+            except queue.Empty:
+                return
+            if job is not None and job[2].set_running_or_notify_cancel():
+                job[2].set_exception(WorkerCrashed("No TTS worker left"))
+
+    def submit(self, text: str, **kwargs) -> Future:
+        """Queues ``text`` for synthesis; the future resolves to a mono float32 array."""
+        if not self._started:
+            self.start()
+        future = Future()
+        with self._lock:
+            if not self._workers:
+                future.set_exception(WorkerCrashed("No TTS worker left"))
+                return future
+            self._jobs.put((text, kwargs, future))
+        return future
+
+    def generate(self, text: str, **kwargs) -> np.ndarray:
+        """Synthesizes ``text`` in a worker, blocking the calling thread."""
+        return self.submit(text, **kwargs).result()
+
+    async def synthesize(self, text: str, **kwargs) -> np.ndarray:
+        """Synthesizes ``text`` in a worker without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(text, **kwargs))
+
+    def close(self):
+        """Lets the workers finish the queued jobs, then stops them."""
+        with self._lock:
+            workers, self._workers = self._workers, []
+            self._started = False
+        for _ in workers:
+            self._jobs.put(None)
+        for worker in workers:
+            worker.thread.join()
+
+    def __enter__(self) -> "TTSProcessPool":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
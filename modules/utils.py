@@ -19,4 +19,50 @@ def wave_file(filename, pcm, channels=1, rate=24000, sample_width=2):
         wf.setnchannels(channels)
         wf.setsampwidth(sample_width)
         wf.setframerate(rate)
-        wf.writeframes(pcm)
\ No newline at end of file
+        wf.writeframes(pcm)
+
+
+class WaveStreamWriter:
+    """
+    Writes PCM audio data to a WAV file incrementally, chunk by chunk.
+
+    The header is patched with the final length on close, so only the chunk
+    currently being written is held in memory.
+
+    Args:
+        filename (str): The name of the file to which the audio data will be saved.
+        channels (int, optional): The number of audio channels. Defaults to 1.
+        rate (int, optional): The sample rate (samples per second). Defaults to 24000.
+        sample_width (int, optional): The sample width in bytes. Defaults to 2.
+    """
+
+    def __init__(self, filename, channels=1, rate=24000, sample_width=2):
+        self.filename = filename
+        self.channels = channels
+        self.rate = rate
+        self.sample_width = sample_width
+        self.frames_written = 0
+        self._wf = wave.open(filename, "wb")
+        self._wf.setnchannels(channels)
+        self._wf.setsampwidth(sample_width)
+        self._wf.setframerate(rate)
+
+    def write(self, pcm):
+        """Appends a chunk of PCM audio data to the file."""
+        self._wf.writeframes(pcm)
+        self.frames_written += len(pcm) // (self.channels * self.sample_width)
+
+    @property
+    def seconds_written(self):
+        return self.frames_written / self.rate
+
+    def close(self):
+        if self._wf is not None:
+            self._wf.close()
+            self._wf = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
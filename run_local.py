@@ -1,6 +1,7 @@
 import sys
 import os
 import asyncio
+import argparse
 from dotenv import load_dotenv
 
 # Add current directory to path
@@ -9,26 +10,164 @@ if base_path not in sys.path:
     sys.path.insert(0, base_path)
 
 from modules.langgraph_agent import FootballPodcastAgent
+from modules.constants import (
+    BACKFILL_MANIFEST_PATH,
+    BATCH_MAX_CONCURRENCY,
+    LEAGUE_LLM_CONCURRENCY,
+    LIVE_UPDATE_INTERVAL,
+    PIPELINE_CHECKPOINT_DB,
+    SERVER_HOST,
+    SERVER_MAX_QUEUE,
+    SERVER_PORT,
+    SERVER_WORKERS,
+)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate a football podcast episode locally.")
+    parser.add_argument("query", nargs="?", default="Today's football highlights",
+                        help="What the podcast should be about.")
+    parser.add_argument("--warmup", action="store_true",
+                        help="Load the TTS model in the background while matches, news and the script are prepared.")
+    parser.add_argument("--warmup-synthesis", action="store_true",
+                        help="With --warmup, also run a tiny dummy synthesis to initialize kernels.")
+    parser.add_argument("--timings", action="store_true",
+                        help="Print a per-stage timing and counter breakdown after the run.")
+    parser.add_argument("--metrics-out", metavar="PATH",
+                        help="Write per-stage metrics to PATH (Prometheus textfile if it ends in .prom, else JSON lines).")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue the previous run of the same query (or --run-id) from its first incomplete node.")
+    parser.add_argument("--run-id", help="Checkpoint id of the run (defaults to one derived from the query and date).")
+    parser.add_argument("--languages", metavar="CODES",
+                        help="Comma-separated language codes (e.g. en,ar); matches, news and the context are "
+                             "shared and one episode is written per language.")
+    batch = parser.add_argument_group("backfill", "Generate one episode per day for a date range.")
+    batch.add_argument("--date-from", metavar="YYYY-MM-DD", help="First day of the backfill.")
+    batch.add_argument("--date-to", metavar="YYYY-MM-DD", help="Last day of the backfill (defaults to --date-from).")
+    batch.add_argument("--competitions",
+                       help="Comma-separated competition codes (e.g. PL,PD); also used by --live and --leagues.")
+    batch.add_argument("--max-concurrency", type=int, default=BATCH_MAX_CONCURRENCY,
+                       help="Episodes prepared concurrently; TTS always runs one at a time.")
+    batch.add_argument("--manifest", default=BACKFILL_MANIFEST_PATH,
+                       help="Progress manifest; rerunning with the same manifest resumes the backfill.")
+    leagues = parser.add_argument_group("leagues", "One episode per league from a single matchday fetch.")
+    leagues.add_argument("--leagues", action="store_true",
+                         help="Generate an episode for each top-flight league (or --competitions).")
+    leagues.add_argument("--date", metavar="YYYY-MM-DD", help="With --leagues, the matchday (defaults to today).")
+    leagues.add_argument("--llm-concurrency", type=int, default=LEAGUE_LLM_CONCURRENCY,
+                         help="With --leagues, script generations in flight across leagues.")
+    live = parser.add_argument_group("live", "Incremental updates during a live matchday.")
+    live.add_argument("--live", action="store_true",
+                      help="Update today's episode, redoing only matches whose status or score changed.")
+    live.add_argument("--live-interval", type=float, metavar="MINUTES",
+                      help=f"With --live, keep updating every MINUTES (e.g. {LIVE_UPDATE_INTERVAL // 60}).")
+    serve = parser.add_argument_group("server", "Keep the models resident and accept jobs over HTTP.")
+    serve.add_argument("--serve", action="store_true", help="Run the long-running podcast service.")
+    serve.add_argument("--host", default=SERVER_HOST)
+    serve.add_argument("--port", type=int, default=SERVER_PORT)
+    serve.add_argument("--unix-socket", metavar="PATH", help="Listen on a Unix socket instead of TCP.")
+    serve.add_argument("--workers", type=int, default=SERVER_WORKERS, help="Jobs processed concurrently.")
+    serve.add_argument("--queue-size", type=int, default=SERVER_MAX_QUEUE,
+                       help="Queued jobs accepted before new ones are rejected with 429.")
+    return parser.parse_args()
+
+async def run_backfill(args):
+    from modules.batch import BackfillRunner
+
+    competitions = args.competitions.split(",") if args.competitions else None
+    agent = FootballPodcastAgent(tts_concurrency=1, warmup_tts=args.warmup or None,
+                                 warmup_synthesis=args.warmup_synthesis or None)
+    runner = BackfillRunner(agent, competitions=competitions, max_concurrency=args.max_concurrency,
+                            manifest_path=args.manifest)
+    episodes = await runner.run(args.date_from, args.date_to or args.date_from)
+
+    print("\n--- [Main] Backfill Complete ---")
+    for day, entry in episodes.items():
+        print(f"{day}: {entry.get('status', 'unknown')} {entry.get('audio_path') or ''}".rstrip())
+
+async def run_leagues(args):
+    from modules.batch import LeagueShardRunner
+
+    competitions = args.competitions.split(",") if args.competitions else None
+    agent = FootballPodcastAgent(tts_concurrency=1, llm_concurrency=args.llm_concurrency, warmup_tts=True,
+                                 warmup_synthesis=args.warmup_synthesis or None)
+    runner = LeagueShardRunner(agent, competitions=competitions)
+    report = await runner.run(args.date)
+
+    print("\n--- [Main] League Episodes Complete ---")
+    print(report.format())
+
+async def run_live(args):
+    from modules.live import LiveRunner
+
+    competitions = args.competitions.split(",") if args.competitions else None
+    agent = FootballPodcastAgent(tts_concurrency=1, warmup_tts=True, warmup_synthesis=args.warmup_synthesis or None)
+    runner = LiveRunner(agent, competitions=competitions)
+    while True:
+        update = await runner.run()
+        for error in update.errors:
+            print(f"- {error}")
+        if update.audio_path:
+            print(f"Live update generated at: {update.audio_path}")
+        if not args.live_interval:
+            return
+        await asyncio.sleep(args.live_interval * 60)
+
+async def run_server(args):
+    from modules.server import PodcastServer
+
+    agent = FootballPodcastAgent(tts_concurrency=1, warmup_tts=True, warmup_synthesis=args.warmup_synthesis or None)
+    async with PodcastServer(agent, workers=args.workers, max_queue=args.queue_size) as server:
+        await server.start(host=args.host, port=args.port, unix_socket=args.unix_socket)
+        await server.serve_forever()
 
 async def main():
     load_dotenv()
+    args = parse_args()
     
     print("--- [Main] Starting Local Football Podcast Agent (LangGraph Class-Based) ---")
+
+    if args.serve:
+        await run_server(args)
+        return
+
+    if args.date_from:
+        await run_backfill(args)
+        return
+
+    if args.leagues:
+        await run_leagues(args)
+        return
+
+    if args.live:
+        await run_live(args)
+        return
     
-    # Check if a query was provided, otherwise use default
-    query = "Today's football highlights"
-    if len(sys.argv) > 1:
-        query = sys.argv[1]
+    query = args.query
     
     print(f"--- [Main] Query: {query} ---")
     
     # Initialize the Agent
-    agent = FootballPodcastAgent()
+    # Checkpointing is only needed to resume: on with --resume/--run-id, or PIPELINE_CHECKPOINT_DB
+    checkpoint_path = os.getenv("PIPELINE_CHECKPOINT_DB") or None
+    if checkpoint_path is None and (args.resume or args.run_id):
+        checkpoint_path = PIPELINE_CHECKPOINT_DB
+    agent = FootballPodcastAgent(warmup_tts=args.warmup or None, warmup_synthesis=args.warmup_synthesis or None,
+                                 checkpoint_path=checkpoint_path, languages=args.languages)
     
     # Run the Agent
-    final_state = await agent.run(query)
+    final_state = await agent.run(query, run_id=args.run_id, resume=args.resume)
     
     print("\n--- [Main] Execution Complete ---")
+
+    if args.timings:
+        print("\n--- [Main] Per-stage breakdown ---")
+        print(agent.tracer.format_breakdown())
+    if args.metrics_out:
+        if args.metrics_out.endswith(".prom"):
+            agent.tracer.write_prometheus(args.metrics_out)
+        else:
+            agent.tracer.write_jsonl(args.metrics_out)
+        print(f"--- [Main] Metrics written to {args.metrics_out} ---")
     
     if final_state.get("errors"):
         print("Errors encountered:")
@@ -42,6 +181,11 @@ async def main():
 
     if final_state.get("audio_path"):
         print(f"Success! Podcast audio generated at: {final_state['audio_path']}")
+        for language, path in (final_state.get("audio_paths") or {}).items():
+            print(f"  [{language}] {path}")
+        from modules.tts import TTSManager
+        if TTSManager.metrics:
+            print("TTS model timings: " + ", ".join(f"{k}={v:.2f}s" for k, v in TTSManager.metrics.items()))
     else:
         print("\nFailed to generate podcast audio.")
 
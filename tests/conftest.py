@@ -0,0 +1,13 @@
+import pytest
+
+import modules.tools as tools
+
+
+@pytest.fixture(autouse=True)
+def isolated_response_cache(tmp_path, monkeypatch):
+    """Points the Football-Data response cache at a per-test directory."""
+    monkeypatch.setenv("FOOTBALL_DATA_CACHE_DIR", str(tmp_path / "football_data_cache"))
+    monkeypatch.setattr(tools, "_response_cache", None)
+    # A fresh Football-Data rate limiter per test, so quotas do not carry over
+    monkeypatch.setattr(tools, "_football_data_client", None)
+    yield
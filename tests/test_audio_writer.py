@@ -0,0 +1,159 @@
+import os
+import sys
+import json
+import stat
+import wave
+import subprocess
+import numpy as np
+import pytest
+from modules.audio_writer import (
+    AudioWriter,
+    LoudnessNormalizer,
+    WavAudioWriter,
+    available_formats,
+    open_audio_writer,
+    to_pcm16,
+)
+
+
+def speech_like(rate, seconds, amplitude, seed=0):
+    """Noise bursts with pauses: 0.8s of sound, 0.4s of silence."""
+    rng = np.random.default_rng(seed)
+    samples = (rng.standard_normal(int(rate * seconds)) * amplitude).astype(np.float32)
+    t = np.arange(len(samples)) / rate
+    samples[(t % 1.2) >= 0.8] = 0.0
+    return samples
+
+
+def gated_loudness_db(samples, rate, block_ms=100):
+    block = int(rate * block_ms / 1000)
+    blocks = samples[: len(samples) - len(samples) % block].reshape(-1, block)
+    energies = np.mean(np.square(blocks.astype(np.float64)), axis=1)
+    energies = energies[energies > 1e-7]
+    return 10 * np.log10(np.mean(energies))
+
+
+def test_wav_writer_streams_chunks(tmp_path):
+    samples = speech_like(8000, 2.0, 0.1)
+    path = str(tmp_path / "out.wav")
+    with open_audio_writer(path, 8000) as writer:
+        assert isinstance(writer, WavAudioWriter)
+        for i in range(0, len(samples), 777):
+            writer.write(samples[i:i + 777])
+        assert writer.seconds_written == pytest.approx(2.0)
+    with wave.open(path, "rb") as wf:
+        assert wf.getframerate() == 8000
+        assert wf.readframes(wf.getnframes()) == to_pcm16(samples)
+
+    assert "wav" in available_formats()
+    with pytest.raises(ValueError):
+        open_audio_writer(str(tmp_path / "out.aac"), 8000)
+    # The base class has no encoder of its own
+    with pytest.raises(TypeError):
+        AudioWriter(path, 8000)
+
+
+def test_loudness_normalizer_reaches_target_and_is_chunking_invariant():
+    rate = 8000
+    quiet = speech_like(rate, 20.0, 0.02)
+
+    def normalize(chunk):
+        normalizer = LoudnessNormalizer(rate, target_db=-16.0)
+        out = [normalizer.process(quiet[i:i + chunk]) for i in range(0, len(quiet), chunk)]
+        return np.concatenate(out + [normalizer.flush()])
+
+    out = normalize(1000)
+    assert len(out) == len(quiet)
+    assert np.array_equal(out, normalize(3333))
+    # Loudness lands on the target once the window has filled; pauses stay silent, peaks stay under -1 dBFS
+    assert gated_loudness_db(quiet, rate) == pytest.approx(-34.0, abs=1.0)
+    assert gated_loudness_db(out[rate * 3:], rate) == pytest.approx(-16.0, abs=1.0)
+    assert np.all(out[quiet == 0.0] == 0.0)
+    assert np.max(np.abs(out)) <= 10 ** (-1 / 20) + 1e-6
+
+    # A loud signal is limited, not clipped into distortion
+    loud = LoudnessNormalizer(rate, target_db=-3.0)
+    limited = np.concatenate([loud.process(speech_like(rate, 5.0, 0.5)), loud.flush()])
+    assert np.max(np.abs(limited)) <= 10 ** (-1 / 20) + 1e-6
+
+
+def write_fake_encoder(tmp_path, exit_code=0):
+    """An ``ffmpeg`` stand-in recording its arguments and copying stdin to the output path."""
+    script = tmp_path / "fake-ffmpeg"
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import sys, json\n"
+        f"json.dump(sys.argv[1:], open({str(tmp_path / 'argv.json')!r}, 'w'))\n"
+        "data = sys.stdin.buffer.read()\n"
+        f"if {exit_code}:\n"
+        "    sys.stderr.write('Unknown encoder libopus')\n"
+        f"    sys.exit({exit_code})\n"
+        "open(sys.argv[-1], 'wb').write(data)\n"
+    )
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return str(script)
+
+
+def test_ffmpeg_writer_pipes_pcm_to_encoder(tmp_path, monkeypatch):
+    monkeypatch.setenv("FFMPEG_BINARY", write_fake_encoder(tmp_path))
+    samples = speech_like(24000, 1.0, 0.1)
+    path = str(tmp_path / "episode.opus")
+    with open_audio_writer(path, 24000) as writer:
+        writer.write(samples[:10000])
+        writer.write(samples[10000:])
+
+    assert open(path, "rb").read() == to_pcm16(samples)
+    argv = json.load(open(tmp_path / "argv.json"))
+    assert argv[argv.index("-ar") + 1] == "24000"
+    assert argv[argv.index("-c:a") + 1] == "libopus"
+    assert argv[argv.index("-b:a") + 1] == "48k"
+    assert {"opus", "mp3"} <= set(available_formats())
+
+
+def test_ffmpeg_writer_reports_encoder_errors(tmp_path, monkeypatch):
+    monkeypatch.setenv("FFMPEG_BINARY", write_fake_encoder(tmp_path, exit_code=1))
+    writer = open_audio_writer(str(tmp_path / "episode.opus"), 24000)
+    writer.write(np.zeros(100, dtype=np.float32))
+    with pytest.raises(RuntimeError, match="Unknown encoder"):
+        writer.close()
+
+    monkeypatch.setenv("FFMPEG_BINARY", "no-such-encoder")
+    with pytest.raises(RuntimeError, match="install ffmpeg"):
+        open_audio_writer(str(tmp_path / "episode.mp3"), 24000)
+
+
+_BENCHMARK = """
+import json, sys, time
+import numpy as np
+from modules.audio_writer import open_audio_writer
+from modules.instrumentation import _peak_rss_kb
+
+minutes, path = float(sys.argv[1]), sys.argv[2]
+rate = 24000
+chunk = np.random.default_rng(0).standard_normal(rate).astype(np.float32) * 0.05
+baseline = _peak_rss_kb()
+start = time.perf_counter()
+with open_audio_writer(path, rate, loudness_target=-16.0) as writer:
+    for _ in range(int(minutes * 60)):
+        writer.write(chunk)
+elapsed = time.perf_counter() - start
+print(json.dumps({"rss_growth_kb": _peak_rss_kb() - baseline, "realtime_factor": minutes * 60 / elapsed}))
+"""
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="peak RSS is not available on Windows")
+def test_benchmark_encode_peak_rss_is_independent_of_episode_length(tmp_path):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def run(minutes):
+        out = subprocess.run([sys.executable, "-c", _BENCHMARK, str(minutes), str(tmp_path / f"{minutes}.wav")],
+                             cwd=root, capture_output=True, text=True, check=True)
+        return json.loads(out.stdout)
+
+    short, long = run(1), run(10)
+    print(f"\nNormalized WAV encode: 1 min +{short['rss_growth_kb']} KB peak RSS "
+          f"({short['realtime_factor']:.0f}x realtime), 10 min +{long['rss_growth_kb']} KB "
+          f"({long['realtime_factor']:.0f}x realtime)")
+    # Buffering the 10 minute episode would take ~55 MB of float32 samples
+    assert long["rss_growth_kb"] - short["rss_growth_kb"] < 8 * 1024
+    assert os.path.getsize(tmp_path / "10.wav") > 10 * 60 * 24000 * 2
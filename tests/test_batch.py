@@ -0,0 +1,231 @@
+import asyncio
+import json
+import time
+import threading
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import patch
+from modules.batch import BackfillManifest, BackfillRunner, LeagueShardRunner, date_range, fetch_windows
+from modules.langgraph_agent import FootballPodcastAgent
+from modules.tools import partition_matches_by_competition, partition_matches_by_day
+
+
+def match(day, home, away):
+    return {"utcDate": f"{day}T15:00:00Z", "homeTeam": {"name": home}, "awayTeam": {"name": away},
+            "score": {"fullTime": {"home": 1, "away": 0}}}
+
+
+RANGE_RESPONSE = {"matches": [
+    match("2024-05-18", "Arsenal", "Chelsea"),
+    match("2024-05-18", "Leeds", "Everton"),
+    match("2024-05-20", "Spurs", "Fulham"),
+]}
+
+
+class FakeDDGS:
+    def news(self, query, max_results=3):
+        return []
+
+    def text(self, query, max_results=3):
+        return []
+
+
+class FakeLLM:
+    def invoke(self, messages):
+        return SimpleNamespace(content="<script>Episode.</script>", usage_metadata=None)
+
+
+class TrackingTTS:
+    """Stands in for local_text_to_speech and records how many syntheses overlap."""
+
+    def __init__(self, fail_on=None):
+        self.active = 0
+        self.max_active = 0
+        self.paths = []
+        self.fail_on = fail_on
+
+    async def __call__(self, text, file_name=None, **kwargs):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.02)
+        self.active -= 1
+        if self.fail_on and self.fail_on in file_name:
+            raise RuntimeError("TTS crashed")
+        self.paths.append(file_name)
+        return file_name
+
+
+def make_agent():
+    with patch("langchain_openai.ChatOpenAI"):
+        agent = FootballPodcastAgent(tts_concurrency=1)
+    agent.llm = FakeLLM()
+    return agent
+
+
+def test_date_range_and_partition():
+    assert date_range("2024-05-30", "2024-06-01") == ["2024-05-30", "2024-05-31", "2024-06-01"]
+    days = partition_matches_by_day(RANGE_RESPONSE)
+    assert sorted(days) == ["2024-05-18", "2024-05-20"]
+    assert len(days["2024-05-18"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_backfill_single_fetch_serialized_tts_and_resume(tmp_path):
+    manifest_path = str(tmp_path / "manifest.json")
+    output_dir = str(tmp_path / "out")
+    agent = make_agent()
+    tts = TrackingTTS(fail_on="2024-05-20")
+
+    with patch("modules.batch.get_matches_by_range", return_value=RANGE_RESPONSE) as mock_range, \
+         patch("modules.langgraph_agent.get_matches_by_date") as mock_by_date, \
+         patch("duckduckgo_search.DDGS", FakeDDGS), \
+         patch("modules.tts.TTSManager.start_warmup"), \
+         patch("modules.langgraph_agent.local_text_to_speech", tts):
+        runner = BackfillRunner(agent, competitions=["PL"], max_concurrency=3,
+                                manifest_path=manifest_path, output_dir=output_dir)
+        episodes = await runner.run("2024-05-18", "2024-05-20")
+
+    # One range request, partitioned per day; the agent never refetches
+    mock_range.assert_called_once_with("2024-05-18", "2024-05-20", ["PL"])
+    mock_by_date.assert_not_called()
+    assert tts.max_active == 1
+    assert episodes["2024-05-18"]["status"] == "done"
+    assert episodes["2024-05-18"]["audio_path"].endswith("podcast_2024-05-18.wav")
+    assert episodes["2024-05-19"]["status"] == "no_matches"
+    assert episodes["2024-05-20"]["status"] == "failed"
+    assert json.load(open(manifest_path))["episodes"]["2024-05-20"]["status"] == "failed"
+
+    # Resuming only regenerates the failed day and fetches only its range
+    tts = TrackingTTS()
+    with patch("modules.batch.get_matches_by_range", return_value=RANGE_RESPONSE) as mock_range, \
+         patch("duckduckgo_search.DDGS", FakeDDGS), \
+         patch("modules.tts.TTSManager.start_warmup"), \
+         patch("modules.langgraph_agent.local_text_to_speech", tts):
+        runner = BackfillRunner(agent, competitions=["PL"], manifest_path=manifest_path, output_dir=output_dir)
+        episodes = await runner.run("2024-05-18", "2024-05-20")
+
+    mock_range.assert_called_once_with("2024-05-20", "2024-05-20", ["PL"])
+    assert [p.rsplit("/", 1)[-1] for p in tts.paths] == ["podcast_2024-05-20.wav"]
+    assert all(e["status"] in ("done", "no_matches") for e in episodes.values())
+
+
+def test_fetch_windows_cover_only_pending_days_within_the_range_limit():
+    assert fetch_windows(date_range("2024-05-01", "2024-05-10")) == [("2024-05-01", "2024-05-10")]
+    assert fetch_windows(date_range("2024-05-01", "2024-05-11")) == [("2024-05-01", "2024-05-10"),
+                                                                   ("2024-05-11", "2024-05-11")]
+    assert fetch_windows(["2024-05-01", "2024-05-02", "2024-05-05"], max_days=3) == [
+        ("2024-05-01", "2024-05-02"), ("2024-05-05", "2024-05-05")]
+    assert fetch_windows([]) == []
+
+
+@pytest.mark.asyncio
+async def test_backfill_longer_than_one_range_request(tmp_path):
+    manifest_path = str(tmp_path / "manifest.json")
+    # A day finished by an earlier run splits the range and is not fetched again
+    BackfillManifest(manifest_path, ["PL"]).update("2024-05-03", status="done", audio_path="old.wav")
+    response = {"matches": [match("2024-05-01", "Arsenal", "Chelsea"), match("2024-05-12", "Leeds", "Everton"),
+                            match("2024-05-14", "Spurs", "Fulham")]}
+    calls = []
+
+    def get_matches_by_range(date_from, date_to, competitions):
+        calls.append((date_from, date_to))
+        if (datetime.strptime(date_to, "%Y-%m-%d") - datetime.strptime(date_from, "%Y-%m-%d")).days >= 10:
+            return {"error": "The date range is too long"}
+        return {"matches": [m for m in response["matches"] if date_from <= m["utcDate"][:10] <= date_to]}
+
+    tts = TrackingTTS()
+    with patch("modules.batch.get_matches_by_range", get_matches_by_range), \
+         patch("duckduckgo_search.DDGS", FakeDDGS), \
+         patch("modules.tts.TTSManager.start_warmup"), \
+         patch("modules.langgraph_agent.local_text_to_speech", tts):
+        runner = BackfillRunner(make_agent(), competitions=["PL"], manifest_path=manifest_path,
+                                output_dir=str(tmp_path / "out"))
+        episodes = await runner.run("2024-05-01", "2024-05-14")
+
+    assert sorted(calls) == [("2024-05-01", "2024-05-02"), ("2024-05-04", "2024-05-13"), ("2024-05-14", "2024-05-14")]
+    assert sorted(day for day, e in episodes.items() if e["status"] == "done") == ["2024-05-01", "2024-05-03",
+                                                                                  "2024-05-12", "2024-05-14"]
+    assert all(e["status"] == "no_matches" for day, e in episodes.items()
+               if day not in ("2024-05-01", "2024-05-03", "2024-05-12", "2024-05-14"))
+    assert len(tts.paths) == 3
+
+
+def test_manifest_rejects_other_competitions(tmp_path):
+    manifest_path = str(tmp_path / "manifest.json")
+    runner = BackfillRunner(make_agent(), competitions=["PL"], manifest_path=manifest_path)
+    runner.manifest.update("2024-05-18", status="done")
+    with pytest.raises(ValueError):
+        BackfillRunner(make_agent(), competitions=["PD"], manifest_path=manifest_path)
+
+
+def league_match(code, home, away):
+    return {"utcDate": "2024-05-18T15:00:00Z", "competition": {"code": code, "name": "?"},
+            "homeTeam": {"name": home}, "awayTeam": {"name": away}, "score": {"fullTime": {"home": 2, "away": 2}}}
+
+
+LEAGUES_RESPONSE = {"matches": [
+    league_match("PL", "Arsenal", "Chelsea"),
+    league_match("PL", "Leeds", "Everton"),
+    league_match("PD", "Sevilla", "Betis"),
+    {**league_match(None, "Inter", "Milan"), "competition": {"name": "Serie A"}},
+]}
+
+
+class ConcurrencyTrackingLLM:
+    """Fake LLM whose latency depends on the league in the prompt; records overlapping calls."""
+
+    def __init__(self, latencies):
+        self.latencies = latencies
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def invoke(self, messages):
+        prompt = messages[-1].content
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(next((delay for team, delay in self.latencies.items() if team in prompt), 0.05))
+        with self.lock:
+            self.active -= 1
+        return SimpleNamespace(content="<script>League episode.</script>", usage_metadata=None)
+
+
+def test_partition_matches_by_competition():
+    leagues = partition_matches_by_competition(LEAGUES_RESPONSE)
+    assert {code: len(matches) for code, matches in leagues.items()} == {"PL": 2, "PD": 1, "SA": 1}
+
+
+@pytest.mark.asyncio
+async def test_league_shards_share_one_fetch_llm_limit_and_tts_queue(tmp_path):
+    with patch("langchain_openai.ChatOpenAI"):
+        agent = FootballPodcastAgent(tts_concurrency=1, llm_concurrency=2)
+    agent.llm = ConcurrencyTrackingLLM({"Arsenal": 0.4})
+    tts = TrackingTTS()
+    published = []
+
+    with patch("modules.batch.get_matches_by_date", return_value=LEAGUES_RESPONSE) as mock_fetch, \
+         patch("modules.langgraph_agent.get_matches_by_date") as mock_by_date, \
+         patch("duckduckgo_search.DDGS", FakeDDGS), \
+         patch("modules.tts.TTSManager.start_warmup"), \
+         patch("modules.langgraph_agent.local_text_to_speech", tts):
+        runner = LeagueShardRunner(agent, competitions=["PL", "PD", "SA", "BL1"], output_dir=str(tmp_path),
+                                   on_episode=lambda episode: published.append(episode.competition))
+        report = await runner.run("2024-05-18")
+
+    # One combined fetch, split per league; the agent never refetches
+    mock_fetch.assert_called_once_with("2024-05-18", ["PL", "PD", "SA", "BL1"])
+    mock_by_date.assert_not_called()
+    # Leagues share the LLM limit (saturated, never exceeded) and queue for one TTS model
+    assert agent.llm.max_active == 2
+    assert tts.max_active == 1
+    # Episodes are published as leagues finish: the empty league at once, the slow one last
+    assert published[0] == "BL1" and published[-1] == "PL"
+    episodes = {episode.competition: episode for episode in report.episodes}
+    assert episodes["BL1"].status == "no_matches"
+    assert episodes["SA"].audio_path.endswith("podcast_2024-05-18_SA.wav")
+    assert report.episodes_done == 3
+    assert episodes["PL"].latency > episodes["PD"].latency
+    assert report.episodes_per_hour > 0
+    assert "episodes/hour" in report.format()
@@ -0,0 +1,91 @@
+import pytest
+from benchmarks.pipeline import BenchmarkConfig, compare, percentile, run_benchmarks
+import numpy as np
+from benchmarks.stubs import StubFootballDataServer, TinyTTSModel
+from benchmarks.tts_batch import run_benchmark
+from benchmarks.tts_pool import run_benchmark as run_pool_benchmark
+from benchmarks.voice_conditioning import run_benchmark as run_voice_benchmark
+from modules.tools import get_matches_by_date
+from modules.tts import TTSManager
+
+
+def test_percentile_interpolates():
+    assert percentile([], 50) == 0.0
+    assert percentile([3.0, 1.0, 2.0], 50) == 2.0
+    assert percentile([1.0, 2.0], 90) == pytest.approx(1.9)
+
+
+def test_stub_football_data_server_speaks_the_api(monkeypatch):
+    with StubFootballDataServer(matches=4, latency=0) as server:
+        monkeypatch.setenv("FOOTBALL_DATA_BASE_URL", f"{server.url}/v4")
+        monkeypatch.setenv("FOOTBALL_DATA_API_KEY", "test")
+        monkeypatch.setenv("FOOTBALL_DATA_CACHE", "0")
+        data = get_matches_by_date("2025-05-18", ["PL"])
+
+    assert len(data["matches"]) == 4
+    assert data["matches"][0]["homeTeam"]["name"] == "Home Club 0"
+    assert server.requests == 1
+
+
+def test_benchmark_runs_the_pipeline_end_to_end():
+    model = TTSManager._model
+    config = BenchmarkConfig(sizes=[0, 3], iterations=2, warmup=0, tokens_per_second=5000,
+                             search_latency=0, fetch_latency=0, tts_real_time_factor=0)
+
+    report = run_benchmarks(config)
+
+    assert TTSManager._model is model
+    assert set(report["results"]) == {"0", "3"}
+    result = report["results"]["3"]
+    assert result["iterations"] == 2
+    assert {"fetch_matches", "search_news", "build_context", "generate_script", "tts"} <= set(result["stages"])
+    assert result["total"]["p50"] <= result["total"]["p99"]
+    assert result["counters"]["search_calls"] >= 3
+    assert result["throughput"]["audio_seconds_per_second"] > 0
+    assert result["memory"]["traced_peak_mb"] > 0
+
+    # The same report compared with itself has no regressions; a slower one does
+    lines, regressions = compare(report, report, max_regression=10)
+    assert lines and not regressions
+    slower = {"results": {"3": {**result, "total": {**result["total"], "p50": result["total"]["p50"] + 1}}}}
+    _, regressions = compare(slower, report, max_regression=10)
+    assert len(regressions) == 1 and "total" in regressions[0]
+
+
+
+def test_tiny_tts_model_batches_match_single_calls():
+    model = TinyTTSModel()
+    texts = ["Arsenal 2, Chelsea 1.", "Next up."]
+    batched = model.generate_batch(texts)
+    for text, samples in zip(texts, batched):
+        assert np.allclose(samples, model.generate(text), atol=1e-5)
+
+
+def test_tts_batch_benchmark_reports_every_mode():
+    model = TTSManager._model
+    report = run_benchmark(segments=12, batch_size=4, repeat=1)
+
+    assert TTSManager._model is model
+    assert set(report["results"]) == {"per_call", "one_pass", "batched"}
+    assert all(result["texts_per_second"] > 0 for result in report["results"].values())
+    assert report["speedup"] > 0
+
+
+def test_tts_pool_benchmark_reports_scaling():
+    report = run_pool_benchmark(segments=4, max_workers=2, work_per_char=20)
+
+    assert set(report["results"]) == {"threads", "processes"}
+    for runs in report["results"].values():
+        assert set(runs) == {"1", "2"}
+        assert runs["1"]["speedup"] == 1.0
+        assert all(run["audio_seconds_per_second"] > 0 for run in runs.values())
+
+
+def test_voice_conditioning_benchmark_compares_cold_and_cached():
+    model = TTSManager._model
+    report = run_voice_benchmark(sentences=2, repeat=1, encoder_passes=1, clip_seconds=1.0)
+
+    assert TTSManager._model is model
+    assert set(report["conditioning_seconds"]) == {"cold", "disk", "memory"}
+    assert set(report["synthesis_seconds"]) == {"audio_prompt_per_call", "registered_voice"}
+    assert report["disk_speedup"] > 0 and report["synthesis_speedup"] > 0
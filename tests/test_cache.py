@@ -0,0 +1,141 @@
+import numpy as np
+import pytest
+import time
+import threading
+from modules.cache import AudioCache, DiskCache, LLMResponseCache, VoiceConditioningCache
+
+
+def test_disk_cache_lru_eviction_and_persistence(tmp_path):
+    cache = DiskCache(str(tmp_path), max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" becomes most recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.stats()["evictions"] == 1
+
+    reopened = DiskCache(str(tmp_path), max_entries=2)
+    assert reopened.get("a") == 1
+    assert reopened.get("c") == 3
+    assert len(reopened) == 2
+
+
+def test_disk_cache_ttl_expiry(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    cache.set("stale", {"x": 1}, ttl=-1)
+    cache.set("forever", {"x": 2}, ttl=None)
+    assert cache.get("stale") is None
+    assert cache.lookup("stale")["value"] == {"x": 1}
+    assert cache.get("forever") == {"x": 2}
+
+
+def test_audio_cache_key_covers_text_model_voice_and_rate():
+    base = AudioCache.key("Welcome back!", "chatterbox", "default", 24000)
+    assert AudioCache.key("  Welcome   back! ", "chatterbox", "default", 24000) == base
+    assert AudioCache.key("Welcome back!", "other-model", "default", 24000) != base
+    assert AudioCache.key("Welcome back!", "chatterbox", "host_b", 24000) != base
+    assert AudioCache.key("Welcome back!", "chatterbox", "default", 16000) != base
+
+
+def test_voice_conditioning_cache_key_covers_clip_model_and_version(tmp_path):
+    clip = tmp_path / "host.wav"
+    clip.write_bytes(b"RIFF one")
+    base = VoiceConditioningCache.key(str(clip), "chatterbox", "0.1.2")
+    assert VoiceConditioningCache.key(str(clip), "chatterbox", "0.1.3") != base
+    assert VoiceConditioningCache.key(str(clip), "other-model", "0.1.2") != base
+    clip.write_bytes(b"RIFF two")
+    assert VoiceConditioningCache.key(str(clip), "chatterbox", "0.1.2") != base
+
+    cache = VoiceConditioningCache(str(tmp_path / "voices"))
+    cache.put(base, {"t3/speaker_emb": np.ones((1, 4), dtype=np.float32), "gen/tokens": np.arange(3)})
+    arrays = VoiceConditioningCache(str(tmp_path / "voices")).get(base)
+    assert np.array_equal(arrays["t3/speaker_emb"], np.ones((1, 4)))
+    assert arrays["gen/tokens"].dtype == np.arange(3).dtype
+    assert cache.get("missing") is None and len(cache) == 1
+
+
+def test_audio_cache_hit_is_memory_mapped(tmp_path):
+    cache = AudioCache(str(tmp_path))
+    samples = np.linspace(-1, 1, 1000, dtype=np.float32)
+    cache.put("abc", samples)
+
+    hit = cache.get("abc")
+    assert isinstance(hit, np.memmap)
+    assert np.array_equal(hit, samples)
+    assert cache.get("missing") is None
+    assert cache.stats()["hit_rate"] == pytest.approx(0.5)
+
+
+def test_audio_cache_evicts_least_recently_used_by_size(tmp_path):
+    segment = np.zeros(1000, dtype=np.float32)  # ~4 KB on disk
+    cache = AudioCache(str(tmp_path), max_bytes=10_000)
+    cache.put("a", segment)
+    cache.put("b", segment)
+    cache.get("a")
+    cache.put("c", segment)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= 10_000
+
+    reopened = AudioCache(str(tmp_path), max_bytes=10_000)
+    assert len(reopened) == 2
+
+
+def test_llm_cache_key_covers_model_endpoint_messages_and_params():
+    messages = [("system", "You write podcasts."), ("human", "Summarize Arsenal 2-1 Chelsea.")]
+    base = LLMResponseCache.key("qwen3:0.6b", "http://localhost:11434/v1", messages, {"temperature": 0.7})
+    assert base == LLMResponseCache.key("qwen3:0.6b", "http://localhost:11434/v1", list(messages), {"temperature": 0.7})
+    assert base != LLMResponseCache.key("qwen3:4b", "http://localhost:11434/v1", messages, {"temperature": 0.7})
+    assert base != LLMResponseCache.key("qwen3:0.6b", "http://gpu-box:11434/v1", messages, {"temperature": 0.7})
+    assert base != LLMResponseCache.key("qwen3:0.6b", "http://localhost:11434/v1", messages[:1], {"temperature": 0.7})
+    assert base != LLMResponseCache.key("qwen3:0.6b", "http://localhost:11434/v1", messages, {"temperature": 0.0})
+
+
+def test_llm_cache_ttl_and_persistence(tmp_path):
+    cache = LLMResponseCache(str(tmp_path), ttl=None)
+    assert cache.get_or_compute("k", lambda: "<script>Hi</script>") == ("<script>Hi</script>", "miss")
+    assert LLMResponseCache(str(tmp_path)).get_or_compute("k", lambda: "other") == ("<script>Hi</script>", "hit")
+
+    expiring = LLMResponseCache(str(tmp_path / "ttl"), ttl=-1)
+    expiring.get_or_compute("k", lambda: "first")
+    assert expiring.get_or_compute("k", lambda: "second") == ("second", "miss")
+
+
+def test_llm_cache_coalesces_concurrent_identical_requests(tmp_path):
+    cache = LLMResponseCache(str(tmp_path))
+    calls = []
+    release = threading.Event()
+
+    def slow_completion():
+        calls.append(1)
+        release.wait(timeout=5)
+        return "<script>Shared</script>"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", slow_completion)))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    while cache.coalesced < 3:
+        time.sleep(0.005)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted(source for _, source in results) == ["coalesced"] * 3 + ["miss"]
+    assert {content for content, _ in results} == {"<script>Shared</script>"}
+
+
+def test_llm_cache_does_not_store_failures(tmp_path):
+    cache = LLMResponseCache(str(tmp_path))
+
+    def failing():
+        raise ConnectionError("ollama is down")
+
+    with pytest.raises(ConnectionError):
+        cache.get_or_compute("k", failing)
+    assert cache.get_or_compute("k", lambda: "ok") == ("ok", "miss")
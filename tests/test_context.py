@@ -0,0 +1,65 @@
+from modules.context import ContextBuilder, MinHasher, estimate_tokens, shingles
+from modules.models import Match
+
+ARSENAL = Match(home="Arsenal", away="Chelsea", home_score=2, away_score=1)
+LEEDS = Match(home="Leeds United", away="Everton", home_score=0, away_score=0)
+
+SYNDICATED = "- Weekend round-up: Arsenal beat Chelsea 2-1 while Leeds United and Everton drew 0-0 at Elland Road"
+
+
+def test_minhash_is_deterministic_and_estimates_similarity():
+    a = shingles("Arsenal beat Chelsea two one in a tense London derby on Saturday evening")
+    b = shingles("Arsenal beat Chelsea two one in a tense London derby on Saturday night")
+    c = shingles("Everton sign a new goalkeeper from the Championship")
+    first, second = MinHasher(), MinHasher()
+    assert first.signature(a) == second.signature(a)
+    assert MinHasher.similarity(first.signature(a), first.signature(b)) > 0.6
+    assert MinHasher.similarity(first.signature(a), first.signature(c)) < 0.2
+
+
+def test_relevance_prefers_snippets_about_the_match():
+    on_topic = "- Arsenal edge Chelsea: Saka scored twice"
+    half = "- Chelsea injury update: James out for a month"
+    off_topic = "- Transfer rumours: midfielder linked with Spain"
+    scores = [ContextBuilder.relevance(s, ARSENAL) for s in (on_topic, half, off_topic)]
+    assert scores[0] > scores[1] > scores[2]
+
+
+def test_build_removes_duplicates_across_matches_and_reports_savings():
+    snippets = [
+        ["- Chelsea injury update: James out for a month", "- Arsenal edge Chelsea: Saka scored twice", SYNDICATED],
+        [SYNDICATED.replace("Weekend round-up", "Round-up"), "- Leeds United hold Everton: Goalless at Elland Road"],
+    ]
+    result = ContextBuilder(token_budget=1000).build([ARSENAL, LEEDS], snippets)
+
+    assert result.duplicates_removed == 1
+    # The copy ranked higher (first for Leeds, second for Arsenal) is the one kept
+    assert "Weekend round-up" not in result.text
+    assert result.text.count("Round-up:") == 1
+    # Most relevant snippet first, under its match
+    lines = result.text.splitlines()
+    assert lines[:3] == [ARSENAL.summary, "Latest news around Arsenal vs Chelsea:", "- Arsenal edge Chelsea: Saka scored twice"]
+    assert LEEDS.summary in lines
+    assert result.tokens_saved == result.tokens_before - result.tokens > 0
+    assert result.tokens == estimate_tokens(result.text)
+
+
+def test_budget_is_shared_fairly_between_matches():
+    busy = [f"- Arsenal story {i}: " + " ".join(f"word{i}x{j}" for j in range(30)) for i in range(10)]
+    quiet = ["- Leeds United hold Everton: Goalless at Elland Road"]
+    builder = ContextBuilder(token_budget=200)
+    result = builder.build([ARSENAL, LEEDS], [busy, quiet])
+
+    assert result.tokens <= 200
+    assert "Goalless at Elland Road" in result.text
+    assert result.snippets_dropped > 0
+    # Same inputs, same output
+    assert builder.build([ARSENAL, LEEDS], [busy, quiet]) == result
+
+
+def test_summaries_are_cut_when_they_alone_exceed_the_budget():
+    matches = [Match(home=f"Home {i}", away=f"Away {i}", home_score=1, away_score=0) for i in range(20)]
+    result = ContextBuilder(token_budget=50).build(matches, [[] for _ in matches])
+    assert result.tokens <= 50
+    assert result.text.startswith(matches[0].summary)
+    assert matches[-1].summary not in result.text
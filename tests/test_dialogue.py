@@ -0,0 +1,108 @@
+import time
+import wave
+import numpy as np
+import pytest
+from unittest.mock import patch
+from modules.dialogue import Turn, dialogue_instructions, parse_dialogue
+from modules.langgraph_agent import FootballPodcastAgent
+from modules.tts import TTSManager
+
+
+class StubVoiceModel:
+    """CPU stand-in for ChatterboxTTS whose output amplitude identifies the conditioned voice."""
+    sr = 1000
+    conditioning_calls = []
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.level = 0.1  # built-in voice
+
+    def prepare_conditionals(self, wav_fpath):
+        StubVoiceModel.conditioning_calls.append(wav_fpath)
+        self.level = {"alex.wav": 0.3, "sam.wav": 0.6}[wav_fpath]
+
+    def generate(self, text):
+        time.sleep(self.latency)
+        return np.full((1, len(text) * 10), self.level, dtype=np.float32)
+
+
+@pytest.fixture
+def stub_voice_model(monkeypatch):
+    StubVoiceModel.conditioning_calls = []
+    model = StubVoiceModel(latency=0.05)
+    monkeypatch.setattr(TTSManager, "_model", model)
+    monkeypatch.setattr(TTSManager, "_warmup_future", None)
+    monkeypatch.setattr(TTSManager, "_voices", {})
+    monkeypatch.delenv("TTS_AUDIO_CACHE_DIR", raising=False)
+    return model
+
+
+def read_levels(path):
+    """Returns (level, length) runs of the WAV's samples, gaps included as level 0."""
+    with wave.open(path, "rb") as wf:
+        samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype="<i2").astype(np.float32) / 32767.0
+    runs = []
+    for value in np.round(samples, 1):
+        if runs and runs[-1][0] == value:
+            runs[-1][1] += 1
+        else:
+            runs.append([value, 1])
+    return [(level, length) for level, length in runs]
+
+
+def test_parse_dialogue_tags_continuations_and_merging():
+    script = """**Alex:** Welcome back to the show!
+It was a big weekend.
+SAM: It really was.
+[Sam]: Arsenal won again.
+Alex: They did."""
+    assert parse_dialogue(script) == [
+        Turn("Alex", "Welcome back to the show! It was a big weekend."),
+        Turn("Sam", "It really was. Arsenal won again."),
+        Turn("Alex", "They did."),
+    ]
+    assert parse_dialogue("No tags at all.") == [Turn("Alex", "No tags at all.")]
+    assert "Alex: ..." in dialogue_instructions()
+
+
+@pytest.mark.asyncio
+async def test_dialogue_synthesis_conditions_once_runs_speakers_in_parallel(stub_voice_model, tmp_path):
+    turns = [Turn("Alex" if i % 2 == 0 else "Sam", "x" * (10 + i)) for i in range(6)]
+    voices = {"Alex": "alex.wav", "Sam": "sam.wav"}
+
+    start = time.perf_counter()
+    path = await TTSManager.generate_dialogue(turns, voices=voices, file_name=str(tmp_path / "a.wav"),
+                                              gap_ms=20, crossfade_ms=0)
+    elapsed = time.perf_counter() - start
+    await TTSManager.generate_dialogue(turns, voices=voices, file_name=str(tmp_path / "b.wav"))
+
+    # Each reference clip is embedded once, then reused across turns and episodes
+    assert sorted(StubVoiceModel.conditioning_calls) == ["alex.wav", "sam.wav"]
+    # Turns come out in script order, in the right voice, separated by 20 ms gaps
+    speech = [run for run in read_levels(path) if run[0] != 0.0]
+    gaps = [run for run in read_levels(path) if run[0] == 0.0]
+    assert speech == [(0.3 if t.speaker == "Alex" else 0.6, len(t.text) * 10) for t in turns]
+    assert gaps == [(0.0, 20)] * 5
+    # Two speakers synthesize concurrently: ~3 turn latencies instead of 6
+    assert elapsed < 6 * stub_voice_model.latency * 0.8
+
+    stats = TTSManager.last_speaker_stats
+    assert {speaker: s.turns for speaker, s in stats.items()} == {"Alex": 3, "Sam": 3}
+    assert all(s.audio_seconds_per_second > 0 for s in stats.values())
+
+
+@pytest.mark.asyncio
+async def test_agent_dialogue_mode_prompts_for_turns_and_renders_them(tmp_path):
+    with patch("langchain_openai.ChatOpenAI"):
+        agent = FootballPodcastAgent(dialogue=True, stream_tts=True)
+    messages = agent._build_messages({"query": "test", "news": ["Match: A vs B."]})
+    assert "Alex: ..." in messages[1].content and "Sam: ..." in messages[1].content
+
+    state = {"query": "test", "script": "Alex: Hello.\nSam: Hi there.", "output_path": str(tmp_path / "ep.wav")}
+    with patch("modules.langgraph_agent.local_dialogue_to_speech", return_value=str(tmp_path / "ep.wav")) as mock_tts:
+        result = await agent.tts_node(state)
+
+    assert result == {"audio_path": str(tmp_path / "ep.wav")}
+    turns = mock_tts.call_args.args[0]
+    assert turns == [Turn("Alex", "Hello."), Turn("Sam", "Hi there.")]
+    assert mock_tts.call_args.kwargs["file_name"] == str(tmp_path / "ep.wav")
@@ -0,0 +1,144 @@
+import json
+import time
+import threading
+import pytest
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from modules.http_client import RateLimitedClient, TokenBucket
+from modules.tools import get_matches_by_date
+
+class QuotaHandler(BaseHTTPRequestHandler):
+    """Football-Data-like API allowing ``quota`` requests per ``window`` seconds, answering 429 beyond."""
+    quota = 4
+    window = 1.0
+    lock = threading.Lock()
+
+    @classmethod
+    def reset(cls, quota=4, window=1.0, used=0, fail_first=0, delay=0.0, reset_header=True):
+        cls.quota, cls.window, cls.delay = quota, window, delay
+        cls.reset_header = reset_header
+        cls.window_start = time.monotonic() if used else None
+        cls.used = used
+        cls.fail_first = fail_first
+        cls.served = 0
+        cls.throttled = 0
+
+    def do_GET(self):
+        cls = type(self)
+        time.sleep(cls.delay)
+        with cls.lock:
+            now = time.monotonic()
+            if cls.window_start is None or now - cls.window_start >= cls.window:
+                cls.window_start, cls.used = now, 0
+            remaining = cls.window - (now - cls.window_start)
+            if cls.fail_first:
+                cls.fail_first -= 1
+                status = 503
+            elif cls.used >= cls.quota:
+                cls.throttled += 1
+                status = 429
+            else:
+                cls.used += 1
+                cls.served += 1
+                status = 200
+            available = cls.quota - cls.used
+
+        body = json.dumps({"matches": [{"id": 1, "status": "FINISHED"}]} if status == 200 else {"message": "no"}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-Requests-Available-Minute", str(available))
+        if cls.reset_header:
+            self.send_header("X-RequestCounter-Reset", f"{remaining:.3f}")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def quota_server():
+    QuotaHandler.reset()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), QuotaHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/v4"
+    server.shutdown()
+    server.server_close()
+
+def fetch_concurrently(client, url, count):
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        return list(pool.map(lambda i: client.get(f"{url}/matches?i={i}").status_code, range(count)))
+
+def test_concurrent_requests_saturate_the_quota_without_exceeding_it(quota_server):
+    client = RateLimitedClient(requests.Session(), bucket=TokenBucket(4, 1.0), backoff_base=0.05)
+
+    start = time.perf_counter()
+    statuses = fetch_concurrently(client, quota_server, 12)
+    elapsed = time.perf_counter() - start
+
+    assert statuses == [200] * 12
+    assert QuotaHandler.throttled == 0 and client.retries == 0
+    # 12 requests at 4 per window take three windows: two waits, none wasted
+    assert 1.9 <= elapsed < 3.0
+
+def test_server_quota_headers_account_for_other_clients(quota_server):
+    # Another process already used 3 of the 4 requests of the current window
+    QuotaHandler.reset(used=3)
+    client = RateLimitedClient(requests.Session(), bucket=TokenBucket(4, 1.0), backoff_base=0.05)
+
+    statuses = [client.get(f"{quota_server}/matches").status_code for _ in range(3)]
+
+    assert statuses == [200] * 3
+    assert QuotaHandler.throttled == 0
+    assert client.bucket.waited > 0.5
+
+def test_spent_quota_without_reset_header_waits_a_window(quota_server):
+    bucket = TokenBucket(4, 0.2)
+    # The server reports the quota spent before this bucket has opened a window
+    bucket.update(available=0)
+    start = time.perf_counter()
+    bucket.acquire()
+    assert 0.15 <= time.perf_counter() - start < 1.0
+
+    QuotaHandler.reset(quota=1, window=0.3, reset_header=False)
+    client = RateLimitedClient(requests.Session(), bucket=TokenBucket(4, 0.4), backoff_base=0.05)
+
+    statuses = [client.get(f"{quota_server}/matches").status_code for _ in range(2)]
+
+    assert statuses == [200] * 2
+    assert QuotaHandler.throttled == 0 and client.bucket.waited > 0.1
+
+def test_429_is_retried_after_the_quota_resets(quota_server):
+    # The client believes in a larger quota than the server grants
+    client = RateLimitedClient(requests.Session(), bucket=TokenBucket(10, 1.0), backoff_base=0.05)
+
+    statuses = fetch_concurrently(client, quota_server, 8)
+
+    assert statuses == [200] * 8
+    assert QuotaHandler.throttled > 0
+    assert client.retries == QuotaHandler.throttled
+
+def test_5xx_is_retried_with_backoff_and_timeouts_give_up(quota_server):
+    QuotaHandler.reset(fail_first=2)
+    client = RateLimitedClient(requests.Session(), backoff_base=0.05)
+    assert client.get(f"{quota_server}/matches").status_code == 200
+    assert client.retries == 2
+
+    QuotaHandler.reset(delay=0.3)
+    client = RateLimitedClient(requests.Session(), max_retries=1, backoff_base=0.01, timeout=(1.0, 0.05))
+    with pytest.raises(requests.Timeout):
+        client.get(f"{quota_server}/matches")
+    assert client.retries == 1
+
+def test_get_matches_by_date_survives_rate_limiting(quota_server, monkeypatch):
+    monkeypatch.setenv("FOOTBALL_DATA_BASE_URL", quota_server)
+    monkeypatch.setenv("FOOTBALL_DATA_CACHE", "0")
+    QuotaHandler.reset(quota=1, window=0.3, used=1)
+
+    result = get_matches_by_date("2024-05-21", ["PL"])
+
+    # The fresh client cannot know the quota is spent: the 429 is retried instead of failing the episode
+    assert result["matches"][0]["id"] == 1
+    assert QuotaHandler.throttled == 1
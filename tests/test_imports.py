@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Cumulative cold-import budgets in microseconds, as reported by `python -X importtime`
+IMPORT_BUDGETS_US = {
+    "modules": 50_000,
+    "modules.langgraph_agent": 400_000,
+}
+
+HEAVY_MODULES = [
+    "chatterbox", "duckduckgo_search", "langchain_core", "langchain_openai",
+    "langgraph", "numpy", "requests", "torch", "torchaudio",
+]
+
+
+def cold_import(statement):
+    """Imports in a fresh interpreter and returns (stdout, {module: cumulative_us})."""
+    check = f"import sys; print(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"{statement}; {check}"],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+    )
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        if cumulative_us.strip().isdigit():
+            cumulative[name.strip()] = int(cumulative_us)
+    return proc.stdout, cumulative
+
+
+def test_import_modules_is_cheap_and_side_effect_free():
+    stdout, cumulative = cold_import("import modules")
+    # No prints at import time and no third-party packages pulled in
+    assert stdout.strip() == "[]"
+    assert cumulative["modules"] < IMPORT_BUDGETS_US["modules"]
+
+
+def test_import_langgraph_agent_defers_heavy_dependencies():
+    stdout, cumulative = cold_import("import modules.langgraph_agent")
+    assert stdout.strip() == "[]"
+    assert cumulative["modules.langgraph_agent"] < IMPORT_BUDGETS_US["modules.langgraph_agent"]
+
+
+def test_submodules_load_on_attribute_access():
+    stdout, _ = cold_import("import modules; modules.constants.DEFAULT_COMPETITIONS")
+    assert stdout.strip() == "[]"
@@ -0,0 +1,96 @@
+import asyncio
+import json
+import time
+import pytest
+from modules.instrumentation import PipelineTracer
+
+
+def test_wrap_sync_stage_records_time_and_counters():
+    tracer = PipelineTracer()
+
+    def stage(x):
+        tracer.count("items", 2)
+        tracer.count("items", 3)
+        tracer.set("ratio", 0.5)
+        time.sleep(0.02)
+        return x * 2
+
+    assert tracer.wrap("double", stage)(21) == 42
+    [record] = tracer.records()
+    assert record["stage"] == "double"
+    assert record["wall_seconds"] >= 0.02
+    assert record["cpu_seconds"] >= 0
+    assert record["counters"] == {"items": 5, "ratio": 0.5}
+    assert record["error"] is None
+
+
+@pytest.mark.asyncio
+async def test_wrap_async_stage_and_run_ids():
+    tracer = PipelineTracer()
+
+    async def stage():
+        tracer.count("calls")
+        await asyncio.sleep(0.01)
+
+    wrapped = tracer.wrap("fetch", stage)
+    assert asyncio.iscoroutinefunction(wrapped)
+    first = tracer.begin_run()
+    await wrapped()
+    second = tracer.begin_run()
+    await wrapped()
+
+    assert [r["run_id"] for r in tracer.records()] == [first, second]
+    assert len(tracer.records(second)) == 1
+    assert "fetch" in tracer.format_breakdown()
+
+
+def test_records_are_bounded_and_discarded_per_run():
+    tracer = PipelineTracer(max_records=3)
+    stage = tracer.wrap("stage", lambda: None)
+    for run_id in ("a", "b", "b", "c"):
+        tracer.begin_run(run_id)
+        stage()
+
+    # The oldest record was dropped to stay within max_records
+    assert [r["run_id"] for r in tracer.records()] == ["b", "b", "c"]
+    tracer.discard("b")
+    assert [r["run_id"] for r in tracer.records()] == ["c"]
+
+
+def test_failed_stage_is_recorded():
+    tracer = PipelineTracer()
+
+    def broken():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        tracer.wrap("broken", broken)()
+    assert tracer.records()[0]["error"] == "ValueError: boom"
+
+
+def test_counters_outside_a_stage_are_ignored():
+    tracer = PipelineTracer()
+    tracer.count("orphan")
+    assert tracer.records() == []
+
+
+def test_exports_jsonl_and_prometheus(tmp_path):
+    tracer = PipelineTracer()
+    tracer.begin_run("run1")
+
+    def stage():
+        tracer.count("search_calls", 4)
+
+    tracer.wrap("search_news", stage)()
+
+    jsonl = tmp_path / "metrics.jsonl"
+    tracer.write_jsonl(str(jsonl))
+    record = json.loads(jsonl.read_text().splitlines()[0])
+    assert record["stage"] == "search_news"
+    assert record["counters"]["search_calls"] == 4
+
+    prom = tmp_path / "metrics.prom"
+    tracer.write_prometheus(str(prom))
+    text = prom.read_text()
+    assert "# TYPE podcast_stage_wall_seconds gauge" in text
+    assert 'podcast_stage_search_calls{stage="search_news",run_id="run1"} 4' in text
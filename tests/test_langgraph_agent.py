@@ -1,47 +1,283 @@
+import time
+import asyncio
 import pytest
 from unittest.mock import patch, MagicMock
 from modules.langgraph_agent import FootballPodcastAgent, AgentState
 from modules.constants import DEFAULT_COMPETITIONS
+from modules.models import Match
 
 @pytest.fixture
 def agent():
-    with patch("modules.langgraph_agent.ChatOpenAI"):
+    with patch("langchain_openai.ChatOpenAI"):
         return FootballPodcastAgent()
 
 def test_fetch_matches_node(agent):
     mock_result = {"matches": [{"homeTeam": {"name": "Arsenal"}}], "status": "success"}
     with patch("modules.langgraph_agent.get_matches_by_date", return_value=mock_result) as mock_get:
-        state: AgentState = {"query": "test", "matches": {}, "news": [], "script": "", "audio_path": "", "errors": []}
+        state: AgentState = {"query": "test", "matches": [], "news": [], "script": "", "audio_path": "", "errors": []}
         result = agent.fetch_matches_node(state)
-        assert result["matches"] == mock_result
+        assert result["matches"] == [Match(home="Arsenal", away="Unknown")]
         assert result["errors"] == []
         # Verify it's called with the constant
         mock_get.assert_called_once()
         args, _ = mock_get.call_args
         assert args[1] == DEFAULT_COMPETITIONS
 
-def test_search_news_node(agent):
+class FakeDDGS:
+    def news(self, query, max_results=3):
+        return [{"title": f"{query} headline", "body": "body"}]
+
+    def text(self, query, max_results=3):
+        return []
+
+@pytest.mark.asyncio
+async def test_search_news_node(agent):
     state: AgentState = {
         "query": "test", 
-        "matches": {"matches": [{"homeTeam": {"name": "Arsenal"}, "awayTeam": {"name": "Chelsea"}, "score": {"fullTime": {"home": 2, "away": 1}}}]}, 
+        "matches": [
+            Match(home="Arsenal", away="Chelsea", home_score=2, away_score=1),
+            Match(home="Leeds", away="Everton", home_score=0, away_score=0),
+        ], 
         "news": [], "script": "", "audio_path": "", "errors": []
     }
-    result = agent.search_news_node(state)
+    with patch("duckduckgo_search.DDGS", FakeDDGS):
+        result = await agent.search_news_node(state)
     assert "Arsenal vs Chelsea" in result["news"][0]
     assert "2-1" in result["news"][0]
+    # News stays paired with its match, in match order
+    assert "Arsenal vs Chelsea football news headline" in result["news"][1]
+    assert "Leeds vs Everton" in result["news"][2]
+    assert "Leeds vs Everton football news headline" in result["news"][3]
+
+@pytest.mark.asyncio
+async def test_search_nodes_share_one_news_pool(agent):
+    state: AgentState = {"query": "test", "matches": [Match(home="Arsenal", away="Chelsea")],
+                         "competitions": ["PL", "PD"], "news": [], "script": "", "audio_path": "", "errors": []}
+    with patch("duckduckgo_search.DDGS", FakeDDGS):
+        await asyncio.gather(agent.search_news_node(state), agent.search_league_news_node(state))
+        pool = agent.news_pool()
+        sessions = pool.sessions_created
+        # A later search reuses the idle sessions of both nodes instead of opening new ones
+        await agent.search_league_news_node(state)
+    assert agent.news_pool() is pool
+    assert 1 <= sessions <= 3
+    assert pool.sessions_created == sessions
 
 def test_generate_script_node(agent):
     mock_llm_response = MagicMock()
     mock_llm_response.content = "<script>This is a test script</script>"
     agent.llm.invoke.return_value = mock_llm_response
     
-    state: AgentState = {"query": "test", "matches": {}, "news": ["Match: A vs B. Result: 1-0."], "script": "", "audio_path": "", "errors": []}
+    state: AgentState = {"query": "test", "matches": [], "news": ["Match: A vs B. Result: 1-0."], "script": "", "audio_path": "", "errors": []}
     result = agent.generate_script_node(state)
     assert result["script"] == "This is a test script"
 
 @pytest.mark.asyncio
 async def test_tts_node(agent):
     with patch("modules.langgraph_agent.local_text_to_speech", return_value="output/test.wav"):
-        state: AgentState = {"query": "test", "matches": {}, "news": [], "script": "hello", "audio_path": "", "errors": []}
+        state: AgentState = {"query": "test", "matches": [], "news": [], "script": "hello", "audio_path": "", "errors": []}
         result = await agent.tts_node(state)
         assert result["audio_path"] == "output/test.wav"
+
+def test_agent_starts_tts_warmup_when_enabled():
+    with patch("langchain_openai.ChatOpenAI"), \
+         patch("modules.tts.TTSManager.start_warmup") as mock_warmup:
+        FootballPodcastAgent(warmup_tts=True, warmup_synthesis=True)
+        FootballPodcastAgent(warmup_tts=False)
+    mock_warmup.assert_called_once_with(dummy_synthesis=True)
+
+def test_prepare_tts_node_only_runs_when_warmup_overlaps_other_stages():
+    with patch("langchain_openai.ChatOpenAI"), patch("modules.tts.TTSManager.start_warmup"):
+        assert "prepare_tts" in FootballPodcastAgent(warmup_tts=True).graph.nodes
+        assert "prepare_tts" not in FootballPodcastAgent(warmup_tts=False).graph.nodes
+        assert "prepare_tts" not in FootballPodcastAgent(warmup_tts=True, parallel=False).graph.nodes
+
+@pytest.mark.asyncio
+async def test_run_records_per_node_metrics(agent):
+    mock_result = {"matches": [
+        {"homeTeam": {"name": "Arsenal"}, "awayTeam": {"name": "Chelsea"}, "score": {"fullTime": {"home": 2, "away": 1}}},
+    ]}
+    response = MagicMock()
+    response.content = "<script>Arsenal beat Chelsea.</script>"
+    response.usage_metadata = {"input_tokens": 120, "output_tokens": 30}
+    agent.llm.invoke.return_value = response
+
+    with patch("modules.langgraph_agent.get_matches_by_date", return_value=mock_result), \
+         patch("duckduckgo_search.DDGS", FakeDDGS), \
+         patch("modules.tts.TTSManager.start_warmup"), \
+         patch("modules.langgraph_agent.local_text_to_speech", return_value="output/test.wav"):
+        final_state = await agent.run("test")
+
+    assert final_state["audio_path"] == "output/test.wav"
+    records = {r["stage"]: r for r in agent.tracer.records()}
+    # Warm-up is off by default, so the graph has no prepare_tts node
+    assert set(records) == {"fetch_matches", "search_league_news", "search_news",
+                            "build_context", "generate_script", "tts"}
+    assert list(records)[-3:] == ["build_context", "generate_script", "tts"]
+    assert records["fetch_matches"]["counters"]["matches_fetched"] == 1
+    assert records["search_news"]["counters"]["search_calls"] == 1
+    assert records["search_league_news"]["counters"]["search_calls"] == len(DEFAULT_COMPETITIONS)
+    assert records["build_context"]["counters"]["context_tokens"] > 0
+    assert records["generate_script"]["counters"] == {"prompt_tokens": 120, "completion_tokens": 30}
+    assert all(r["wall_seconds"] >= 0 for r in records.values())
+
+class FakeChatOpenAI:
+    """Stands in for ChatOpenAI and counts the prompts that actually reach the model."""
+    invocations = 0
+
+    def __init__(self, model=None, base_url=None, **kwargs):
+        self.model_name = model
+        self.temperature = 0.7
+
+    def invoke(self, messages):
+        FakeChatOpenAI.invocations += 1
+        response = MagicMock()
+        response.content = "<think>plan the show</think><script>Arsenal beat Chelsea.</script>"
+        response.usage_metadata = None
+        return response
+
+def test_generate_script_reuses_cached_completion(tmp_path, monkeypatch):
+    monkeypatch.setenv("LLM_CACHE_DIR", str(tmp_path))
+    FakeChatOpenAI.invocations = 0
+    state: AgentState = {"query": "test", "matches": [], "news": ["Match: Arsenal vs Chelsea. Result: 2-1."],
+                         "script": "", "audio_path": "", "errors": []}
+    with patch("langchain_openai.ChatOpenAI", FakeChatOpenAI):
+        first = FootballPodcastAgent().generate_script_node(state)
+        # A rerun in a new process (fresh agent) is served from disk and extracted the same way
+        second = FootballPodcastAgent().generate_script_node(state)
+        other = FootballPodcastAgent().generate_script_node(dict(state, news=["Match: Leeds vs Everton. Result: 0-0."]))
+
+    assert first == second == {"script": "Arsenal beat Chelsea."}
+    assert other["script"] == "Arsenal beat Chelsea."
+    assert FakeChatOpenAI.invocations == 2
+
+@pytest.mark.asyncio
+async def test_resume_skips_completed_nodes_after_tts_failure(tmp_path):
+    mock_result = {"matches": [
+        {"homeTeam": {"name": "Arsenal"}, "awayTeam": {"name": "Chelsea"}, "score": {"fullTime": {"home": 2, "away": 1}}},
+    ]}
+    with patch("langchain_openai.ChatOpenAI"):
+        agent = FootballPodcastAgent(checkpoint_path=str(tmp_path / "checkpoints.sqlite"))
+    response = MagicMock()
+    response.content = "<script>Arsenal beat Chelsea.</script>"
+    response.usage_metadata = None
+    agent.llm.invoke.return_value = response
+
+    with patch("modules.langgraph_agent.get_matches_by_date", return_value=mock_result), \
+         patch("duckduckgo_search.DDGS", FakeDDGS), \
+         patch("modules.tts.TTSManager.start_warmup"), \
+         patch("modules.langgraph_agent.local_text_to_speech", side_effect=RuntimeError("CUDA out of memory")):
+        failed = await agent.run("test", date="2025-05-18", run_id="episode-1")
+    assert "audio_path" not in failed
+    assert agent.llm.invoke.call_count == 1
+
+    with patch("modules.langgraph_agent.get_matches_by_date") as mock_fetch, \
+         patch("duckduckgo_search.DDGS") as mock_ddgs, \
+         patch("modules.tts.TTSManager.start_warmup"), \
+         patch("modules.langgraph_agent.local_text_to_speech", return_value="output/episode-1.wav"):
+        resumed = await agent.run("test", date="2025-05-18", run_id="episode-1", resume=True)
+
+    mock_fetch.assert_not_called()
+    mock_ddgs.assert_not_called()
+    assert agent.llm.invoke.call_count == 1
+    assert resumed["audio_path"] == "output/episode-1.wav"
+    assert resumed["script"] == "Arsenal beat Chelsea."
+    assert resumed["matches"][0].home == "Arsenal"
+
+    # Nothing left to do: resuming again runs no node at all
+    stages_before = len(agent.tracer.records())
+    assert (await agent.run("test", date="2025-05-18", run_id="episode-1", resume=True))["audio_path"] == resumed["audio_path"]
+    assert len(agent.tracer.records()) == stages_before
+
+@pytest.mark.asyncio
+async def test_resume_after_crash_and_fresh_run_ignores_old_checkpoints(tmp_path):
+    with patch("langchain_openai.ChatOpenAI"):
+        agent = FootballPodcastAgent(checkpoint_path=str(tmp_path / "checkpoints.sqlite"))
+    response = MagicMock()
+    response.content = "<script>Quiet day.</script>"
+    response.usage_metadata = None
+    agent.llm.invoke.return_value = response
+
+    async def crashing_tts_node(state):
+        raise RuntimeError("killed")
+
+    with patch("modules.langgraph_agent.get_matches_by_date", return_value={"matches": []}), \
+         patch("duckduckgo_search.DDGS", FakeDDGS), \
+         patch("modules.tts.TTSManager.start_warmup"), \
+         patch.object(agent, "tts_node", crashing_tts_node):
+        with pytest.raises(RuntimeError):
+            await agent.run("test", date="2025-05-19")
+
+    with patch("modules.langgraph_agent.get_matches_by_date") as mock_fetch, \
+         patch("modules.tts.TTSManager.start_warmup"), \
+         patch("modules.langgraph_agent.local_text_to_speech", return_value="output/quiet.wav"):
+        resumed = await agent.run("test", date="2025-05-19", resume=True)
+    mock_fetch.assert_not_called()
+    assert agent.llm.invoke.call_count == 1
+    assert resumed["audio_path"] == "output/quiet.wav"
+
+    # Without resume the same run id starts over and does not reuse the old audio path
+    with patch("modules.langgraph_agent.get_matches_by_date", return_value={"matches": []}) as mock_fetch, \
+         patch("duckduckgo_search.DDGS", FakeDDGS), \
+         patch("modules.tts.TTSManager.start_warmup"), \
+         patch("modules.langgraph_agent.local_text_to_speech", return_value="output/quiet-2.wav"):
+        fresh = await agent.run("test", date="2025-05-19")
+    mock_fetch.assert_called_once()
+    assert fresh["audio_path"] == "output/quiet-2.wav"
+
+class SlowDDGS:
+    def news(self, query, max_results=3):
+        time.sleep(0.1)
+        return [{"title": f"{query} headline", "body": "body"}]
+
+    def text(self, query, max_results=3):
+        return []
+
+@pytest.mark.asyncio
+async def test_benchmark_parallel_topology_shortens_critical_path(monkeypatch):
+    """fetch 0.15s, searches 0.1s, LLM 0.15s, TTS model load 0.3s, synthesis 0.05s."""
+    from modules.tts import TTSManager
+    mock_result = {"matches": [
+        {"homeTeam": {"name": "Arsenal"}, "awayTeam": {"name": "Chelsea"}, "score": {"fullTime": {"home": 2, "away": 1}}},
+    ]}
+
+    def slow_fetch(date, competitions):
+        time.sleep(0.15)
+        return mock_result
+
+    def slow_invoke(messages):
+        time.sleep(0.15)
+        return MagicMock(content="<script>Arsenal beat Chelsea.</script>", usage_metadata=None)
+
+    def slow_load():
+        time.sleep(0.3)
+        return object()
+
+    async def synthesize(text, **kwargs):
+        await asyncio.to_thread(TTSManager.get_model)
+        await asyncio.sleep(0.05)
+        return "output/test.wav"
+
+    async def timed_run(parallel):
+        monkeypatch.setattr(TTSManager, "_model", None)
+        monkeypatch.setattr(TTSManager, "_warmup_future", None)
+        # The constructor's warm-up is held back so the run itself has to load the model
+        with patch("langchain_openai.ChatOpenAI"), patch.object(TTSManager, "start_warmup"):
+            agent = FootballPodcastAgent(parallel=parallel, warmup_tts=True)
+        agent.llm.invoke.side_effect = slow_invoke
+        with patch("modules.langgraph_agent.get_matches_by_date", side_effect=slow_fetch), \
+             patch("duckduckgo_search.DDGS", SlowDDGS), \
+             patch.object(TTSManager, "_load_model", side_effect=slow_load), \
+             patch("modules.langgraph_agent.local_text_to_speech", synthesize):
+            start = time.perf_counter()
+            final_state = await agent.run("test")
+        return time.perf_counter() - start, final_state
+
+    sequential_time, sequential = await timed_run(parallel=False)
+    parallel_time, parallel = await timed_run(parallel=True)
+    print(f"\nCritical path: sequential {sequential_time:.2f}s, parallel {parallel_time:.2f}s")
+
+    assert parallel["audio_path"] == sequential["audio_path"] == "output/test.wav"
+    assert parallel["context"] == sequential["context"]
+    # Sequential ~0.85s; parallel ~0.45s (fetch + match news + LLM + synthesis)
+    assert parallel_time < sequential_time * 0.75
@@ -0,0 +1,117 @@
+import wave
+import threading
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+from modules.langgraph_agent import FootballPodcastAgent
+from modules.live import LiveRunner, MatchSnapshot
+from modules.models import Match
+from modules.tts import TTSManager
+
+
+def fixture(match_id, home, away, status, home_score=None, away_score=None):
+    return {"id": match_id, "homeTeam": {"name": home}, "awayTeam": {"name": away}, "status": status,
+            "score": {"fullTime": {"home": home_score, "away": away_score}}}
+
+
+FIRST = {"matches": [
+    fixture(1, "Arsenal", "Chelsea", "IN_PLAY", 1, 0),
+    fixture(2, "Everton", "Fulham", "IN_PLAY", 0, 0),
+    fixture(3, "Leeds", "Burnley", "TIMED"),
+]}
+SECOND = {"matches": [
+    fixture(1, "Arsenal", "Chelsea", "IN_PLAY", 1, 0),
+    fixture(2, "Everton", "Fulham", "IN_PLAY", 1, 0),
+    fixture(3, "Leeds", "Burnley", "TIMED"),
+]}
+
+
+class CountingDDGS:
+    queries = []
+    _lock = threading.Lock()
+
+    def news(self, query, max_results=3):
+        with CountingDDGS._lock:
+            CountingDDGS.queries.append(query)
+        return [{"title": f"{query} headline", "body": "body"}]
+
+    def text(self, query, max_results=3):
+        return []
+
+
+class CountingTTSModel:
+    sr = 1000
+
+    def __init__(self):
+        self.calls = []
+
+    def generate(self, text):
+        self.calls.append(text)
+        return np.full((1, 5 * len(text)), 0.1, dtype=np.float32)
+
+
+def test_snapshot_diff_keys_on_id_status_and_score(tmp_path):
+    snapshot = MatchSnapshot(str(tmp_path / "snapshot.json"))
+    before = [Match("A", "B", 0, 0, "IN_PLAY", id=1), Match("C", "D", None, None, "TIMED", id=2)]
+    snapshot.save(before, {"1": "A and B level.", "2": "C meet D later."})
+
+    reloaded = MatchSnapshot(str(tmp_path / "snapshot.json"))
+    after = [Match("A", "B", 1, 0, "IN_PLAY", id=1), Match("C", "D", None, None, "TIMED", id=2),
+             Match("E", "F", None, None, "TIMED", id=3)]
+    changed, unchanged = reloaded.diff(after)
+    assert [m.id for m in changed] == [1, 3]
+    assert [m.id for m in unchanged] == [2]
+    assert reloaded.segment(after[1]) == "C meet D later."
+
+
+@pytest.mark.asyncio
+async def test_second_update_only_redoes_the_changed_match(tmp_path, monkeypatch):
+    monkeypatch.delenv("TTS_AUDIO_CACHE_DIR", raising=False)
+    monkeypatch.setattr(TTSManager, "_warmup_future", None)
+    CountingDDGS.queries = []
+    prompts = []
+
+    def invoke(messages):
+        prompts.append(messages[-1].content)
+        headline = messages[-1].content.splitlines()[1]
+        return MagicMock(content=f"<script>Update: {headline}</script>", usage_metadata=None)
+
+    with patch("langchain_openai.ChatOpenAI"):
+        agent = FootballPodcastAgent()
+    agent.llm.invoke.side_effect = invoke
+    runner = LiveRunner(agent, state_dir=str(tmp_path / "live"))
+    model = CountingTTSModel()
+
+    async def update(response, name):
+        with patch("modules.live.get_matches_by_date", return_value=response) as mock_fetch, \
+             patch("duckduckgo_search.DDGS", CountingDDGS), \
+             patch.object(TTSManager, "get_model", return_value=model):
+            result = await runner.run(date="2025-05-18", output_path=str(tmp_path / name))
+        mock_fetch.assert_called_once()
+        return result
+
+    first = await update(FIRST, "first.wav")
+    assert (len(CountingDDGS.queries), len(prompts), len(model.calls)) == (3, 3, 4)  # intro + 3 segments
+    assert first.chunks_reused == 0 and first.segments_written == 3
+
+    second = await update(SECOND, "second.wav")
+    # Only Everton vs Fulham changed: one search, one LLM call, one synthesized segment
+    assert [m.id for m in second.changed] == [2]
+    assert CountingDDGS.queries[3:] == ["Everton vs Fulham football news"]
+    assert len(prompts) == 4 and "Previous update: Update: Match: Everton vs Fulham. Result: 0-0." in prompts[3]
+    assert model.calls[4:] == ["Update: Match: Everton vs Fulham. Result: 1-0. Status: in play."]
+    assert (second.chunks_synthesized, second.chunks_reused) == (1, 3)
+
+    # The spliced episode still covers every match, in fixture order
+    assert second.script.split("\n\n")[1:] == [
+        "Update: Match: Arsenal vs Chelsea. Result: 1-0. Status: in play.",
+        "Update: Match: Everton vs Fulham. Result: 1-0. Status: in play.",
+        "Update: Match: Leeds vs Burnley. Result: ?-?. Status: timed.",
+    ]
+    with wave.open(second.audio_path, "rb") as wf:
+        assert wf.getnframes() > 5 * len(second.script.replace("\n\n", ""))
+
+    # Nothing changed since: no search, no LLM call, no synthesis
+    third = await update(SECOND, "third.wav")
+    assert (len(CountingDDGS.queries), len(prompts), len(model.calls)) == (4, 4, 5)
+    assert third.changed == [] and third.chunks_synthesized == 0
@@ -0,0 +1,78 @@
+import copy
+import time
+import pickle
+import tracemalloc
+from modules.models import Match, parse_matches
+
+
+def raw_match(i, competition):
+    """A match shaped like a full Football-Data.org v4 entry."""
+    team = lambda n: {"id": n, "name": f"Team {n}", "shortName": f"T{n}", "tla": f"T{n:02d}"[:3],
+                      "crest": f"https://crests.football-data.org/{n}.png"}
+    return {
+        "area": {"id": 2072, "name": "England", "code": "ENG", "flag": "https://crests.football-data.org/770.svg"},
+        "competition": {"id": 2021, "name": competition, "code": competition[:2].upper(), "type": "LEAGUE",
+                        "emblem": "https://crests.football-data.org/PL.png"},
+        "season": {"id": 2287, "startDate": "2024-08-16", "endDate": "2025-05-25", "currentMatchday": 38,
+                   "winner": None},
+        "id": i,
+        "utcDate": f"2025-05-{1 + i % 28:02d}T15:00:00Z",
+        "status": "FINISHED",
+        "matchday": 1 + i % 38,
+        "stage": "REGULAR_SEASON",
+        "group": None,
+        "lastUpdated": "2025-05-26T00:20:53Z",
+        "homeTeam": team(2 * i),
+        "awayTeam": team(2 * i + 1),
+        "score": {"winner": "HOME_TEAM", "duration": "REGULAR",
+                  "fullTime": {"home": i % 4, "away": i % 3}, "halfTime": {"home": i % 2, "away": 0}},
+        "odds": {"msg": "Activate Odds-Package in User-Panel to retrieve odds."},
+        "referees": [{"id": 11580 + i, "name": "Referee Name", "type": "REFEREE", "nationality": "England"}],
+    }
+
+
+def test_match_from_api_and_formatting():
+    match = Match.from_api(raw_match(3, "Premier League"))
+    assert (match.home, match.away, match.score) == ("Team 6", "Team 7", "3-0")
+    assert match.day == "2025-05-04"
+    assert match.competition == "Premier League"
+    assert match.summary == "Match: Team 6 vs Team 7. Result: 3-0."
+
+    scheduled = Match.from_api({"homeTeam": {"name": "A"}, "awayTeam": {}, "score": {"fullTime": {"home": None}}})
+    assert scheduled.score == "?-?"
+    assert scheduled.away == "Unknown"
+    assert not hasattr(scheduled, "__dict__")
+
+    # Already parsed data and error responses pass through safely
+    assert parse_matches([match]) == [match]
+    assert parse_matches({"status": "error", "error": "boom", "matches": {}}) == []
+
+
+def _footprint(obj):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    copied = copy.deepcopy(obj)
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del copied
+    return size
+
+
+def test_benchmark_compact_state_vs_raw_response():
+    competitions = ["Premier League", "Primera Division", "Serie A", "Bundesliga", "Ligue 1"]
+    response = {"filters": {}, "resultSet": {"count": 1900},
+                "matches": [raw_match(i, competitions[i % 5]) for i in range(1900)]}
+
+    start = time.perf_counter()
+    matches = parse_matches(response)
+    parse_seconds = time.perf_counter() - start
+
+    raw_bytes, compact_bytes = _footprint(response), _footprint(matches)
+    raw_pickle, compact_pickle = len(pickle.dumps(response)), len(pickle.dumps(matches))
+    print(f"\nParsed {len(matches)} matches in {parse_seconds * 1000:.1f} ms; state memory "
+          f"{raw_bytes / 1024:.0f} KiB -> {compact_bytes / 1024:.0f} KiB, "
+          f"serialized {raw_pickle / 1024:.0f} KiB -> {compact_pickle / 1024:.0f} KiB")
+
+    assert len(matches) == 1900
+    assert compact_bytes * 5 < raw_bytes
+    assert compact_pickle * 3 < raw_pickle
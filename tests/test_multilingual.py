@@ -0,0 +1,123 @@
+import os
+import time
+import threading
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+from modules.langgraph_agent import FootballPodcastAgent
+from modules.multilingual import SharedWorkSummary, language_output_path, parse_languages
+from modules.tts import TTSManager
+
+
+def test_parse_languages_and_output_paths():
+    assert parse_languages(" EN, ar,en ") == ["en", "ar"]
+    assert parse_languages(["fr"]) == ["fr"]
+    with pytest.raises(ValueError):
+        parse_languages("en,xx")
+    assert language_output_path("output/podcast.wav", "ar") == "output/podcast_ar.wav"
+
+    summary = SharedWorkSummary(languages=3, match_fetches=1, search_calls=4, context_tokens=100,
+                                scripts_written=1, scripts_translated=2, audio_files=3)
+    assert (summary.search_calls_saved, summary.context_tokens_saved, summary.tts_models_saved) == (8, 200, 2)
+
+
+class CountingDDGS:
+    calls = 0
+    _lock = threading.Lock()
+
+    def news(self, query, max_results=3):
+        with CountingDDGS._lock:
+            CountingDDGS.calls += 1
+        return [{"title": f"{query} headline", "body": "body"}]
+
+    def text(self, query, max_results=3):
+        return []
+
+
+class StubMultilingualModel:
+    sr = 1000
+
+    def __init__(self):
+        self.languages = []
+
+    def generate(self, text, language_id):
+        self.languages.append(language_id)
+        return np.zeros((1, 10 * len(text)), dtype=np.float32)
+
+
+@pytest.mark.asyncio
+async def test_multilingual_run_shares_fetch_search_and_model(tmp_path, monkeypatch):
+    monkeypatch.setattr(TTSManager, "_multilingual_model", None)
+    monkeypatch.setattr(TTSManager, "_warmup_future", None)
+    monkeypatch.delenv("TTS_AUDIO_CACHE_DIR", raising=False)
+    CountingDDGS.calls = 0
+    mock_result = {"matches": [
+        {"homeTeam": {"name": "Arsenal"}, "awayTeam": {"name": "Chelsea"}, "score": {"fullTime": {"home": 2, "away": 1}}},
+        {"homeTeam": {"name": "Everton"}, "awayTeam": {"name": "Fulham"}, "score": {"fullTime": {"home": 0, "away": 0}}},
+    ]}
+
+    prompts, in_flight, peak = [], [0], [0]
+    lock = threading.Lock()
+
+    def invoke(messages):
+        prompt = messages[-1].content
+        with lock:
+            prompts.append(prompt)
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.1)
+        with lock:
+            in_flight[0] -= 1
+        if prompt.startswith("Translate"):
+            language = prompt.split("into ")[1].split(".")[0]
+            return MagicMock(content=f"<script>[{language}] Arsenal beat Chelsea.</script>", usage_metadata=None)
+        return MagicMock(content="<think>plan</think><script>Arsenal beat Chelsea.</script>", usage_metadata=None)
+
+    with patch("langchain_openai.ChatOpenAI"):
+        agent = FootballPodcastAgent(languages="en,fr,ar,de", language_concurrency=2, tts_chunked=True)
+    agent.llm.invoke.side_effect = invoke
+    model = StubMultilingualModel()
+
+    with patch("modules.langgraph_agent.get_matches_by_date", return_value=mock_result) as mock_fetch, \
+         patch("duckduckgo_search.DDGS", CountingDDGS), \
+         patch.object(TTSManager, "_load_multilingual_model", return_value=model) as mock_load:
+        final_state = await agent.run("test", output_path=str(tmp_path / "episode.wav"))
+
+    # Fetch, search and context ran once for all four languages
+    mock_fetch.assert_called_once()
+    assert CountingDDGS.calls == 3  # two matches + one league query
+    mock_load.assert_called_once()
+    # One script written from the context, three translated from it, two at a time
+    assert len(prompts) == 4
+    assert sum("Matches Info" in p for p in prompts) == 1
+    assert all("Latest news" not in p for p in prompts if p.startswith("Translate"))
+    assert peak[0] == 2
+
+    assert final_state["scripts"]["fr"] == "[French] Arsenal beat Chelsea."
+    assert final_state["audio_path"] == str(tmp_path / "episode_en.wav")
+    assert sorted(final_state["audio_paths"]) == ["ar", "de", "en", "fr"]
+    assert all(os.path.exists(path) for path in final_state["audio_paths"].values())
+    assert sorted(set(model.languages)) == ["ar", "de", "en", "fr"]
+
+    shared = final_state["shared_work"]
+    assert shared["match_fetches"] == 1
+    assert shared["search_calls"] == 3 and shared["scripts_translated"] == 3 and shared["audio_files"] == 4
+    assert SharedWorkSummary(**shared).search_calls_saved == 9
+    # Counted from the searches the nodes made, as the tracer records them
+    assert shared["search_calls"] == sum(r["counters"].get("search_calls", 0) for r in agent.tracer.records())
+
+    # Matches handed in up front (e.g. by a backfill) cost this run no fetch
+    with patch("modules.langgraph_agent.get_matches_by_date") as mock_fetch, \
+         patch("duckduckgo_search.DDGS", CountingDDGS), \
+         patch.object(TTSManager, "_load_multilingual_model", return_value=model):
+        final_state = await agent.run("test", matches=mock_result, output_path=str(tmp_path / "given.wav"))
+    mock_fetch.assert_not_called()
+    assert final_state["shared_work"]["match_fetches"] == 0
+    assert final_state["shared_work"]["search_calls"] == CountingDDGS.calls - 3
+
+
+def test_dialogue_mode_rejects_other_languages():
+    with patch("langchain_openai.ChatOpenAI"):
+        with pytest.raises(ValueError):
+            FootballPodcastAgent(dialogue=True, languages=["ar"])
+        assert FootballPodcastAgent(languages="en").multilingual is False
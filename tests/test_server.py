@@ -0,0 +1,159 @@
+import json
+import time
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from modules.instrumentation import PipelineTracer
+from modules.langgraph_agent import FootballPodcastAgent
+from modules.server import PodcastServer
+
+
+async def request(port, method, path, payload=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, data = raw.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(data)
+
+
+class FakeDDGS:
+    def news(self, query, max_results=3):
+        return [{"title": "Team news", "body": "Both sides at full strength."}]
+
+    def text(self, query, max_results=3):
+        return []
+
+
+class FakeLLM:
+    def invoke(self, messages):
+        time.sleep(0.01)
+        return SimpleNamespace(content="<script>Welcome to the show.</script>", usage_metadata=None)
+
+
+async def fake_tts(text, file_name=None, **kwargs):
+    await asyncio.sleep(0.02)
+    return file_name
+
+
+class GatedAgent:
+    """Agent whose runs block until released, recording the order jobs start in."""
+
+    def __init__(self):
+        self.started = []
+        self.release = asyncio.Event()
+        self.tracer = PipelineTracer()
+
+    async def delete_run(self, run_id):
+        pass
+
+    async def run(self, query, output_path=None, **kwargs):
+        self.started.append(query)
+        await self.release.wait()
+        return {"script": query, "audio_path": output_path, "errors": []}
+
+
+@pytest.mark.asyncio
+async def test_server_throughput_with_resident_agent(tmp_path):
+    matches = {"matches": [{"homeTeam": {"name": "Arsenal"}, "awayTeam": {"name": "Chelsea"},
+                            "score": {"fullTime": {"home": 2, "away": 1}}}]}
+    with patch("langchain_openai.ChatOpenAI") as mock_llm_cls, \
+         patch("modules.langgraph_agent.get_matches_by_date", return_value=matches), \
+         patch("duckduckgo_search.DDGS", FakeDDGS), \
+         patch("modules.tts.TTSManager.start_warmup"), \
+         patch("modules.langgraph_agent.local_text_to_speech", fake_tts):
+        agent = FootballPodcastAgent(tts_concurrency=1)
+        agent.llm = FakeLLM()
+        jobs = 12
+        async with PodcastServer(agent, workers=3, max_queue=jobs, output_dir=str(tmp_path)) as server:
+            await server.start(port=0)
+            start = time.perf_counter()
+            ids = []
+            for i in range(jobs):
+                status, body = await request(server.port, "POST", "/jobs", {"query": f"Episode {i}"})
+                assert status == 202
+                ids.append(body["id"])
+            while (await request(server.port, "GET", "/health"))[1]["completed"] < jobs:
+                await asyncio.sleep(0.01)
+            elapsed = time.perf_counter() - start
+
+            status, result = await request(server.port, "GET", f"/jobs/{ids[0]}/result")
+
+    # The LLM client (and graph) were built once and shared by every episode
+    assert mock_llm_cls.call_count == 1
+    assert status == 200
+    assert result["status"] == "done"
+    assert result["script"] == "Welcome to the show."
+    assert result["audio_path"].endswith(f"podcast_{ids[0]}.wav")
+    episodes_per_minute = jobs / elapsed * 60
+    print(f"\nServer throughput: {episodes_per_minute:.0f} episodes/minute ({jobs} jobs in {elapsed:.2f}s)")
+    assert episodes_per_minute > 0
+
+
+@pytest.mark.asyncio
+async def test_server_backpressure_priority_and_status(tmp_path):
+    agent = GatedAgent()
+    async with PodcastServer(agent, workers=1, max_queue=2, output_dir=str(tmp_path)) as server:
+        await server.start(port=0)
+        status, first = await request(server.port, "POST", "/jobs", {"query": "first"})
+        assert status == 202
+        while not agent.started:
+            await asyncio.sleep(0.01)
+
+        # The worker is busy: two jobs fit in the queue, the next one is rejected
+        assert (await request(server.port, "POST", "/jobs", {"query": "low", "priority": 5}))[0] == 202
+        assert (await request(server.port, "POST", "/jobs", {"query": "urgent", "priority": 0}))[0] == 202
+        status, body = await request(server.port, "POST", "/jobs", {"query": "overflow"})
+        assert status == 429
+        assert server.health()["rejected"] == 1
+
+        assert (await request(server.port, "GET", f"/jobs/{first['id']}"))[1]["status"] == "running"
+        assert (await request(server.port, "GET", f"/jobs/{first['id']}/result"))[0] == 409
+        assert (await request(server.port, "GET", "/jobs/unknown"))[0] == 404
+        assert (await request(server.port, "POST", "/jobs", [1, 2]))[0] == 400
+
+        agent.release.set()
+        while server.health()["completed"] < 3:
+            await asyncio.sleep(0.01)
+
+    assert agent.started == ["first", "urgent", "low"]
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_jobs_keep_separate_checkpoints_and_release_them(tmp_path):
+    import sqlite3
+
+    matches = {"matches": [{"homeTeam": {"name": "Arsenal"}, "awayTeam": {"name": "Chelsea"},
+                            "score": {"fullTime": {"home": 2, "away": 1}}}]}
+    db = str(tmp_path / "checkpoints.sqlite")
+    threads_seen = set()
+
+    async def checkpoint_spying_tts(text, file_name=None, **kwargs):
+        # Runs last in every job, once the earlier nodes have been checkpointed
+        with sqlite3.connect(db) as conn:
+            threads_seen.update(row[0] for row in conn.execute("SELECT DISTINCT thread_id FROM checkpoints"))
+        return await fake_tts(text, file_name)
+
+    with patch("langchain_openai.ChatOpenAI"), \
+         patch("modules.langgraph_agent.get_matches_by_date", return_value=matches), \
+         patch("duckduckgo_search.DDGS", FakeDDGS), \
+         patch("modules.tts.TTSManager.start_warmup"), \
+         patch("modules.langgraph_agent.local_text_to_speech", checkpoint_spying_tts):
+        agent = FootballPodcastAgent(checkpoint_path=db)
+        agent.llm = FakeLLM()
+        async with PodcastServer(agent, workers=2, max_queue=4, output_dir=str(tmp_path)) as server:
+            await server.start(port=0)
+            jobs = [server.submit("Same episode") for _ in range(2)]
+            while server.health()["completed"] + server.health()["failed"] < 2:
+                await asyncio.sleep(0.01)
+
+    assert [job.status for job in jobs] == ["done", "done"]
+    assert jobs[0].audio_path != jobs[1].audio_path
+    assert threads_seen == {f"job:{job.id}" for job in jobs}
+    # Finished jobs leave neither checkpoints nor tracer records behind in the resident agent
+    with sqlite3.connect(db) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0] == 0
+    assert agent.tracer.records() == []
@@ -0,0 +1,171 @@
+import asyncio
+import time
+import numpy as np
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from modules.cache import LLMResponseCache
+from modules.langgraph_agent import FootballPodcastAgent, extract_script
+from modules.streaming import ScriptStreamParser
+from modules.tts import TTSManager
+
+
+def parse(content, step=3):
+    parser = ScriptStreamParser()
+    fed = []
+    for i in range(0, len(content), step):
+        fed += parser.feed(content[i:i + step])
+    return fed, parser.close()
+
+
+def test_parser_streams_sentences_inside_script_tags():
+    content = "<think>Plan. Be brief. </think>Sure!\n<script>Hello there. Arsenal won 2-1! What a game?\n\nSee you</script> Bye."
+    fed, closed = parse(content)
+    assert fed == ["Hello there.", "Arsenal won 2-1!", "What a game?"]
+    assert closed == ["See you"]
+    assert " ".join(fed + closed) == " ".join(extract_script(content).split())
+
+
+def test_parser_falls_back_to_untagged_text_at_close():
+    content = "<think>Hmm. Okay.</think>No tags here. Second sentence."
+    fed, closed = parse(content)
+    assert fed == []
+    assert closed == ["No tags here.", "Second sentence."]
+    assert " ".join(closed) == extract_script(content)
+
+
+def test_parser_drops_unclosed_think_block():
+    fed, closed = parse("<think>never closed. oh. ")
+    assert fed == [] and closed == []
+
+
+def test_parser_handles_tags_split_across_tokens():
+    fed, closed = parse("<scr" + "ipt>One. Two.</scr" + "ipt>", step=1)
+    assert fed + closed == ["One.", "Two."]
+
+
+@pytest.mark.parametrize("content", [
+    "Intro. <script>Hello there. Second line.",
+    "<script>Hello there. Second line.</script> Outro.",
+    "<think>Draft <script>Not this.</script></think>Intro. <script>Real one. Done.</script>",
+    "<script>Hello <think>aside. </think>there. Bye.</script>",
+    "<script>Cut off mid <think>thought. Never closed.",
+    "No tags at all. <think>hidden.</think> Still spoken.",
+    "<script>Nested <script>tag. Stays.</script>",
+])
+@pytest.mark.parametrize("step", [1, 4, 1000])
+def test_parser_speaks_what_extract_script_returns(content, step):
+    fed, closed = parse(content, step=step)
+    assert " ".join(fed + closed) == " ".join(extract_script(content).split())
+
+
+class FakeStreamingChatModel:
+    """Emits a script word by word with a fixed per-token delay."""
+
+    def __init__(self, content, token_delay):
+        self.tokens = [t + " " for t in content.split(" ")]
+        self.token_delay = token_delay
+        self.streams = 0
+
+    async def astream(self, messages):
+        self.streams += 1
+        for token in self.tokens:
+            await asyncio.sleep(self.token_delay)
+            yield SimpleNamespace(content=token, usage_metadata=None)
+
+    def invoke(self, messages):
+        time.sleep(self.token_delay * len(self.tokens))
+        return SimpleNamespace(content="".join(self.tokens), usage_metadata=None)
+
+
+class StubTTSModel:
+    """Synthesis cost and audio length both scale with the text length."""
+    sr = 1000
+
+    def __init__(self, seconds_per_char):
+        self.seconds_per_char = seconds_per_char
+
+    def generate(self, text):
+        time.sleep(self.seconds_per_char * len(text))
+        return np.zeros((1, 20 * len(text)), dtype=np.float32)
+
+
+@pytest.mark.asyncio
+async def test_streaming_overlaps_llm_and_tts(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    script = "<script>" + " ".join(f"Sentence number {i} is here." for i in range(6)) + "</script>"
+    state = {"query": "test", "matches": [], "news": ["Match: A vs B."], "script": "", "audio_path": "", "errors": []}
+
+    async def run(stream_tts):
+        with patch("langchain_openai.ChatOpenAI"):
+            agent = FootballPodcastAgent(stream_tts=stream_tts, tts_chunked=True)
+        agent.llm = FakeStreamingChatModel(script, token_delay=0.01)
+        start = time.perf_counter()
+        with patch.object(TTSManager, "get_model", return_value=StubTTSModel(seconds_per_char=0.002)):
+            if stream_tts:
+                result = await agent.generate_script_streaming_node(state)
+            else:
+                result = await asyncio.to_thread(agent.generate_script_node, state)
+                result.update(await agent.tts_node({**state, **result}))
+        return time.perf_counter() - start, result, TTSManager.last_stats
+
+    sequential_time, sequential, _ = await run(False)
+    streaming_time, streaming, stats = await run(True)
+
+    assert streaming["script"] == sequential["script"]
+    assert streaming["audio_path"].endswith(".wav")
+    # First audio is written long before the LLM finishes (~0.3s of tokens)
+    assert stats.time_to_first_audio < 0.2
+    assert streaming_time < sequential_time * 0.8
+
+    # The tts node does not synthesize twice
+    agent_state = {**state, **streaming}
+    with patch("langchain_openai.ChatOpenAI"):
+        assert await FootballPodcastAgent().tts_node(agent_state) == {}
+
+
+@pytest.mark.asyncio
+async def test_streaming_replays_cached_completion(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    script = "<think>outline</think><script>First line. Second line.</script>"
+    state = {"query": "test", "matches": [], "news": ["Match: A vs B."], "script": "", "audio_path": "", "errors": []}
+    llm = FakeStreamingChatModel(script, token_delay=0)
+    cache = LLMResponseCache(str(tmp_path / "llm"))
+
+    results = []
+    for _ in range(2):
+        with patch("langchain_openai.ChatOpenAI"):
+            agent = FootballPodcastAgent(stream_tts=True, llm_cache=cache)
+        agent.llm = llm
+        with patch.object(TTSManager, "get_model", return_value=StubTTSModel(seconds_per_char=0)):
+            results.append(await agent.generate_script_streaming_node(state))
+
+    assert llm.streams == 1
+    assert results[0]["script"] == results[1]["script"] == "First line. Second line."
+    assert results[1]["audio_path"].endswith(".wav")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_streams_share_one_completion(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    script = "<script>First line. Second line.</script>"
+    state = {"query": "test", "matches": [], "news": ["Match: A vs B."], "script": "", "audio_path": "", "errors": []}
+    llm = FakeStreamingChatModel(script, token_delay=0.01)
+    cache = LLMResponseCache(str(tmp_path / "llm"))
+    agents = []
+    for _ in range(2):
+        with patch("langchain_openai.ChatOpenAI"):
+            agent = FootballPodcastAgent(stream_tts=True, llm_cache=cache)
+        agent.llm = llm
+        agents.append(agent)
+
+    with patch.object(TTSManager, "get_model", return_value=StubTTSModel(seconds_per_char=0)):
+        results = await asyncio.gather(*(
+            agent.generate_script_streaming_node(dict(state, output_path=str(tmp_path / f"{i}.wav")))
+            for i, agent in enumerate(agents)
+        ))
+
+    # The second job waited for the first one's stream instead of paying for its own
+    assert llm.streams == 1 and cache.coalesced == 1
+    assert [r["script"] for r in results] == ["First line. Second line."] * 2
+    assert all(r["audio_path"].endswith(".wav") for r in results)
@@ -1,14 +1,22 @@
+import json
+import asyncio
+import time
+import threading
 import pytest
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import patch, MagicMock
-from modules.tools import get_matches_by_date, local_text_to_speech
+import modules.tools as tools
+from modules.tools import NewsSearchPool, get_matches_by_date, local_text_to_speech
 from modules.constants import PREMIER_LEAGUE
 
 def test_get_matches_by_date_success():
     mock_response = MagicMock()
     mock_response.status_code = 200
+    mock_response.headers = {}
     mock_response.json.return_value = {"matches": [{"id": 1, "competition": {"name": "Premier League"}}]}
     
-    with patch("requests.get", return_value=mock_response):
+    with patch("requests.Session.get", return_value=mock_response):
         result = get_matches_by_date("2024-05-21", [PREMIER_LEAGUE])
         assert result["matches"][0]["id"] == 1
         assert result["matches"][0]["competition"]["name"] == "Premier League"
@@ -26,14 +34,153 @@ def test_get_matches_by_date_api_error():
     mock_response.status_code = 404
     mock_response.text = "Not found"
     
-    with patch("requests.get", return_value=mock_response):
+    with patch("requests.Session.get", return_value=mock_response):
         result = get_matches_by_date("2024-05-21", [PREMIER_LEAGUE])
         assert result["status"] == "error"
         assert "404" in result["error"]
 
 @pytest.mark.asyncio
 async def test_local_text_to_speech():
-    with patch("modules.tools.TTSManager.generate_audio", return_value="test_output.wav") as mock_gen:
+    with patch("modules.tts.TTSManager.generate_audio", return_value="test_output.wav") as mock_gen:
         path = await local_text_to_speech("hello")
         assert path == "test_output.wav"
         mock_gen.assert_called_once_with("hello")
+
+class SlowDDGS:
+    """Fake DDGS session with injected latency."""
+    latency = 0.1
+    created = 0
+
+    def __init__(self):
+        SlowDDGS.created += 1
+
+    def news(self, query, max_results=3):
+        time.sleep(self.latency)
+        return [{"title": query, "body": "snippet"}]
+
+    def text(self, query, max_results=3):
+        return []
+
+@pytest.mark.asyncio
+async def test_news_search_pool_concurrent_speedup():
+    queries = [f"Team {i} vs Team {i + 1} football news" for i in range(8)]
+
+    async def timed(max_concurrency):
+        SlowDDGS.created = 0
+        start = time.perf_counter()
+        async with NewsSearchPool(max_concurrency=max_concurrency, session_factory=SlowDDGS) as pool:
+            results = await pool.search_many(queries)
+        return time.perf_counter() - start, results, SlowDDGS.created
+
+    sequential_time, sequential_results, _ = await timed(1)
+    concurrent_time, concurrent_results, sessions = await timed(8)
+
+    # Results are merged back in query order
+    assert concurrent_results == sequential_results
+    assert [r.split(":")[0] for r in concurrent_results] == [f"- {q}" for q in queries]
+    assert sessions <= 8
+    assert concurrent_time * 3 < sequential_time
+
+@pytest.mark.asyncio
+async def test_news_search_pool_bounds_in_flight_and_reuses_sessions():
+    SlowDDGS.created = 0
+    async with NewsSearchPool(max_concurrency=2, session_factory=SlowDDGS) as pool:
+        await pool.search_many([f"q{i}" for i in range(6)])
+        assert pool.sessions_created == 2
+    assert SlowDDGS.created == 2
+
+@pytest.mark.asyncio
+async def test_news_search_pool_timeout_returns_empty():
+    class HangingDDGS(SlowDDGS):
+        latency = 0.5
+
+    async with NewsSearchPool(max_concurrency=2, timeout=0.05, session_factory=HangingDDGS) as pool:
+        results = await pool.search_many(["slow query"])
+    assert results == [""]
+
+@pytest.mark.asyncio
+async def test_news_search_pool_closes_sessions_released_after_close():
+    class ClosingDDGS(SlowDDGS):
+        latency = 0.2
+        exited = 0
+
+        def __exit__(self, *exc):
+            ClosingDDGS.exited += 1
+
+    async with NewsSearchPool(max_concurrency=2, timeout=0.05, session_factory=ClosingDDGS) as pool:
+        assert await pool.search_many(["slow query", "another"]) == ["", ""]
+    # Both searches were still running when the pool closed; their sessions close as they return
+    assert ClosingDDGS.exited == 0
+    await asyncio.sleep(0.3)
+    assert (pool.sessions_created, ClosingDDGS.exited, pool._idle) == (2, 2, [])
+
+@pytest.mark.asyncio
+async def test_news_search_pool_error_is_reported():
+    class BrokenDDGS:
+        def news(self, query, max_results=3):
+            raise RuntimeError("rate limited")
+
+    async with NewsSearchPool(session_factory=BrokenDDGS) as pool:
+        results = await pool.search_many(["any"])
+    assert results[0].startswith("Error fetching news")
+
+class StubFootballDataHandler(BaseHTTPRequestHandler):
+    """Serves a fixed matches payload with an ETag and honours If-None-Match."""
+    etag = '"v1"'
+    requests_seen = []
+
+    def do_GET(self):
+        StubFootballDataHandler.requests_seen.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps({"matches": [{"id": 7, "status": "FINISHED"}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", self.etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def football_data_server(monkeypatch):
+    StubFootballDataHandler.requests_seen = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubFootballDataHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("FOOTBALL_DATA_BASE_URL", f"http://127.0.0.1:{server.server_port}/v4")
+    yield StubFootballDataHandler
+    server.shutdown()
+    server.server_close()
+
+def test_get_matches_by_date_caches_finished_matchday(football_data_server):
+    first = get_matches_by_date("2024-05-21", [PREMIER_LEAGUE])
+    second = get_matches_by_date("2024-05-21", [PREMIER_LEAGUE])
+
+    assert first == second
+    assert second["matches"][0]["id"] == 7
+    assert len(football_data_server.requests_seen) == 1
+    stats = tools.get_response_cache().stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+def test_get_matches_by_date_revalidates_today_with_etag(football_data_server, monkeypatch):
+    monkeypatch.setattr(tools, "FOOTBALL_DATA_TODAY_TTL", 0)
+    today = datetime.now().strftime("%Y-%m-%d")
+
+    first = get_matches_by_date(today, [PREMIER_LEAGUE])
+    second = get_matches_by_date(today, [PREMIER_LEAGUE])
+
+    assert first == second
+    assert len(football_data_server.requests_seen) == 2
+    assert "If-None-Match" not in football_data_server.requests_seen[0]
+    assert football_data_server.requests_seen[1]["If-None-Match"] == '"v1"'
+
+def test_get_matches_by_date_cache_keyed_by_competitions(football_data_server):
+    get_matches_by_date("2024-05-21", ["PL"])
+    get_matches_by_date("2024-05-21", ["PD", "PL"])
+    get_matches_by_date("2024-05-21", ["PL", "PD"])
+    assert len(football_data_server.requests_seen) == 2
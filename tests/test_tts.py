@@ -1,46 +1,357 @@
+import wave
+import numpy as np
 import pytest
 from unittest.mock import patch, MagicMock
-from modules.tts import TTSManager
+from modules.tts import TTSManager, batch_by_length, export_conditionals, import_conditionals, split_into_chunks
 
 @pytest.mark.asyncio
 async def test_tts_manager_get_model_singleton():
-    # Mock the entire qwen_tts.models module to avoid import issues
-    mock_qwen_tts = MagicMock()
-    mock_models = MagicMock()
-    mock_qwen3tts = MagicMock()
-    
+    # Mock the chatterbox package to avoid loading the real model
+    mock_chatterbox_tts = MagicMock()
+    mock_model_cls = MagicMock()
+
     with patch.dict("sys.modules", {
-        "qwen_tts": mock_qwen_tts,
-        "qwen_tts.models": mock_models,
+        "chatterbox": MagicMock(),
+        "chatterbox.tts": mock_chatterbox_tts,
         "torch": MagicMock()
     }):
-        mock_models.Qwen3TTS = mock_qwen3tts
-        mock_qwen3tts.from_pretrained.return_value = MagicMock()
-        
+        mock_chatterbox_tts.ChatterboxTTS = mock_model_cls
+        mock_model_cls.from_pretrained.return_value = MagicMock()
+
         # Reset singleton state for test
         TTSManager._model = None
-        
-        model1 = TTSManager.get_model()
-        model2 = TTSManager.get_model()
-        
+
+        try:
+            model1 = TTSManager.get_model()
+            model2 = TTSManager.get_model()
+        finally:
+            TTSManager._model = None
+
         assert model1 == model2
-        mock_qwen3tts.from_pretrained.assert_called_once()
+        mock_model_cls.from_pretrained.assert_called_once()
 
 @pytest.mark.asyncio
-async def test_tts_manager_generate_audio():
-    with patch("modules.tts.TTSManager.get_model") as mock_get_model, \
-         patch("torchaudio.save") as mock_save, \
-         patch("os.path.exists", return_value=True), \
-         patch("os.makedirs"):
-        
+async def test_tts_manager_generate_audio(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with patch("modules.tts.TTSManager.get_model") as mock_get_model:
         mock_model = MagicMock()
+        mock_model.sr = 1000
+        mock_model.generate.return_value = np.zeros((1, 500), dtype=np.float32)
         mock_get_model.return_value = mock_model
-        mock_audio_tensor = MagicMock()
-        mock_model.synthesize.return_value = mock_audio_tensor
-        
+
         path = await TTSManager.generate_audio("test text")
-        
+
         assert "output/podcast_" in path
         assert path.endswith(".wav")
-        mock_model.synthesize.assert_called_once_with("test text")
-        mock_save.assert_called_once()
+        mock_model.generate.assert_called_once_with("test text")
+        samples, rate = read_wav(str(tmp_path / path))
+        assert rate == 1000 and len(samples) == 500
+
+class StubModel:
+    """CPU stand-in for ChatterboxTTS: 100 samples per character, one amplitude per call."""
+    sr = 1000
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = []
+
+    def generate(self, text):
+        import time
+        time.sleep(self.latency)
+        self.calls.append(text)
+        level = min(len(self.calls), 9) / 10
+        return np.full((1, len(text) * 100), level, dtype=np.float32)
+
+def read_wav(path):
+    with wave.open(path, "rb") as wf:
+        frames = wf.readframes(wf.getnframes())
+        return np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32767.0, wf.getframerate()
+
+def test_split_into_chunks_respects_paragraphs_and_limit():
+    text = "First sentence. Second one!\n\nNew paragraph? Yes.  " + "word " * 30
+    chunks = split_into_chunks(text, max_chars=40)
+
+    assert chunks[0] == "First sentence. Second one!"
+    assert chunks[1].startswith("New paragraph? Yes.")
+    assert all(len(c) <= 40 for c in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+@pytest.mark.asyncio
+async def test_generate_audio_chunked_streams_in_order(tmp_path):
+    model = StubModel()
+    out = str(tmp_path / "episode.wav")
+    with patch.object(TTSManager, "get_model", return_value=model):
+        path = await TTSManager.generate_audio(
+            "Aa. Bbb.\n\nCc.", chunked=True, file_name=out, max_chars=4,
+            workers=2, silence_ms=10, crossfade_ms=0,
+        )
+
+    samples, rate = read_wav(path)
+    assert rate == model.sr
+    assert model.calls == ["Aa.", "Bbb.", "Cc."]
+    # 3 chunks of 300/400/300 samples plus two 10-sample gaps
+    assert len(samples) == 300 + 400 + 300 + 2 * 10
+    assert abs(samples[0] - 0.1) < 1e-3
+    assert abs(samples[310] - 0.2) < 1e-3
+    assert abs(samples[-1] - 0.3) < 1e-3
+    assert np.all(samples[300:310] == 0)
+
+    stats = TTSManager.last_stats
+    assert stats.chunks == 3
+    assert stats.audio_seconds == pytest.approx(1.02)
+    assert stats.time_to_first_audio <= stats.synthesis_seconds
+    assert stats.real_time_factor > 0
+
+@pytest.mark.asyncio
+async def test_generate_audio_stream_crossfade_shortens_output(tmp_path):
+    with patch.object(TTSManager, "get_model", return_value=StubModel()):
+        path = await TTSManager.generate_audio_stream(
+            ["Aa.", "Bb."], file_name=str(tmp_path / "x.wav"), silence_ms=0, crossfade_ms=50,
+        )
+    samples, _ = read_wav(path)
+    assert len(samples) == 600 - 50
+    # The overlap ramps from the first chunk's level to the second's
+    assert 0.1 < samples[275] < 0.2
+
+@pytest.mark.asyncio
+async def test_generate_audio_stream_accepts_async_chunks(tmp_path):
+    async def produce():
+        for text in ["One.", "Two."]:
+            yield text
+
+    model = StubModel()
+    with patch.object(TTSManager, "get_model", return_value=model):
+        await TTSManager.generate_audio_stream(produce(), file_name=str(tmp_path / "x.wav"))
+    assert model.calls == ["One.", "Two."]
+
+@pytest.mark.asyncio
+async def test_generate_audio_stream_worker_pool_speedup(tmp_path):
+    import time
+    chunks = [f"Chunk {i}." for i in range(8)]
+
+    async def timed(workers):
+        with patch.object(TTSManager, "get_model", return_value=StubModel(latency=0.05)):
+            start = time.perf_counter()
+            await TTSManager.generate_audio_stream(chunks, file_name=str(tmp_path / f"{workers}.wav"), workers=workers)
+            return time.perf_counter() - start
+
+    assert await timed(4) * 2 < await timed(1)
+    assert read_wav(str(tmp_path / "1.wav"))[0].shape == read_wav(str(tmp_path / "4.wav"))[0].shape
+
+@pytest.mark.asyncio
+async def test_generate_audio_stream_reuses_cached_segments(tmp_path, monkeypatch):
+    monkeypatch.setenv("TTS_AUDIO_CACHE_DIR", str(tmp_path / "segments"))
+    monkeypatch.setattr(TTSManager, "_audio_cache", None)
+
+    model = StubModel()
+    with patch.object(TTSManager, "get_model", return_value=model):
+        first = await TTSManager.generate_audio_stream(
+            ["Welcome back.", "Arsenal won."], file_name=str(tmp_path / "day1.wav"), silence_ms=0, crossfade_ms=0)
+        second = await TTSManager.generate_audio_stream(
+            ["Welcome  back.", "Chelsea lost."], file_name=str(tmp_path / "day2.wav"), silence_ms=0, crossfade_ms=0)
+
+    # The intro is only synthesized once; whitespace differences normalize away
+    assert model.calls == ["Welcome back.", "Arsenal won.", "Chelsea lost."]
+    assert np.array_equal(read_wav(first)[0][:1300], read_wav(second)[0][:1300])
+    stats = TTSManager.get_audio_cache().stats()
+    assert stats["hits"] == 1 and stats["misses"] == 3
+    assert stats["hit_rate"] == pytest.approx(0.25)
+
+class BatchStubModel(StubModel):
+    """StubModel that can also synthesize a whole batch in one call."""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def generate_batch(self, texts):
+        self.batches.append(list(texts))
+        return [np.full((1, len(text) * 100), 0.5, dtype=np.float32) for text in texts]
+
+def test_batch_by_length_buckets_similar_lengths():
+    texts = ["a" * n for n in (10, 40, 11, 12, 41, 13, 60)]
+    batches = batch_by_length(texts, max_batch_size=3, max_length_ratio=1.5)
+
+    assert sorted(i for batch in batches for i in batch) == list(range(len(texts)))
+    assert batches == [[0, 2, 3], [5], [1, 4, 6]]
+    for batch in batches:
+        lengths = [len(texts[i]) for i in batch]
+        assert len(batch) <= 3 and max(lengths) <= min(lengths) * 1.5
+
+@pytest.mark.asyncio
+async def test_generate_batch_returns_audio_in_input_order(monkeypatch):
+    monkeypatch.delenv("TTS_AUDIO_CACHE_DIR", raising=False)
+    texts = ["Arsenal 2, Chelsea 1.", "Next.", "Leeds 0, Everton 0.", "Now.", "And finally, the Bundesliga."]
+
+    model = BatchStubModel()
+    with patch.object(TTSManager, "get_model", return_value=model):
+        results = await TTSManager.generate_batch(texts, max_batch_size=2)
+
+    assert [len(samples) for samples in results] == [len(text) * 100 for text in texts]
+    assert model.calls == []
+    assert sorted(text for batch in model.batches for text in batch) == sorted(texts)
+    assert all(len(batch) <= 2 for batch in model.batches)
+    assert TTSManager.last_stats.chunks == 5
+
+    # Models without generate_batch synthesize the texts of each batch one by one
+    model = StubModel()
+    with patch.object(TTSManager, "get_model", return_value=model):
+        results = await TTSManager.generate_batch(texts)
+    assert sorted(model.calls) == sorted(texts)
+    assert [len(samples) for samples in results] == [len(text) * 100 for text in texts]
+
+@pytest.fixture
+def fresh_tts_manager(monkeypatch):
+    monkeypatch.setattr(TTSManager, "_model", None)
+    monkeypatch.setattr(TTSManager, "_warmup_future", None)
+    monkeypatch.setattr(TTSManager, "metrics", {})
+    yield TTSManager
+
+@pytest.mark.asyncio
+async def test_start_warmup_overlaps_model_load(fresh_tts_manager, tmp_path):
+    import asyncio
+    import time
+    model = StubModel()
+    load_calls = []
+
+    def slow_load():
+        load_calls.append(1)
+        time.sleep(0.3)
+        return model
+
+    with patch.object(TTSManager, "_load_model", side_effect=slow_load):
+        start = time.perf_counter()
+        future = TTSManager.start_warmup(dummy_synthesis=True)
+        assert TTSManager.start_warmup() is future
+        await asyncio.sleep(0.3)  # stands in for the fetch/search/LLM stages
+        await TTSManager.generate_audio_stream(["Hello."], file_name=str(tmp_path / "x.wav"))
+        elapsed = time.perf_counter() - start
+
+    assert load_calls == [1]
+    assert elapsed < 0.55
+    assert model.calls[0] == "Warming up."
+    assert TTSManager.metrics["load_seconds"] >= 0.3
+    assert "warmup_seconds" in TTSManager.metrics
+    assert TTSManager.metrics["ready_wait_seconds"] < 0.2
+
+@pytest.mark.asyncio
+async def test_failed_warmup_is_reported_and_retried(fresh_tts_manager):
+    with patch.object(TTSManager, "_load_model", side_effect=[RuntimeError("no weights"), StubModel()]):
+        TTSManager.start_warmup()
+        with pytest.raises(RuntimeError):
+            await TTSManager.wait_until_ready()
+        assert TTSManager._warmup_future is None
+        assert isinstance(TTSManager.get_model(), StubModel)
+
+@pytest.fixture
+def voice_model(monkeypatch, tmp_path):
+    from benchmarks.stubs import VoiceCloningTTSModel
+
+    class CountingModel(VoiceCloningTTSModel):
+        conditioning_calls = 0
+
+        def prepare_conditionals(self, wav_fpath, exaggeration=0.5):
+            CountingModel.conditioning_calls += 1
+            super().prepare_conditionals(wav_fpath, exaggeration)
+
+    model = CountingModel(encoder_passes=1)
+    monkeypatch.setattr(TTSManager, "_model", model)
+    monkeypatch.setattr(TTSManager, "_warmup_future", None)
+    monkeypatch.setattr(TTSManager, "_voices", {})
+    monkeypatch.setattr(TTSManager, "_voice_registry", {})
+    monkeypatch.setattr(TTSManager, "_voice_cache", None)
+    monkeypatch.setenv("TTS_VOICE_CACHE_DIR", str(tmp_path / "voices"))
+    monkeypatch.delenv("TTS_AUDIO_CACHE_DIR", raising=False)
+    return model
+
+def test_conditionals_round_trip_through_arrays():
+    from benchmarks.stubs import VoiceCloningTTSModel
+
+    built_in = VoiceCloningTTSModel(encoder_passes=1).conds
+    other = VoiceCloningTTSModel(encoder_passes=1, seed=1).conds
+    arrays = export_conditionals(other)
+    assert set(arrays) == {"t3/speaker_emb", "t3/cond_prompt_speech_tokens", "gen/prompt_feat", "gen/embedding"}
+
+    restored = import_conditionals(built_in, arrays)
+    assert np.array_equal(restored.t3.speaker_emb, other.t3.speaker_emb)
+    assert restored.gen["prompt_feat"].shape == other.gen["prompt_feat"].shape
+    assert restored.t3.cond_prompt_speech_tokens.dtype == np.int64
+    # The template itself is left untouched
+    assert not np.array_equal(built_in.t3.speaker_emb, other.t3.speaker_emb)
+
+def test_registered_voice_is_conditioned_once_and_persisted(voice_model, tmp_path):
+    from benchmarks.stubs import write_reference_clip
+
+    clip = write_reference_clip(str(tmp_path / "host.wav"), seconds=1.0, seed=3)
+    TTSManager.register_voice("host", clip)
+    with pytest.raises(FileNotFoundError):
+        TTSManager.register_voice("ghost", str(tmp_path / "missing.wav"))
+
+    fresh = TTSManager.get_voice(voice_model, "host")
+    assert TTSManager.get_voice(voice_model, "host") is fresh
+    assert TTSManager.get_voice(voice_model) is voice_model
+    assert type(voice_model).conditioning_calls == 1
+    assert len(TTSManager.get_voice_cache()) == 1
+
+    # A new process (no voice views yet) loads the persisted conditionals instead of embedding the clip
+    TTSManager._voices = {}
+    cached = TTSManager.get_voice(voice_model, "host")
+    assert cached is not fresh
+    assert type(voice_model).conditioning_calls == 1
+    assert np.array_equal(cached.generate("Welcome back."), fresh.generate("Welcome back."))
+    assert not np.array_equal(cached.generate("Welcome back."), voice_model.generate("Welcome back."))
+
+    # Editing the clip invalidates the persisted conditionals
+    write_reference_clip(clip, seconds=1.0, seed=4)
+    TTSManager._voices = {}
+    TTSManager.get_voice(voice_model, "host")
+    assert type(voice_model).conditioning_calls == 2
+
+@pytest.mark.asyncio
+async def test_synthesis_picks_a_voice_by_name(voice_model, tmp_path, monkeypatch):
+    from benchmarks.stubs import write_reference_clip
+
+    clip = write_reference_clip(str(tmp_path / "guest.wav"), seconds=1.0, seed=5)
+    monkeypatch.setenv("TTS_VOICES", f"host=voices/host.wav, guest={clip}")
+    assert TTSManager.resolve_voice("guest") == clip
+    assert TTSManager.resolve_voice("clips/other.wav") == "clips/other.wav"
+    assert TTSManager.resolve_voice("default") is None
+
+    built_in = await TTSManager.generate_audio("Hello there.", file_name=str(tmp_path / "a.wav"))
+    guest = await TTSManager.generate_audio("Hello there.", file_name=str(tmp_path / "b.wav"), chunked=True,
+                                            voice="guest", silence_ms=0, crossfade_ms=0)
+
+    assert type(voice_model).conditioning_calls == 1
+    assert not np.array_equal(read_wav(built_in)[0], read_wav(guest)[0])
+
+
+@pytest.mark.asyncio
+async def test_segment_cache_misses_when_a_voice_name_gets_another_clip(voice_model, tmp_path, monkeypatch):
+    from benchmarks.stubs import write_reference_clip
+    from modules.dialogue import Turn
+
+    monkeypatch.setenv("TTS_AUDIO_CACHE_DIR", str(tmp_path / "segments"))
+    monkeypatch.setattr(TTSManager, "_audio_cache", None)
+    first = write_reference_clip(str(tmp_path / "first.wav"), seconds=1.0, seed=6)
+    second = write_reference_clip(str(tmp_path / "second.wav"), seconds=1.0, seed=7)
+
+    TTSManager.register_voice("host", first)
+    [before] = await TTSManager.generate_batch(["Welcome back."], voice_prompt="host")
+    assert TTSManager.get_audio_cache().stats()["misses"] == 1
+    [again] = await TTSManager.generate_batch(["Welcome back."], voice_prompt="host")
+    assert TTSManager.get_audio_cache().stats()["hits"] == 1
+    assert np.array_equal(before, again)
+
+    # Same name, different clip: every synthesis path misses instead of replaying the old voice
+    TTSManager.register_voice("host", second)
+    [after] = await TTSManager.generate_batch(["Welcome back."], voice_prompt="host")
+    assert TTSManager.get_audio_cache().stats()["misses"] == 2
+    assert not np.array_equal(before, after)
+    await TTSManager.generate_dialogue([Turn("Alex", "Welcome back.")], voices={"Alex": first},
+                                       file_name=str(tmp_path / "dialogue.wav"))
+    assert TTSManager.get_audio_cache().stats()["hits"] == 2
+
+    # Replacing the file behind a path invalidates its segments too
+    write_reference_clip(second, seconds=1.0, seed=8)
+    await TTSManager.generate_audio_stream(["Welcome back."], file_name=str(tmp_path / "stream.wav"), voice="host")
+    assert TTSManager.get_audio_cache().stats()["misses"] == 3
@@ -0,0 +1,131 @@
+import os
+import time
+import wave
+import functools
+import numpy as np
+import pytest
+from unittest.mock import patch
+import modules.tts_pool as tts_pool
+from benchmarks.stubs import CPUBoundTTSModel
+from modules.dialogue import Turn
+from modules.langgraph_agent import FootballPodcastAgent
+from modules.tts import TTSManager
+from modules.tts_pool import TTSProcessPool, WorkerCrashed, plan_workers
+
+FACTORY = functools.partial(CPUBoundTTSModel, work_per_char=50)
+
+@pytest.fixture(scope="module")
+def pool():
+    with TTSProcessPool(workers=2, model_factory=FACTORY, worker_memory_mb=0) as pool:
+        yield pool
+
+def shared_blocks():
+    return set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+
+def test_pool_returns_audio_in_order_through_shared_memory(pool):
+    texts = ["Arsenal 2, Chelsea 1.", "Next up.", "Full time at Goodison.", "Headline."]
+    before = shared_blocks()
+
+    futures = [pool.submit(text) for text in texts]
+    results = [future.result(timeout=30) for future in futures]
+
+    model = FACTORY()
+    for text, samples in zip(texts, results):
+        assert samples.dtype == np.float32
+        assert np.array_equal(samples, model.generate(text).reshape(-1))
+    assert pool.sr == 24000 and pool.model_id == "benchmarks.stubs.CPUBoundTTSModel"
+    # Every block the workers created was unlinked after its samples were copied out
+    assert shared_blocks() == before
+
+@pytest.mark.asyncio
+async def test_crashed_worker_is_restarted_and_its_job_retried(pool, tmp_path):
+    restarts = pool.restarts
+
+    samples = await pool.synthesize(f"!crash-once:{tmp_path / 'crashed'}")
+    assert len(samples) > 0
+    assert pool.restarts == restarts + 1
+
+    # A text that kills every worker fails after the retry instead of looping
+    with pytest.raises(WorkerCrashed):
+        await pool.synthesize("!crash")
+    assert pool.restarts == restarts + 3
+    assert len(await pool.synthesize("Still serving.")) > 0
+
+def test_workers_load_their_models_in_parallel():
+    load_seconds = 1.5
+    factory = functools.partial(CPUBoundTTSModel, work_per_char=50, load_seconds=load_seconds)
+    start = time.perf_counter()
+    with TTSProcessPool(workers=3, model_factory=factory, worker_memory_mb=0) as pool:
+        elapsed = time.perf_counter() - start
+        assert len(pool.generate("Ready.")) > 0
+    # One worker after another would take at least 3 loads
+    assert elapsed < 3 * load_seconds
+
+def test_plan_workers_is_capped_by_available_memory(monkeypatch):
+    monkeypatch.setattr(tts_pool, "available_memory_mb", lambda: 8192.0)
+    assert plan_workers(8, worker_memory_mb=3072, reserve_mb=1024) == 2
+    assert plan_workers(2, worker_memory_mb=1024, reserve_mb=1024) == 2
+    # Never fewer than one worker, even when a single model does not fit
+    assert plan_workers(4, worker_memory_mb=16384, reserve_mb=1024) == 1
+
+    monkeypatch.setattr(tts_pool, "available_memory_mb", lambda: None)
+    assert plan_workers(3, worker_memory_mb=3072) == 3
+
+@pytest.mark.asyncio
+async def test_generate_audio_stream_uses_the_process_pool(pool, tmp_path, monkeypatch):
+    def no_in_process_model(*args, **kwargs):
+        raise AssertionError("the model must only be loaded in the workers")
+
+    monkeypatch.setenv("TTS_PROCESS_WORKERS", "2")
+    monkeypatch.setattr(TTSManager, "_process_pool", pool)
+    monkeypatch.setattr(TTSManager, "get_model", no_in_process_model)
+    out = str(tmp_path / "episode.wav")
+
+    await TTSManager.generate_audio_stream(["Welcome back.", "Arsenal won."], file_name=out,
+                                           silence_ms=0, crossfade_ms=0)
+
+    with wave.open(out, "rb") as wf:
+        assert wf.getframerate() == 24000
+        assert wf.getnframes() == int(len("Welcome back.") * 0.06 * 24000) + int(len("Arsenal won.") * 0.06 * 24000)
+    assert TTSManager.last_stats.chunks == 2
+
+@pytest.fixture
+def pool_only(pool, monkeypatch):
+    """Enables the pool and fails any attempt to load a model in the test process."""
+    def no_in_process_model(*args, **kwargs):
+        raise AssertionError("the model must only be loaded in the workers")
+
+    monkeypatch.setenv("TTS_PROCESS_WORKERS", "1")
+    monkeypatch.setattr(TTSManager, "_process_pool", pool)
+    monkeypatch.setattr(TTSManager, "_model", None)
+    monkeypatch.setattr(TTSManager, "_warmup_future", None)
+    monkeypatch.setattr(TTSManager, "_load_model", no_in_process_model)
+    monkeypatch.delenv("TTS_AUDIO_CACHE_DIR", raising=False)
+    return pool
+
+@pytest.mark.asyncio
+async def test_tts_node_synthesizes_in_the_pool_without_an_in_process_model(pool_only, tmp_path):
+    with patch("langchain_openai.ChatOpenAI"):
+        agent = FootballPodcastAgent(tts_chunked=False, dialogue=False, languages="en")
+    assert TTSManager.start_warmup().result(timeout=30) is pool_only
+    out = str(tmp_path / "episode.wav")
+
+    result = await agent.tts_node({"script": "Welcome back. Arsenal won.", "output_path": out})
+
+    assert result == {"audio_path": out}
+    assert TTSManager._model is None
+    with wave.open(out, "rb") as wf:
+        assert wf.getnframes() == int(len("Welcome back. Arsenal won.") * 0.06 * 24000)
+
+@pytest.mark.asyncio
+async def test_batch_and_dialogue_synthesize_in_the_pool(pool_only, tmp_path):
+    texts = ["Arsenal 2, Chelsea 1.", "Next up."]
+    results = await TTSManager.generate_batch(texts)
+    model = FACTORY()
+    assert all(np.array_equal(samples, model.generate(text).reshape(-1)) for text, samples in zip(texts, results))
+
+    await TTSManager.generate_dialogue([Turn("Alex", "Hello."), Turn("Sam", "Hi there.")],
+                                       file_name=str(tmp_path / "dialogue.wav"))
+    assert TTSManager.last_stats.chunks == 2
+    assert TTSManager._model is None
+
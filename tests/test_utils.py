@@ -1,7 +1,7 @@
 import os
 import wave
 import pytest
-from modules.utils import wave_file
+from modules.utils import WaveStreamWriter, wave_file
 
 def test_wave_file_creation(tmp_path):
     test_file = tmp_path / "test.wav"
@@ -15,3 +15,15 @@ def test_wave_file_creation(tmp_path):
         assert wf.getframerate() == 24000
         assert wf.getsampwidth() == 2
         assert wf.readframes(1000) == pcm_data
+
+def test_wave_stream_writer_appends_chunks(tmp_path):
+    test_file = tmp_path / "stream.wav"
+    with WaveStreamWriter(str(test_file), rate=16000) as writer:
+        writer.write(b"\x01\x00" * 100)
+        writer.write(b"\x02\x00" * 50)
+        assert writer.frames_written == 150
+
+    with wave.open(str(test_file), "rb") as wf:
+        assert wf.getframerate() == 16000
+        assert wf.getnframes() == 150
+        assert wf.readframes(150) == b"\x01\x00" * 100 + b"\x02\x00" * 50